@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import json
+import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List
+from langchain.chat_models import ChatOpenAI
+
+from agents.helper_agent import create_financial_analysis_graph, generate_visualizations, iter_visualizations, merge_errors
+from agents.llm_cache import CachedLLM
+from api_integration.enhanced_api_connector import EnhancedAPIConnector
+from monitoring import metrics
+from query_processing.enhanced_query_processor import DEFAULT_TICKER_LISTINGS, EnhancedQueryProcessor
+from query_processing.model_registry import DEFAULT_MODEL
+
+# Graph state keys whose updates are surfaced as analysis events while streaming
+ANALYSIS_KEYS = ("sec_analysis", "market_analysis", "technical_analysis")
+
+# Per-query graphs run concurrently in batches; most of their time is spent waiting on the LLM
+DEFAULT_BATCH_WORKERS = 8
+
+class FinancialAnalysisSystem:
+    def __init__(self, openai_api_key, alpha_vantage_key, twelve_data_key, chart_format=None,
+                 enable_metrics=False, spacy_model=DEFAULT_MODEL, ticker_listings_path=DEFAULT_TICKER_LISTINGS):
+        # Per-node/provider/cache/token metrics; must be on before the graphs are built
+        if enable_metrics:
+            metrics.enable()
+        
+        # Initialize components
+        self.api_keys = {
+            "openai": openai_api_key,
+            "alpha_vantage": alpha_vantage_key,
+            "twelve_data": twelve_data_key
+        }
+        
+        # Create LLM instance; identical prompts are answered from the response cache
+        self.llm = CachedLLM(ChatOpenAI(api_key=openai_api_key, model="gpt-4"))
+        
+        # None keeps live Figure objects; "png"/"svg" renders encoded charts in a process pool
+        self.chart_format = chart_format
+        
+        # Initialize components
+        self.query_processor = EnhancedQueryProcessor(
+            openai_api_key, model_name=spacy_model, ticker_listings_path=ticker_listings_path
+        )
+        self.api_connector = EnhancedAPIConnector(self.api_keys)
+        
+        # Create the workflow graph
+        self.workflow = create_financial_analysis_graph(
+            self.api_connector,
+            self.query_processor,
+            self.llm
+        )
+        # Same graph with coroutine nodes, for aprocess_financial_query
+        self.async_workflow = create_financial_analysis_graph(
+            self.api_connector,
+            self.query_processor,
+            self.llm,
+            use_async=True
+        )
+    
+    def process_financial_query(self, query: str):
+        """Process a financial query and return a comprehensive report"""
+        with metrics.trace() as trace:
+            # Execute the workflow
+            final_state = self.workflow.invoke(self._initial_state(query))
+            result = self._finalize(final_state)
+        return self._attach_metrics(result, trace)
+    
+    async def aprocess_financial_query(self, query: str):
+        """Coroutine version of process_financial_query
+        
+        Network and LLM waits yield to the event loop, so one process can serve
+        many concurrent queries (e.g. with asyncio.gather) on a bounded number
+        of threads.
+        """
+        with metrics.trace() as trace:
+            final_state = await self.async_workflow.ainvoke(self._initial_state(query))
+            if self.chart_format is None:
+                # pyplot figures are built on the loop thread since pyplot is not thread-safe
+                result = self._finalize(final_state)
+            else:
+                result = await asyncio.to_thread(self._finalize, final_state)
+        return self._attach_metrics(result, trace)
+    
+    def stream_financial_query(self, query: str) -> Iterator[Dict[str, Any]]:
+        """Process a query, yielding {"event", "name", "data"} events as results arrive
+        
+        Events come in pipeline order: query_parameters, one dataset per API
+        result, one analysis per analyst, report_token chunks while the report
+        is generated, one report_section per report key, one chart per
+        visualization, and finally done (the process_financial_query result).
+        An error event ends the stream early.
+        """
+        # Rebuilt from node updates; the graph gets its own copy of the initial state
+        state = self._initial_state(query)
+        for mode, chunk in self.workflow.stream(self._initial_state(query), stream_mode=["updates", "custom"]):
+            yield from self._graph_events(state, mode, chunk)
+        
+        if state["error"]:
+            yield {"event": "error", "name": None, "data": state["error"]}
+            return
+        yield from self._report_events(state)
+        
+        visualizations = {}
+        for name, chart in iter_visualizations(state["api_results"], state["report"], output_format=self.chart_format):
+            visualizations[name] = chart
+            yield {"event": "chart", "name": name, "data": chart}
+        yield self._done_event(state, visualizations)
+    
+    async def astream_financial_query(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Async iterator version of stream_financial_query"""
+        state = self._initial_state(query)
+        async for mode, chunk in self.async_workflow.astream(self._initial_state(query), stream_mode=["updates", "custom"]):
+            for event in self._graph_events(state, mode, chunk):
+                yield event
+        
+        if state["error"]:
+            yield {"event": "error", "name": None, "data": state["error"]}
+            return
+        for event in self._report_events(state):
+            yield event
+        
+        visualizations = {}
+        charts = iter_visualizations(state["api_results"], state["report"], output_format=self.chart_format)
+        while True:
+            # Rendered charts are awaited on a worker thread; pyplot figures stay on the loop thread
+            if self.chart_format is None:
+                item = next(charts, None)
+            else:
+                item = await asyncio.to_thread(next, charts, None)
+            if item is None:
+                break
+            name, chart = item
+            visualizations[name] = chart
+            yield {"event": "chart", "name": name, "data": chart}
+        yield self._done_event(state, visualizations)
+    
+    def _graph_events(self, state: Dict, mode: str, chunk: Any) -> Iterator[Dict[str, Any]]:
+        # Custom chunks are already events (report tokens written by generate_report)
+        if mode == "custom":
+            yield chunk
+            return
+        
+        for update in chunk.values():
+            # Nodes with nothing to add report None or an empty update
+            if not update:
+                continue
+            if update.get("error"):
+                state["error"] = merge_errors(state["error"], update["error"])
+            if update.get("query_parameters"):
+                state["query_parameters"] = update["query_parameters"]
+                yield {"event": "query_parameters", "name": None, "data": update["query_parameters"]}
+            for name, dataset in update.get("api_results", {}).items():
+                state["api_results"][name] = dataset
+                yield {"event": "dataset", "name": name, "data": dataset}
+            for key in ANALYSIS_KEYS:
+                if key in update:
+                    state[key] = update[key]
+                    yield {"event": "analysis", "name": key, "data": update[key]}
+            if "report" in update:
+                state["report"] = update["report"]
+    
+    def _report_events(self, state: Dict) -> Iterator[Dict[str, Any]]:
+        for section, content in state["report"].items():
+            yield {"event": "report_section", "name": section, "data": content}
+    
+    def _done_event(self, state: Dict, visualizations: Dict) -> Dict[str, Any]:
+        state["report"]["visualizations"] = list(visualizations.keys())
+        return {"event": "done", "name": None, "data": {"report": state["report"], "visualizations": visualizations}}
+    
+    def process_financial_queries(self, queries: List[str], max_workers: int = DEFAULT_BATCH_WORKERS) -> List[Dict]:
+        """Process many queries, fetching the data they share only once
+        
+        All queries are parsed together, their API needs are merged into one
+        deduplicated fetch plan that runs once, and then the per-query analysis
+        graphs run concurrently on at most max_workers threads. Results come
+        back in query order; with metrics enabled each carries the batch-wide trace.
+        A query that fails to parse or fetch gets {"error": ...} like
+        process_financial_query, without affecting the others.
+        """
+        if not queries:
+            return []
+        
+        with metrics.trace() as trace:
+            query_parameters = self.query_processor.process_queries(queries)
+            # Queries that failed to parse stay out of the shared fetch plan
+            parsed = [index for index, parameters in enumerate(query_parameters) if "error" not in parameters]
+            fetched = self.api_connector.query_apis_batch([query_parameters[index] for index in parsed])
+            api_results = dict(zip(parsed, fetched))
+            
+            outputs: List[Dict] = [None] * len(queries)
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+                futures = {}
+                for index, query in enumerate(queries):
+                    error = query_parameters[index].get("error") or api_results[index].get("error")
+                    if error:
+                        outputs[index] = {"error": error}
+                        continue
+                    futures[index] = executor.submit(
+                        contextvars.copy_context().run, self.workflow.invoke,
+                        self._initial_state(query, query_parameters[index], api_results[index])
+                    )
+                
+                # Charts are built here rather than in the workers since pyplot is not thread-safe
+                for index, future in futures.items():
+                    try:
+                        outputs[index] = self._finalize(future.result())
+                    except Exception as e:
+                        outputs[index] = {"error": f"Error processing query: {str(e)}"}
+        return [self._attach_metrics(output, trace) for output in outputs]
+    
+    def _attach_metrics(self, result: Dict, trace) -> Dict:
+        if trace is not None:
+            result["metrics"] = trace.summary()
+        return result
+    
+    def _initial_state(self, query: str, query_parameters: Dict = None, api_results: Dict = None) -> Dict:
+        # Nodes skip parsing and fetching when the state already carries their output
+        return {
+            "query": query,
+            "query_parameters": query_parameters or {},
+            "api_results": api_results or {},
+            "sec_analysis": {},
+            "market_analysis": {},
+            "technical_analysis": {},
+            "report": {},
+            "error": ""
+        }
+    
+    def _finalize(self, final_state: Dict) -> Dict:
+        # Check for errors
+        if final_state["error"]:
+            return {"error": final_state["error"]}
+        
+        # Generate visualizations
+        visualizations = generate_visualizations(
+            final_state["api_results"], final_state["report"], output_format=self.chart_format
+        )
+        
+        # Add visualizations to the report
+        final_state["report"]["visualizations"] = list(visualizations.keys())
+        
+        return {
+            "report": final_state["report"],
+            "visualizations": visualizations
+        }
+
+# Usage example
+if __name__ == "__main__":
+    system = FinancialAnalysisSystem(
+        openai_api_key="your_openai_api_key",
+        alpha_vantage_key="your_alpha_vantage_key",
+        twelve_data_key="your_twelve_data_key"
+    )
+    
+    # Process a financial query
+    result = system.process_financial_query("Analyze the impact of recent interest rate changes on the housing sector")
+    
+    # Print the report
+    print(json.dumps(result["report"], indent=2))
+    
+    # Display visualizations
+    for name, fig in result["visualizations"].items():
+        plt.figure(fig.number)
+        plt.show()
@@ -7,8 +7,22 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 import json
+import asyncio
+import time
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, StateGraph
 
+from agents.llm_cache import acomplete, astream_completion, complete, stream_completion
+from agents.prompt_builder import PromptCompactor, estimate_tokens
+from monitoring import metrics
+from visualizations.chart_rendering import build_chart_specs, draw_chart, iter_render_charts, render_charts
+
+def merge_errors(left: str, right: str) -> str:
+    """Combine errors reported by nodes that run in the same step"""
+    if left and right and right != left:
+        return f"{left}; {right}"
+    return right or left
+
 # Define the state schema
 class FinancialAnalysisState(TypedDict):
     query: str
@@ -18,37 +32,26 @@ class FinancialAnalysisState(TypedDict):
     market_analysis: Dict[str, Any]
     technical_analysis: Dict[str, Any]
     report: Dict[str, Any]
-    error: str
+    # The analyst nodes run in parallel, so errors need a reducer to merge concurrent updates
+    error: Annotated[str, merge_errors]
 
-def create_financial_analysis_graph(api_connector, query_processor, llm):
+def create_financial_analysis_graph(api_connector, query_processor, llm, prompt_compactor: PromptCompactor = None,
+                                    use_async: bool = False):
+    """Build the query -> fetch -> analysts -> report workflow
+
+    With use_async the nodes are coroutines (run the graph with ainvoke): API
+    calls go through the connector's async methods and LLM calls through
+    acomplete, so a query waiting on I/O does not hold a thread.
+    """
     # Initialize the state graph
     workflow = StateGraph(FinancialAnalysisState)
     
-    # Define the nodes
+    # Each analyst gets a bounded digest of api_results instead of the raw payloads
+    compactor = prompt_compactor or PromptCompactor()
     
-    # Query Processing Node
-    def process_query(state: FinancialAnalysisState) -> FinancialAnalysisState:
-        query = state["query"]
-        try:
-            query_parameters = query_processor.process_query(query)
-            return {"query_parameters": query_parameters}
-        except Exception as e:
-            return {"error": f"Error processing query: {str(e)}"}
+    # Prompts are shared by the sync and async nodes
     
-    # API Querying Node
-    def query_apis(state: FinancialAnalysisState) -> FinancialAnalysisState:
-        query_parameters = state["query_parameters"]
-        try:
-            api_results = api_connector.query_apis(query_parameters)
-            return {"api_results": api_results}
-        except Exception as e:
-            return {"error": f"Error querying APIs: {str(e)}"}
-    
-    # SEC Analysis Node
-    def analyze_sec_filings(state: FinancialAnalysisState) -> FinancialAnalysisState:
-        api_results = state["api_results"]
-        query_parameters = state["query_parameters"]
-        
+    def sec_prompt(state: FinancialAnalysisState) -> str:
         prompt_template = PromptTemplate(
             input_variables=["api_results", "query_parameters"],
             template="""
@@ -67,19 +70,12 @@ def create_financial_analysis_graph(api_connector, query_processor, llm):
             """
         )
         
-        prompt = prompt_template.format(
-            api_results=json.dumps(api_results),
-            query_parameters=json.dumps(query_parameters)
+        return prompt_template.format(
+            api_results=compactor.digest("sec", state["api_results"]),
+            query_parameters=json.dumps(state["query_parameters"])
         )
-        
-        sec_analysis = json.loads(llm(prompt))
-        return {"sec_analysis": sec_analysis}
     
-    # Market Research Node
-    def perform_market_research(state: FinancialAnalysisState) -> FinancialAnalysisState:
-        api_results = state["api_results"]
-        query_parameters = state["query_parameters"]
-        
+    def market_prompt(state: FinancialAnalysisState) -> str:
         prompt_template = PromptTemplate(
             input_variables=["api_results", "query_parameters"],
             template="""
@@ -98,23 +94,12 @@ def create_financial_analysis_graph(api_connector, query_processor, llm):
             """
         )
         
-        prompt = prompt_template.format(
-            api_results=json.dumps(api_results),
-            query_parameters=json.dumps(query_parameters)
+        return prompt_template.format(
+            api_results=compactor.digest("market", state["api_results"]),
+            query_parameters=json.dumps(state["query_parameters"])
         )
-        
-        market_analysis = json.loads(llm(prompt))
-        return {"market_analysis": market_analysis}
     
-    # Technical Analysis Node
-    def perform_technical_analysis(state: FinancialAnalysisState) -> FinancialAnalysisState:
-        api_results = state["api_results"]
-        query_parameters = state["query_parameters"]
-        
-        # Only perform technical analysis if price data is available
-        if not any("price_history" in key for key in api_results.keys()):
-            return {"technical_analysis": {"message": "No price data available for technical analysis"}}
-        
+    def technical_prompt(state: FinancialAnalysisState) -> str:
         prompt_template = PromptTemplate(
             input_variables=["api_results", "query_parameters"],
             template="""
@@ -133,22 +118,18 @@ def create_financial_analysis_graph(api_connector, query_processor, llm):
             """
         )
         
-        prompt = prompt_template.format(
-            api_results=json.dumps(api_results),
-            query_parameters=json.dumps(query_parameters)
+        return prompt_template.format(
+            api_results=compactor.digest("technical", state["api_results"]),
+            query_parameters=json.dumps(state["query_parameters"])
         )
-        
-        technical_analysis = json.loads(llm(prompt))
-        return {"technical_analysis": technical_analysis}
     
-    # Report Generation Node
-    def generate_report(state: FinancialAnalysisState) -> FinancialAnalysisState:
-        query = state["query"]
-        query_parameters = state["query_parameters"]
-        sec_analysis = state.get("sec_analysis", {})
-        market_analysis = state.get("market_analysis", {})
-        technical_analysis = state.get("technical_analysis", {})
-        
+    def skip_technical(state: FinancialAnalysisState) -> Dict:
+        # Only perform technical analysis if price data is available
+        if not any("price_history" in key for key in state["api_results"].keys()):
+            return {"technical_analysis": {"message": "No price data available for technical analysis"}}
+        return None
+    
+    def report_prompt(state: FinancialAnalysisState) -> str:
         prompt_template = PromptTemplate(
             input_variables=["query", "query_parameters", "sec_analysis", "market_analysis", "technical_analysis"],
             template="""
@@ -172,31 +153,151 @@ def create_financial_analysis_graph(api_connector, query_processor, llm):
             """
         )
         
-        prompt = prompt_template.format(
-            query=query,
-            query_parameters=json.dumps(query_parameters),
-            sec_analysis=json.dumps(sec_analysis),
-            market_analysis=json.dumps(market_analysis),
-            technical_analysis=json.dumps(technical_analysis)
+        return prompt_template.format(
+            query=state["query"],
+            query_parameters=json.dumps(state["query_parameters"]),
+            sec_analysis=json.dumps(state.get("sec_analysis", {})),
+            market_analysis=json.dumps(state.get("market_analysis", {})),
+            technical_analysis=json.dumps(state.get("technical_analysis", {}))
         )
+    
+    # Define the nodes
+    
+    # Query Processing Node
+    def process_query(state: FinancialAnalysisState) -> FinancialAnalysisState:
+        # Batch runs parse every query up front and pass the parameters in
+        if state.get("query_parameters"):
+            return {}
+        query = state["query"]
+        try:
+            query_parameters = query_processor.process_query(query)
+            return {"query_parameters": query_parameters}
+        except Exception as e:
+            return {"error": f"Error processing query: {str(e)}"}
+    
+    async def aprocess_query(state: FinancialAnalysisState) -> FinancialAnalysisState:
+        if state.get("query_parameters"):
+            return {}
+        try:
+            # spaCy is CPU-bound, so it runs on the loop's default executor
+            query_parameters = await asyncio.to_thread(query_processor.process_query, state["query"])
+            return {"query_parameters": query_parameters}
+        except Exception as e:
+            return {"error": f"Error processing query: {str(e)}"}
+    
+    # API Querying Node
+    def query_apis(state: FinancialAnalysisState) -> FinancialAnalysisState:
+        # Batch runs fetch a shared plan up front and pass each query its results
+        if state.get("api_results"):
+            return {}
+        query_parameters = state["query_parameters"]
+        try:
+            api_results = api_connector.query_apis(query_parameters)
+            return {"api_results": api_results}
+        except Exception as e:
+            return {"error": f"Error querying APIs: {str(e)}"}
+    
+    async def aquery_apis(state: FinancialAnalysisState) -> FinancialAnalysisState:
+        if state.get("api_results"):
+            return {}
+        try:
+            api_results = await api_connector.aquery_apis(state["query_parameters"])
+            return {"api_results": api_results}
+        except Exception as e:
+            return {"error": f"Error querying APIs: {str(e)}"}
+    
+    def record_tokens(node: str, prompt: str, completion: str, usage: Dict):
+        # Provider-reported counts when the model returned them, else a labelled estimate
+        if "prompt_tokens" in usage:
+            metrics.record_llm_tokens(node, usage["prompt_tokens"], usage["completion_tokens"], usage["source"])
+        else:
+            metrics.record_llm_tokens(node, estimate_tokens(prompt), estimate_tokens(str(completion)), "estimated")
+    
+    # SEC Analysis, Market Research and Technical Analysis Nodes
+    def analyst_node(output_key: str, build_prompt, error_label: str, skip=None):
+        def node(state: FinancialAnalysisState) -> FinancialAnalysisState:
+            skipped = skip(state) if skip else None
+            if skipped is not None:
+                return skipped
+            prompt = build_prompt(state)
+            try:
+                usage = {}
+                completion = complete(llm, prompt, usage)
+                record_tokens(output_key, prompt, completion, usage)
+                return {output_key: json.loads(completion)}
+            except Exception as e:
+                return {"error": f"Error {error_label}: {str(e)}"}
         
-        report = json.loads(llm(prompt))
+        async def anode(state: FinancialAnalysisState) -> FinancialAnalysisState:
+            skipped = skip(state) if skip else None
+            if skipped is not None:
+                return skipped
+            prompt = build_prompt(state)
+            try:
+                usage = {}
+                completion = await acomplete(llm, prompt, usage)
+                record_tokens(output_key, prompt, completion, usage)
+                return {output_key: json.loads(completion)}
+            except Exception as e:
+                return {"error": f"Error {error_label}: {str(e)}"}
+        
+        return anode if use_async else node
+    
+    # Report Generation Node
+    def generate_report(state: FinancialAnalysisState) -> FinancialAnalysisState:
+        # The analysts join here unconditionally, so skip the report if any of them failed
+        if should_end(state) == "end":
+            return {}
+        
+        # Tokens go to stream_mode="custom" consumers as they arrive; a no-op otherwise
+        writer = get_stream_writer()
+        prompt = report_prompt(state)
+        chunks = []
+        usage = {}
+        for chunk in stream_completion(llm, prompt, usage):
+            chunks.append(chunk)
+            writer({"event": "report_token", "name": None, "data": chunk})
+        
+        completion = "".join(chunks)
+        record_tokens("report", prompt, completion, usage)
+        report = json.loads(completion)
+        return {"report": report}
+    
+    async def agenerate_report(state: FinancialAnalysisState) -> FinancialAnalysisState:
+        if should_end(state) == "end":
+            return {}
+        
+        writer = get_stream_writer()
+        prompt = report_prompt(state)
+        chunks = []
+        usage = {}
+        async for chunk in astream_completion(llm, prompt, usage):
+            chunks.append(chunk)
+            writer({"event": "report_token", "name": None, "data": chunk})
+        
+        completion = "".join(chunks)
+        record_tokens("report", prompt, completion, usage)
+        report = json.loads(completion)
         return {"report": report}
     
-    # Add nodes to the graph
-    workflow.add_node("process_query", process_query)
-    workflow.add_node("query_apis", query_apis)
-    workflow.add_node("analyze_sec_filings", analyze_sec_filings)
-    workflow.add_node("perform_market_research", perform_market_research)
-    workflow.add_node("perform_technical_analysis", perform_technical_analysis)
-    workflow.add_node("generate_report", generate_report)
+    # Add nodes to the graph (timed per node when metrics are enabled)
+    nodes = {
+        "process_query": aprocess_query if use_async else process_query,
+        "query_apis": aquery_apis if use_async else query_apis,
+        "analyze_sec_filings": analyst_node("sec_analysis", sec_prompt, "analyzing SEC filings"),
+        "perform_market_research": analyst_node("market_analysis", market_prompt, "performing market research"),
+        "perform_technical_analysis": analyst_node("technical_analysis", technical_prompt,
+                                                   "performing technical analysis", skip_technical),
+        "generate_report": agenerate_report if use_async else generate_report
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, metrics.instrument_node(name, node))
     
     # Define edges (workflow)
-    workflow.add_edge("process_query", "query_apis")
-    workflow.add_edge("query_apis", "analyze_sec_filings")
-    workflow.add_edge("analyze_sec_filings", "perform_market_research")
-    workflow.add_edge("perform_market_research", "perform_technical_analysis")
-    workflow.add_edge("perform_technical_analysis", "generate_report")
+    # The three analysts only read api_results and query_parameters, so they fan out
+    # together after query_apis and generate_report waits for all of them
+    analyst_nodes = ["analyze_sec_filings", "perform_market_research", "perform_technical_analysis"]
+    workflow.add_edge(analyst_nodes, "generate_report")
     workflow.add_edge("generate_report", END)
     
     # Error handling
@@ -205,6 +306,11 @@ def create_financial_analysis_graph(api_connector, query_processor, llm):
             return "end"
         return "continue"
     
+    def fan_out_analysts(state: FinancialAnalysisState):
+        if should_end(state) == "end":
+            return END
+        return analyst_nodes
+    
     workflow.add_conditional_edges(
         "process_query",
         should_end,
@@ -216,11 +322,8 @@ def create_financial_analysis_graph(api_connector, query_processor, llm):
     
     workflow.add_conditional_edges(
         "query_apis",
-        should_end,
-        {
-            "continue": "analyze_sec_filings",
-            "end": END
-        }
+        fan_out_analysts,
+        analyst_nodes + [END]
     )
     
     # Set the entry point
@@ -229,49 +332,51 @@ def create_financial_analysis_graph(api_connector, query_processor, llm):
     return workflow.compile()
 
 # Visualization function
-def generate_visualizations(api_results, report):
-    """Generate visualizations based on API results and report specifications"""
-    visualizations = {}
+def generate_visualizations(api_results, report, annual_statements: pd.DataFrame = None,
+                            output_format: str = None, output_dir: str = None, max_workers: int = None,
+                            downsampling: Dict[str, str] = None):
+    """Generate visualizations based on API results and report specifications
+
+    annual_statements can be passed in when DataProcessor.normalize_fundamentals
+    has already been run on api_results, so the statements are not parsed twice.
+
+    By default live pyplot Figures are returned. With output_format ("png" or
+    "svg") the charts are rendered headlessly in a process pool and returned as
+    encoded bytes, or written to output_dir and returned as file paths.
+
+    Long price and volume series are reduced to the figure's pixel width
+    before drawing; downsampling overrides the method per chart kind.
+    """
+    specs = build_chart_specs(api_results, annual_statements, downsampling)
     
-    # Create various visualizations based on report requirements
-    for ticker, price_data in ((k.replace("_price_history", ""), v) for k, v in api_results.items() if "_price_history" in k):
-        if isinstance(price_data, pd.DataFrame) and 'Close' in price_data.columns:
-            # Price chart
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(price_data.index, price_data['Close'])
-            ax.set_title(f"{ticker} Stock Price")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Price")
-            ax.grid(True)
-            visualizations[f"{ticker}_price_chart"] = fig
-            
-            # Volume chart
-            if 'Volume' in price_data.columns:
-                fig, ax = plt.subplots(figsize=(10, 4))
-                ax.bar(price_data.index, price_data['Volume'])
-                ax.set_title(f"{ticker} Trading Volume")
-                ax.set_xlabel("Date")
-                ax.set_ylabel("Volume")
-                visualizations[f"{ticker}_volume_chart"] = fig
+    with metrics.timer("chart_render_seconds", format=output_format or "figure"):
+        if output_format is not None:
+            return render_charts(specs, fmt=output_format, output_dir=output_dir, max_workers=max_workers)
+        
+        return dict(_draw_figures(specs))
+
+def iter_visualizations(api_results, report, annual_statements: pd.DataFrame = None,
+                        output_format: str = None, output_dir: str = None, max_workers: int = None,
+                        downsampling: Dict[str, str] = None):
+    """Like generate_visualizations, but yield (name, chart) pairs as each chart is ready"""
+    specs = build_chart_specs(api_results, annual_statements, downsampling)
     
-    # Create more visualizations based on fundamental data
-    for ticker, fundamentals in ((k.replace("_fundamentals", ""), v) for k, v in api_results.items() if "_fundamentals" in k):
-        if "income_statement" in fundamentals and "annualReports" in fundamentals["income_statement"]:
-            try:
-                # Extract revenue data
-                annual_reports = fundamentals["income_statement"]["annualReports"]
-                years = [report["fiscalDateEnding"] for report in annual_reports]
-                revenue = [float(report["totalRevenue"]) for report in annual_reports]
-                
-                # Revenue chart
-                fig, ax = plt.subplots(figsize=(10, 6))
-                ax.bar(years, revenue)
-                ax.set_title(f"{ticker} Annual Revenue")
-                ax.set_xlabel("Fiscal Year")
-                ax.set_ylabel("Revenue")
-                plt.xticks(rotation=45)
-                visualizations[f"{ticker}_revenue_chart"] = fig
-            except (KeyError, ValueError) as e:
-                print(f"Error creating revenue chart: {e}")
+    if output_format is not None:
+        charts = iter_render_charts(specs, fmt=output_format, output_dir=output_dir, max_workers=max_workers)
+    else:
+        charts = _draw_figures(specs)
     
-    return visualizations
+    # Timed per chart, excluding the time the consumer spends between charts
+    while True:
+        started = time.perf_counter()
+        chart = next(charts, None)
+        if chart is None:
+            return
+        metrics.observe("chart_render_seconds", time.perf_counter() - started, format=output_format or "figure")
+        yield chart
+
+def _draw_figures(specs: List[Dict]):
+    for spec in specs:
+        fig, ax = plt.subplots(figsize=spec["figsize"])
+        draw_chart(ax, spec)
+        yield spec["name"], fig
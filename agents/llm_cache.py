@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from api_integration.cache import MemoryLRUCache, SQLiteCache, TieredCache, DEFAULT_CACHE_PATH
+from monitoring import metrics
+
+DEFAULT_LLM_TTL = 24 * 3600
+DEFAULT_LLM_CACHE_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "llm_cache.sqlite")
+
+def model_identity(llm: Any) -> str:
+    """Name the model and sampling settings that determine the completion"""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    temperature = getattr(llm, "temperature", None)
+    return f"{model}|temperature={temperature}"
+
+def record_usage(usage: Optional[Dict], result: Any):
+    """Add the token usage the provider reported on a message or stream chunk to usage
+
+    Chat models report it as usage_metadata (input/output tokens) or in
+    response_metadata["token_usage"]; plain completions and stand-ins report
+    nothing, which leaves usage untouched.
+    """
+    if usage is None:
+        return
+    metadata = getattr(result, "usage_metadata", None)
+    if metadata:
+        prompt_tokens, completion_tokens = metadata.get("input_tokens", 0), metadata.get("output_tokens", 0)
+    else:
+        token_usage = (getattr(result, "response_metadata", None) or {}).get("token_usage")
+        if not token_usage:
+            return
+        prompt_tokens, completion_tokens = token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+    usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + prompt_tokens
+    usage["completion_tokens"] = usage.get("completion_tokens", 0) + completion_tokens
+    usage["source"] = "provider"
+
+def complete(llm: Any, prompt: str, usage: Dict = None) -> str:
+    """Return the completion text for prompt, collecting provider token usage into usage"""
+    if isinstance(llm, CachedLLM):
+        return llm(prompt, usage=usage)
+    if hasattr(llm, "invoke"):
+        result = llm.invoke(prompt)
+        record_usage(usage, result)
+        return getattr(result, "content", result)
+    return llm(prompt)
+
+async def acomplete(llm: Any, prompt: str, usage: Dict = None) -> Any:
+    """Await the completion llm(prompt) would return, without blocking the event loop
+
+    Uses the model's native async API when it has one (acall, then ainvoke, with
+    chat messages reduced to their text) and otherwise runs the blocking call
+    on the loop's default executor.
+    """
+    if isinstance(llm, CachedLLM):
+        return await llm.acall(prompt, usage=usage)
+    if hasattr(llm, "acall"):
+        result = await llm.acall(prompt)
+        record_usage(usage, result)
+        return getattr(result, "content", result)
+    if hasattr(llm, "ainvoke"):
+        result = await llm.ainvoke(prompt)
+        record_usage(usage, result)
+        return getattr(result, "content", result)
+    return await asyncio.to_thread(complete, llm, prompt, usage)
+
+def stream_completion(llm: Any, prompt: str, usage: Dict = None) -> Iterator[str]:
+    """Yield the completion for prompt as text chunks, or in one piece if llm cannot stream"""
+    if isinstance(llm, CachedLLM):
+        yield from llm.stream(prompt, usage=usage)
+    elif hasattr(llm, "stream"):
+        for chunk in llm.stream(prompt):
+            # Chat models report usage on the final chunk (ChatOpenAI needs stream_usage=True)
+            record_usage(usage, chunk)
+            yield getattr(chunk, "content", chunk)
+    else:
+        yield complete(llm, prompt, usage)
+
+async def astream_completion(llm: Any, prompt: str, usage: Dict = None) -> AsyncIterator[str]:
+    """Async counterpart of stream_completion"""
+    if isinstance(llm, CachedLLM):
+        async for chunk in llm.astream(prompt, usage=usage):
+            yield chunk
+    elif hasattr(llm, "astream"):
+        async for chunk in llm.astream(prompt):
+            record_usage(usage, chunk)
+            yield getattr(chunk, "content", chunk)
+    else:
+        yield await acomplete(llm, prompt, usage)
+
+def _cache_hit_usage(usage: Optional[Dict]):
+    # An answer served from the cache cost no provider tokens
+    if usage is not None:
+        usage.update(prompt_tokens=0, completion_tokens=0, source="cache")
+
+class CachedLLM:
+    """Wraps an LLM so identical (model, prompt) pairs are answered from cache
+
+    Drop-in for the llm passed to create_financial_analysis_graph: calling,
+    acall and stream return the completion text, invoke and ainvoke return
+    whatever the wrapped model's invoke returns, and every other attribute is
+    forwarded to the wrapped model. Text and invoke results are cached under
+    separate keys, so one call style never receives the other's type.
+    """
+
+    def __init__(self, llm: Any, cache: TieredCache = None, ttl: float = DEFAULT_LLM_TTL):
+        self.llm = llm
+        self.cache = cache if cache is not None else TieredCache(
+            memory=MemoryLRUCache(max_entries=1024, max_bytes=64 * 1024 * 1024),
+            disk=SQLiteCache(DEFAULT_LLM_CACHE_PATH)
+        )
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def cache_key(self, prompt: str, kind: str = "text") -> str:
+        """Key for prompt's completion text, or for its invoke() result with kind="message" """
+        digest = hashlib.sha256(f"{model_identity(self.llm)}\0{prompt}".encode("utf-8")).hexdigest()
+        return f"llm_{digest}" if kind == "text" else f"llm_{kind}_{digest}"
+
+    def _record(self, hit: bool):
+        metrics.record_cache("llm", hit)
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def __call__(self, prompt: str, usage: Dict = None) -> Any:
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record(hit=True)
+            _cache_hit_usage(usage)
+            return cached
+
+        self._record(hit=False)
+        result = complete(self.llm, prompt, usage)
+        self.cache.set(key, result, ttl=self.ttl)
+        return result
+
+    def invoke(self, prompt: str, **kwargs) -> Any:
+        key = self.cache_key(prompt, kind="message")
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record(hit=True)
+            return cached
+
+        self._record(hit=False)
+        result = self.llm.invoke(prompt, **kwargs)
+        self.cache.set(key, result, ttl=self.ttl)
+        return result
+
+    async def acall(self, prompt: str, usage: Dict = None) -> Any:
+        """Async counterpart of calling the wrapper; shares its cache entries"""
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record(hit=True)
+            _cache_hit_usage(usage)
+            return cached
+
+        self._record(hit=False)
+        result = await acomplete(self.llm, prompt, usage)
+        self.cache.set(key, result, ttl=self.ttl)
+        return result
+
+    async def ainvoke(self, prompt: str, **kwargs) -> Any:
+        key = self.cache_key(prompt, kind="message")
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record(hit=True)
+            return cached
+
+        self._record(hit=False)
+        result = await self.llm.ainvoke(prompt, **kwargs)
+        self.cache.set(key, result, ttl=self.ttl)
+        return result
+
+    def stream(self, prompt: str, usage: Dict = None) -> Iterator[str]:
+        """Stream text chunks; a cache hit arrives as a single chunk"""
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record(hit=True)
+            _cache_hit_usage(usage)
+            yield cached
+            return
+
+        self._record(hit=False)
+        chunks = []
+        for chunk in stream_completion(self.llm, prompt, usage):
+            chunks.append(chunk)
+            yield chunk
+        # Only a fully streamed completion is cached
+        self.cache.set(key, "".join(chunks), ttl=self.ttl)
+
+    async def astream(self, prompt: str, usage: Dict = None) -> AsyncIterator[str]:
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record(hit=True)
+            _cache_hit_usage(usage)
+            yield cached
+            return
+
+        self._record(hit=False)
+        chunks = []
+        async for chunk in astream_completion(self.llm, prompt, usage):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(key, "".join(chunks), ttl=self.ttl)
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
@@ -0,0 +1,176 @@
+import json
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Rough size of a token for English/JSON text; good enough for budgeting prompts
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 3000
+
+# Fields kept from the Alpha Vantage OVERVIEW payload
+OVERVIEW_FIELDS = [
+    "Name", "Sector", "Industry", "MarketCapitalization", "PERatio", "PEGRatio", "EPS",
+    "ProfitMargin", "OperatingMarginTTM", "ReturnOnEquityTTM", "RevenueTTM",
+    "QuarterlyRevenueGrowthYOY", "QuarterlyEarningsGrowthYOY", "DividendYield", "Beta"
+]
+
+# Line items kept from each Alpha Vantage statement row
+STATEMENT_FIELDS = {
+    "income_statement": ["fiscalDateEnding", "totalRevenue", "grossProfit", "operatingIncome",
+                         "netIncome", "ebitda"],
+    "balance_sheet": ["fiscalDateEnding", "totalAssets", "totalLiabilities",
+                      "totalShareholderEquity", "cashAndCashEquivalentsAtCarryingValue",
+                      "longTermDebt"],
+    "cash_flow": ["fiscalDateEnding", "operatingCashflow", "capitalExpenditures",
+                  "dividendPayout"]
+}
+
+# Fields kept from yfinance's stock.info
+INFO_FIELDS = [
+    "shortName", "sector", "industry", "marketCap", "trailingPE", "forwardPE",
+    "recommendationKey", "recommendationMean", "numberOfAnalystOpinions", "targetMeanPrice",
+    "currentPrice", "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "beta"
+]
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _entries(api_results: Dict[str, Any], suffix: str):
+    for key, value in api_results.items():
+        if key.endswith(suffix):
+            yield key[:-len(suffix)], value
+
+def _pick(source: Dict, fields: List[str]) -> Dict:
+    return {field: source[field] for field in fields if source.get(field) not in (None, "None", "")}
+
+def price_statistics(prices: pd.DataFrame) -> Dict:
+    """Summarize an OHLCV frame into a handful of numbers"""
+    if not isinstance(prices, pd.DataFrame) or "Close" not in prices.columns or prices.empty:
+        return {}
+
+    close = prices["Close"].dropna()
+    last = float(close.iloc[-1])
+
+    def change_over(days: int):
+        if len(close) <= days:
+            return None
+        return round((last / float(close.iloc[-days - 1]) - 1) * 100, 2)
+
+    daily_returns = close.pct_change().dropna()
+    stats = {
+        "start": str(close.index[0].date()),
+        "end": str(close.index[-1].date()),
+        "last_close": round(last, 2),
+        "period_change_pct": round((last / float(close.iloc[0]) - 1) * 100, 2),
+        "change_1m_pct": change_over(21),
+        "change_3m_pct": change_over(63),
+        "high": round(float(close.max()), 2),
+        "low": round(float(close.min()), 2),
+        "annualized_volatility_pct": round(float(daily_returns.std() * np.sqrt(252) * 100), 2) if len(daily_returns) > 1 else None,
+        "sma_50": round(float(close.tail(50).mean()), 2) if len(close) >= 50 else None,
+        "sma_200": round(float(close.tail(200).mean()), 2) if len(close) >= 200 else None
+    }
+    if "Volume" in prices.columns:
+        stats["avg_volume_20d"] = int(prices["Volume"].tail(20).mean())
+    return {name: value for name, value in stats.items() if value is not None}
+
+class PromptCompactor:
+    """Turns raw api_results into a bounded, per-analyst digest for LLM prompts
+
+    Each analyst only sees the datasets it needs: fundamentals for the SEC node,
+    quotes, analyst ratings and news for market research, and price/indicator
+    statistics for technical analysis. If a digest exceeds the token budget, the
+    number of rows, headlines and indicator values is reduced until it fits.
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, statement_rows: int = 4,
+                 news_items: int = 5, indicator_values: int = 5):
+        self.token_budget = token_budget
+        self.statement_rows = statement_rows
+        self.news_items = news_items
+        self.indicator_values = indicator_values
+
+        self.builders: Dict[str, Callable[[Dict[str, Any], int], Dict]] = {
+            "sec": self._sec_digest,
+            "market": self._market_digest,
+            "technical": self._technical_digest
+        }
+
+    def _sec_digest(self, api_results: Dict[str, Any], limit: int) -> Dict:
+        rows = min(self.statement_rows, limit)
+        digest = {}
+        for ticker, fundamentals in _entries(api_results, "_fundamentals"):
+            if not isinstance(fundamentals, dict):
+                continue
+            entry = {"overview": _pick(fundamentals.get("overview", {}), OVERVIEW_FIELDS)}
+            for statement, fields in STATEMENT_FIELDS.items():
+                reports = fundamentals.get(statement, {})
+                entry[statement] = {
+                    "annual": [_pick(row, fields) for row in reports.get("annualReports", [])[:rows]],
+                    "quarterly": [_pick(row, fields) for row in reports.get("quarterlyReports", [])[:rows]]
+                }
+            digest[ticker] = entry
+        return digest
+
+    def _market_digest(self, api_results: Dict[str, Any], limit: int) -> Dict:
+        rows = min(self.news_items, limit)
+        digest = {}
+        for ticker, summary in _entries(api_results, "_summary"):
+            if not isinstance(summary, dict) or "error" in summary:
+                continue
+            entry = {"info": _pick(summary.get("info") or {}, INFO_FIELDS)}
+
+            recommendations = summary.get("recommendations")
+            if isinstance(recommendations, pd.DataFrame) and not recommendations.empty:
+                entry["recommendations"] = recommendations.head(rows).to_dict(orient="records")
+
+            news = summary.get("news") or []
+            entry["news"] = [
+                item.get("title") or item.get("content", {}).get("title")
+                for item in news[:rows]
+                if isinstance(item, dict)
+            ]
+            digest[ticker] = entry
+
+        for ticker, prices in _entries(api_results, "_price_history"):
+            stats = price_statistics(prices)
+            if stats:
+                digest.setdefault(ticker, {})["price"] = {
+                    name: stats[name] for name in ("last_close", "period_change_pct", "change_3m_pct") if name in stats
+                }
+        return digest
+
+    def _technical_digest(self, api_results: Dict[str, Any], limit: int) -> Dict:
+        rows = min(self.indicator_values, limit)
+        digest = {}
+        for ticker, prices in _entries(api_results, "_price_history"):
+            stats = price_statistics(prices)
+            if stats:
+                digest.setdefault(ticker, {})["price"] = stats
+
+        for ticker, indicators in _entries(api_results, "_technical"):
+            if not isinstance(indicators, dict):
+                continue
+            digest.setdefault(ticker, {})["indicators"] = {
+                name: payload.get("values", [])[:rows]
+                for name, payload in indicators.items()
+                if isinstance(payload, dict)
+            }
+        return digest
+
+    def digest(self, analyst: str, api_results: Dict[str, Any]) -> str:
+        """Return a JSON digest for the analyst that fits within the token budget"""
+        builder = self.builders[analyst]
+        limit = max(self.statement_rows, self.news_items, self.indicator_values)
+
+        while True:
+            text = json.dumps(builder(api_results, limit), default=str)
+            if estimate_tokens(text) <= self.token_budget or limit <= 1:
+                break
+            limit -= 1
+
+        max_chars = self.token_budget * CHARS_PER_TOKEN
+        if len(text) > max_chars:
+            text = text[:max_chars] + "... [truncated]"
+        return text
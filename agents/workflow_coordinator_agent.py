@@ -1,3 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List
+
+# Agent calls run at once across all companies; they mostly wait on I/O
+DEFAULT_MAX_WORKERS = 12
+
 class SupervisorAgent:
     def __init__(self, sec_agent, market_agent, technical_agent):
         self.sec_agent = sec_agent
@@ -17,6 +23,47 @@ class SupervisorAgent:
         }
         return report
 
-supervisor_agent = SupervisorAgent(sec_agent, market_agent, technical_agent)
-report = supervisor_agent.coordinate_workflow("TSLA")
-print(report)
+    def coordinate_many(self, companies: List[str], max_workers: int = DEFAULT_MAX_WORKERS) -> Iterator[Dict]:
+        """Run the three agents for every company in one bounded pool, yielding each report as it completes
+
+        A failing agent leaves {"error": ...} under its key; the other agents and companies carry on.
+        """
+        agents = {
+            "sec_analysis": self.sec_agent.analyze_sec_filings,
+            "market_data": self.market_agent.gather_market_data,
+            "technical_analysis": self.technical_agent.perform_technical_analysis
+        }
+        if not companies:
+            return
+
+        # Reports are keyed by position so a company listed twice is reported twice
+        reports = [{"company": company, **dict.fromkeys(agents)} for company in companies]
+        pending = [len(agents)] * len(companies)
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(companies) * len(agents)))
+        try:
+            # Submitted company by company, so the first companies finish first
+            futures = {
+                executor.submit(agent, company): (index, key)
+                for index, company in enumerate(companies)
+                for key, agent in agents.items()
+            }
+            for future in as_completed(futures):
+                index, key = futures[future]
+                try:
+                    reports[index][key] = future.result()
+                except Exception as e:
+                    reports[index][key] = {"error": str(e)}
+                pending[index] -= 1
+                if not pending[index]:
+                    yield reports[index]
+        finally:
+            # Drop queued calls if the caller stops iterating early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == "__main__":
+    supervisor_agent = SupervisorAgent(sec_agent, market_agent, technical_agent)
+    report = supervisor_agent.coordinate_workflow("TSLA")
+    print(report)
+
+    for report in supervisor_agent.coordinate_many(["TSLA", "AAPL", "MSFT"]):
+        print(report)
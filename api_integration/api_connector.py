@@ -1,16 +1,20 @@
-import requests
+from typing import Dict
+
+from api_integration.http_transport import HTTPTransport
 
 class APIConnector:
-    def __init__(self, api_keys: Dict[str, str]):
+    def __init__(self, api_keys: Dict[str, str], transport: HTTPTransport = None):
         self.api_keys = api_keys
+        self.transport = transport or HTTPTransport()
 
     def fetch_alpha_vantage_data(self, symbol: str) -> Dict:
         base_url = "https://www.alphavantage.co/query"
         params = {"function": "TIME_SERIES_DAILY", "symbol": symbol, "apikey": self.api_keys["alpha_vantage"]}
-        response = requests.get(base_url, params=params)
+        response = self.transport.get(base_url, params=params)
         return response.json()
 
-api_keys = {"alpha_vantage": "demo"}
-api_connector = APIConnector(api_keys)
-data = api_connector.fetch_alpha_vantage_data("TSLA")
-print(data)
+if __name__ == "__main__":
+    api_keys = {"alpha_vantage": "demo"}
+    api_connector = APIConnector(api_keys)
+    data = api_connector.fetch_alpha_vantage_data("TSLA")
+    print(data)
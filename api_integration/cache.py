@@ -0,0 +1,315 @@
+import io
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - only needed for the parquet codec
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+try:
+    from langchain_core.load import dumpd, load as load_langchain
+except ImportError:
+    dumpd = load_langchain = None
+
+# Time-to-live in seconds per cache key prefix
+DEFAULT_TTLS = {
+    "av_fundamentals_": 3 * 24 * 3600,  # Statements only change on filings
+    "yf_summary_": 10 * 60,  # Quotes, holders and news go stale quickly
+    "twelve_data_": 3600
+}
+DEFAULT_TTL = 3600
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "grad-llm-test", "api_cache.sqlite")
+
+def ttl_for_key(key: str, ttls: Dict[str, float]) -> float:
+    """Return the TTL of the longest matching key prefix"""
+    matches = [prefix for prefix in ttls if key.startswith(prefix)]
+    if not matches:
+        return DEFAULT_TTL
+    return ttls[max(matches, key=len)]
+
+# Placeholder left in a JSON document where a DataFrame was split out into its own blob
+FRAME_MARKER = "__cached_frame__"
+
+class UnsupportedValue(ValueError):
+    """A value the disk tier cannot store without pickle"""
+
+def _encode_frame(frame: pd.DataFrame) -> Tuple[str, bytes]:
+    if HAS_PARQUET:
+        try:
+            buffer = io.BytesIO()
+            frame.to_parquet(buffer)
+            return "parquet", buffer.getvalue()
+        except (ValueError, TypeError):
+            # e.g. non-string column labels; the JSON table schema below still keeps dtypes
+            pass
+    try:
+        return "frame_json", frame.to_json(orient="table").encode("utf-8")
+    except (ValueError, TypeError) as e:
+        raise UnsupportedValue(f"Cannot encode DataFrame for the disk cache: {e}") from e
+
+def _decode_frame(codec: str, payload: bytes) -> pd.DataFrame:
+    if codec == "parquet":
+        return pd.read_parquet(io.BytesIO(payload))
+    return pd.read_json(io.StringIO(payload.decode("utf-8")), orient="table")
+
+def _split_frames(value: Any, blobs: List[Tuple[str, bytes]]) -> Any:
+    """Copy of value with every nested DataFrame replaced by a FRAME_MARKER placeholder"""
+    if isinstance(value, pd.DataFrame):
+        blobs.append(_encode_frame(value))
+        return {FRAME_MARKER: len(blobs) - 1}
+    if isinstance(value, dict):
+        return {key: _split_frames(item, blobs) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_split_frames(item, blobs) for item in value]
+    return value
+
+def _join_frames(value: Any, frames: List[pd.DataFrame]) -> Any:
+    if isinstance(value, dict):
+        if FRAME_MARKER in value and len(value) == 1:
+            return frames[value[FRAME_MARKER]]
+        return {key: _join_frames(item, frames) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_join_frames(item, frames) for item in value]
+    return value
+
+def encode_value(value: Any) -> Tuple[str, bytes]:
+    """Serialize a cache value without pickle
+
+    DataFrames use parquet. JSON documents that hold DataFrames (such as
+    yfinance summaries) become "mixed" payloads: a length-prefixed JSON header
+    followed by one parquet blob per frame. LangChain messages use LangChain's
+    own JSON serialization. Anything else raises UnsupportedValue.
+    """
+    if isinstance(value, pd.DataFrame):
+        return _encode_frame(value)
+    if dumpd is not None and hasattr(value, "to_json") and hasattr(value, "lc_secrets"):
+        return "langchain", json.dumps(dumpd(value)).encode("utf-8")
+
+    blobs = []
+    try:
+        document = json.dumps(_split_frames(value, blobs)).encode("utf-8")
+    except (TypeError, ValueError) as e:
+        raise UnsupportedValue(f"Cannot encode {type(value).__name__} for the disk cache: {e}") from e
+    if not blobs:
+        return "json", document
+
+    header = json.dumps({"frames": [[codec, len(blob)] for codec, blob in blobs]}).encode("utf-8")
+    parts = [struct.pack(">II", len(header), len(document)), header, document]
+    parts += [blob for _, blob in blobs]
+    return "mixed", b"".join(parts)
+
+def decode_value(codec: str, payload: bytes) -> Any:
+    if codec in ("parquet", "frame_json"):
+        return _decode_frame(codec, payload)
+    if codec == "json":
+        return json.loads(payload.decode("utf-8"))
+    if codec == "langchain" and load_langchain is not None:
+        with warnings.catch_warnings():
+            # load() is marked beta but is LangChain's supported way back from dumpd()
+            warnings.simplefilter("ignore")
+            return load_langchain(json.loads(payload.decode("utf-8")), allowed_objects="messages")
+    if codec == "mixed":
+        header_size, document_size = struct.unpack_from(">II", payload)
+        offset = 8
+        header = json.loads(payload[offset:offset + header_size].decode("utf-8"))
+        offset += header_size
+        document = json.loads(payload[offset:offset + document_size].decode("utf-8"))
+        offset += document_size
+        frames = []
+        for frame_codec, size in header["frames"]:
+            frames.append(_decode_frame(frame_codec, payload[offset:offset + size]))
+            offset += size
+        return _join_frames(document, frames)
+    # Older entries may be pickles; the shared file is never trusted to unpickle
+    raise UnsupportedValue(f"Unsupported cache codec {codec!r}")
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of a cached value in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values()) + 64 * len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value) + 8 * len(value)
+    return len(json.dumps(value, default=str))
+
+class MemoryLRUCache:
+    """In-process LRU tier bounded by entry count and approximate bytes"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, expires_at, size)
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at < time.time():
+                del self.entries[key]
+                self.total_bytes -= size
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires_at: float):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[2]
+            self.entries[key] = (value, expires_at, size)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+class SQLiteCache:
+    """On-disk tier; a single SQLite file can be shared by several processes"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, codec TEXT NOT NULL, payload BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expires_at) for a live entry"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT codec, payload, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        codec, payload, expires_at = row
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+        try:
+            return decode_value(codec, payload), expires_at
+        except UnsupportedValue:
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any, expires_at: float):
+        try:
+            codec, payload = encode_value(value)
+        except UnsupportedValue:
+            # Stays in the memory tier only
+            return
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache (key, codec, payload, expires_at) VALUES (?, ?, ?, ?)",
+                (key, codec, sqlite3.Binary(payload), expires_at)
+            )
+            self.connection.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self.connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self.connection.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            self.connection.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            self.connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self.connection.execute("DELETE FROM cache")
+            self.connection.commit()
+
+class TieredCache:
+    """Memory LRU in front of an optional disk tier, with TTLs chosen by key prefix"""
+
+    def __init__(self, memory: MemoryLRUCache = None, disk: SQLiteCache = None,
+                 ttls: Dict[str, float] = None):
+        self.memory = memory or MemoryLRUCache()
+        self.disk = disk
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                # Promote to memory, keeping the remaining lifetime from the disk tier
+                value, expires_at = entry
+                self.memory.set(key, value, expires_at)
+                return value
+        return default
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        expires_at = time.time() + (ttl if ttl is not None else ttl_for_key(key, self.ttls))
+        self.memory.set(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, value, expires_at)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    # Mapping-style access so the cache can stand in for a plain dict
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self.set(key, value)
+
+    def __delitem__(self, key: str):
+        self.delete(key)
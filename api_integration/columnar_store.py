@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api_integration.cache import DEFAULT_CACHE_PATH
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+DEFAULT_PRICE_DIR = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "prices")
+
+# Column files are named after the frame's columns; the date index is stored alongside
+DATE_COLUMN = "date"
+
+Mapped = Tuple[Dict, np.ndarray, Dict[str, np.ndarray]]
+
+class ColumnarPriceStore:
+    """Per-ticker price columns in .npy files, memory-mapped by every reader
+
+    Each ticker directory holds meta.json and one generation directory with a
+    datetime64[D] date index and one contiguous array per column. A write
+    creates a new generation and then swaps meta.json atomically with
+    os.replace, so readers in any process see either the old or the new data,
+    never a partial file. Frames returned by frame() are views over the mapped
+    pages, so processes reading the same ticker share one copy in the page cache.
+    """
+
+    def __init__(self, root: str = DEFAULT_PRICE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # ticker -> (meta.json identity, mapped arrays), refreshed when meta.json is replaced
+        self._mapped: Dict[str, Tuple[Tuple, Mapped]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _directory(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.replace(os.sep, "_"))
+
+    @contextmanager
+    def lock(self, ticker: str):
+        """Exclusive write access to a ticker across threads and processes"""
+        with self._guard:
+            thread_lock = self._locks.setdefault(ticker, threading.Lock())
+        with thread_lock:
+            directory = self._directory(ticker)
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, ".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _read(self, ticker: str) -> Optional[Mapped]:
+        meta_path = os.path.join(self._directory(ticker), "meta.json")
+        # A writer may remove the generation between reading meta.json and mapping it
+        for _ in range(3):
+            try:
+                stat = os.stat(meta_path)
+            except FileNotFoundError:
+                return None
+            identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            cached = self._mapped.get(ticker)
+            if cached is not None and cached[0] == identity:
+                return cached[1]
+
+            try:
+                with open(meta_path) as meta_file:
+                    meta = json.load(meta_file)
+                generation = os.path.join(self._directory(ticker), meta["generation"])
+                dates = np.load(os.path.join(generation, f"{DATE_COLUMN}.npy"), mmap_mode="r")
+                columns = {
+                    name: np.load(os.path.join(generation, f"{name}.npy"), mmap_mode="r")
+                    for name in meta["columns"]
+                }
+            except FileNotFoundError:
+                continue
+            mapped = (meta, dates, columns)
+            self._mapped[ticker] = (identity, mapped)
+            return mapped
+        return None
+
+    def coverage(self, ticker: str) -> Optional[Dict]:
+        """The coverage record written with the stored data, or None if nothing is stored"""
+        mapped = self._read(ticker)
+        return mapped[0]["coverage"] if mapped is not None else None
+
+    def columns(self, ticker: str, start: date = None, end: date = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Read-only (dates, {column: values}) slices between start and end (inclusive), without copying"""
+        mapped = self._read(ticker)
+        if mapped is None:
+            return np.empty(0, dtype="datetime64[D]"), {}
+        _, dates, columns = mapped
+        first = np.searchsorted(dates, np.datetime64(start, "D")) if start else 0
+        last = np.searchsorted(dates, np.datetime64(end, "D"), side="right") if end else len(dates)
+        return dates[first:last], {name: values[first:last] for name, values in columns.items()}
+
+    def frame(self, ticker: str, start: date = None, end: date = None) -> pd.DataFrame:
+        """Bars between start and end as a DataFrame whose columns are views on the mapped files"""
+        dates, columns = self.columns(ticker, start, end)
+        if not columns:
+            return pd.DataFrame()
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(dates, name="Date"), copy=False)
+
+    def write(self, ticker: str, frame: pd.DataFrame, coverage: Dict):
+        """Replace a ticker's data with frame's numeric columns; call while holding lock(ticker)"""
+        directory = self._directory(ticker)
+        os.makedirs(directory, exist_ok=True)
+        generation = uuid.uuid4().hex
+        staging = os.path.join(directory, f".tmp-{generation}")
+        os.makedirs(staging)
+
+        dates = pd.DatetimeIndex(frame.index).tz_localize(None).to_numpy().astype("datetime64[D]")
+        np.save(os.path.join(staging, f"{DATE_COLUMN}.npy"), dates)
+        columns = []
+        for name in frame.columns:
+            values = frame[name].to_numpy()
+            if values.dtype.kind in "fiub":
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(values))
+                columns.append(name)
+        os.replace(staging, os.path.join(directory, generation))
+
+        meta = {"generation": generation, "columns": columns, "rows": len(dates), "coverage": coverage}
+        meta_staging = os.path.join(directory, f".meta-{generation}.json")
+        with open(meta_staging, "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(meta_staging, os.path.join(directory, "meta.json"))
+
+        # Processes still mapping older generations keep their pages until they remap.
+        # Writers hold the lock, so leftover staging entries are from crashed writes.
+        for entry in os.listdir(directory):
+            if entry not in (generation, "meta.json", ".lock"):
+                path = os.path.join(directory, entry)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+
+    def clear(self):
+        self._mapped.clear()
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
@@ -1,116 +1,283 @@
-import requests
+import asyncio
 import pandas as pd
 import yfinance as yf
-from typing import Dict, List, Any, Union
-import time
+from typing import Dict, List, Any, Union, Callable, Tuple, Awaitable
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import threading
+from datetime import date, timedelta
+
+from api_integration.cache import TieredCache, SQLiteCache
+from api_integration.columnar_store import DEFAULT_PRICE_DIR, ColumnarPriceStore
+from api_integration.http_transport import AsyncHTTPTransport, HTTPTransport
+from api_integration.price_store import PriceHistoryStore, resolve_window
+from api_integration.rate_limiter import RateLimiter
+from api_integration.single_flight import SingleFlight
+from data.technical_indicators import compute_indicators
+from monitoring import metrics
+
+# Default number of simultaneous in-flight fetches allowed per provider
+DEFAULT_PROVIDER_CONCURRENCY = {
+    "alpha_vantage": 2,
+    "yahoo": 8,
+    "twelve_data": 2
+}
+
+# Provider endpoints; override to point the connector at a local stub server
+DEFAULT_BASE_URLS = {
+    "alpha_vantage": "https://www.alphavantage.co/query",
+    "twelve_data": "https://api.twelvedata.com"
+}
+
+# Alpha Vantage statements fetched per ticker, keyed by their name in the result
+AV_FUNCTIONS = {
+    "income_statement": "INCOME_STATEMENT",
+    "balance_sheet": "BALANCE_SHEET",
+    "cash_flow": "CASH_FLOW",
+    "overview": "OVERVIEW"
+}
+
+# Alpha Vantage reports throttling and bad symbols in a 200 response under these keys
+AV_ERROR_KEYS = ("Error Message", "Note", "Information")
+
+# Twelve Data reports throttling and bad symbols as {"status": "error", "code": ..., "message": ...}
+TD_ERROR_STATUS = "error"
+
+# Price history pulled for locally computed indicators; enough to warm up MACD's slow EMA
+INDICATOR_LOOKBACK = {"period": "last 1 years"}
 
 class EnhancedAPIConnector:
-    def __init__(self, api_keys: Dict[str, str]):
+    def __init__(self, api_keys: Dict[str, str], execution_mode: str = "threaded",
+                 max_workers: int = 16, provider_concurrency: Dict[str, int] = None,
+                 rate_limiter: RateLimiter = None, cache: TieredCache = None,
+                 technical_source: str = "local", indicator_windows: Dict[str, Any] = None,
+                 transport: HTTPTransport = None, base_urls: Dict[str, str] = None,
+                 async_transport: AsyncHTTPTransport = None, yahoo_client: Any = None,
+                 price_dir: str = DEFAULT_PRICE_DIR):
         self.api_keys = api_keys
-        self.cache = {}  # Simple in-memory cache
+        # The yfinance module by default; anything with a compatible Ticker(symbol) works
+        self.yahoo_client = yahoo_client or yf
+        # Pooled keep-alive sessions with retries, shared by every worker thread
+        self.transport = transport or HTTPTransport()
+        # Used by the a-prefixed coroutine methods
+        self.async_transport = async_transport or AsyncHTTPTransport()
+        self.base_urls = {**DEFAULT_BASE_URLS, **(base_urls or {})}
+        # Memory LRU in front of a persistent SQLite tier, with per-key-prefix TTLs
+        self.cache = cache if cache is not None else TieredCache(disk=SQLiteCache())
+        # Daily bars live in memory-mapped column files under price_dir, shared by all processes
+        self.price_store = PriceHistoryStore(ColumnarPriceStore(price_dir))
+        # Concurrent misses on the same cache key share one provider fetch
+        self.single_flight = SingleFlight()
+        
+        # "local" derives indicators from Yahoo prices and only falls back to Twelve Data
+        self.technical_source = technical_source
+        self.indicator_windows = indicator_windows
+        
+        # Shared across threads so every fetch draws from the same per-provider quota
+        self.rate_limiter = rate_limiter or RateLimiter()
+        
+        # "threaded" fans all (api, ticker) fetches out at once, "sequential" keeps the old loop
+        self.execution_mode = execution_mode
+        self.max_workers = max_workers
+        limits = dict(DEFAULT_PROVIDER_CONCURRENCY)
+        limits.update(provider_concurrency or {})
+        self.provider_semaphores = {
+            provider: threading.BoundedSemaphore(limit) for provider, limit in limits.items()
+        }
+        # The same limits for coroutines, created per event loop on first use
+        self.provider_limits = limits
+        self._async_semaphores: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]] = {}
         
     def query_apis(self, query_params: Dict) -> Dict[str, Any]:
         """Query multiple financial APIs based on processed query parameters"""
-        results = {}
+        tasks = self._plan_tasks(query_params)
+        return {key: result for (key, _, _, _), result in zip(tasks, self._run_tasks(tasks))}
+    
+    def query_apis_batch(self, query_params_list: List[Dict]) -> List[Dict[str, Any]]:
+        """Query the APIs for many queries at once, fetching each distinct task only once
+        
+        Every query's (api, ticker, window) tasks are merged into one plan, so a
+        ticker shared by many queries is fetched a single time. Returns one
+        results dict per query, in the same order and layout as query_apis. A
+        query whose fetch raised gets {"error": ...} instead; the rest are unaffected.
+        """
+        plans = [self._plan_tasks(query_params) for query_params in query_params_list]
+        unique_tasks = {}
+        for tasks in plans:
+            for task in tasks:
+                unique_tasks.setdefault(self._task_identity(task), task)
+        
+        results = dict(zip(unique_tasks, self._run_tasks(list(unique_tasks.values()), return_exceptions=True)))
+        outputs = []
+        for tasks in plans:
+            query_results = {task[0]: results[self._task_identity(task)] for task in tasks}
+            failure = next((result for result in query_results.values() if isinstance(result, Exception)), None)
+            if failure is not None:
+                outputs.append({"error": f"Error querying APIs: {str(failure)}"})
+            else:
+                outputs.append(query_results)
+        return outputs
+    
+    def _task_identity(self, task: Tuple[str, str, Callable, Tuple]) -> Tuple:
+        """Key under which two planned tasks fetch the same data"""
+        key, _, fetch, args = task
+        if fetch == self.get_yahoo_finance_price_history:
+            # Different wordings of the same time frame resolve to the same window
+            ticker, time_frame = args
+            return key, resolve_window(time_frame)
+        return key, fetch.__name__
+    
+    def _run_tasks(self, tasks: List[Tuple[str, str, Callable, Tuple]], return_exceptions: bool = False) -> List[Any]:
+        """Run planned tasks, sequentially or fanned out, returning results in plan order
+        
+        With return_exceptions, a task that raises yields its exception in place
+        of a result (as with asyncio.gather) instead of failing the whole plan.
+        """
+        if self.execution_mode == "sequential" or len(tasks) <= 1:
+            results = []
+            for _, _, fetch, args in tasks:
+                try:
+                    results.append(fetch(*args))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+            return results
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            # Each task carries the caller's context so its metrics land in the caller's trace
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._run_limited, provider, fetch, args)
+                for _, provider, fetch, args in tasks
+            ]
+            # Collect in plan order so the results dict matches the sequential layout
+            results = []
+            for future in futures:
+                error = future.exception()
+                if error is None:
+                    results.append(future.result())
+                elif return_exceptions and isinstance(error, Exception):
+                    results.append(error)
+                else:
+                    raise error
+            return results
+    
+    def _plan_tasks(self, query_params: Dict) -> List[Tuple[str, str, Callable, Tuple]]:
+        """Expand the query parameters into (result_key, provider, fetch, args) tasks
+        
+        A task without a provider takes its providers' concurrency slots itself.
+        """
+        tasks = []
         apis_to_query = query_params.get("apis_to_query", [])
         
         for api in apis_to_query:
-            if api == "alpha_vantage_fundamentals":
-                for company in query_params["companies"]:
-                    ticker = company["ticker"]
-                    results[f"{ticker}_fundamentals"] = self.get_alpha_vantage_fundamentals(ticker)
+            for company in query_params["companies"]:
+                ticker = company["ticker"]
+                if api == "alpha_vantage_fundamentals":
+                    tasks.append((f"{ticker}_fundamentals", "alpha_vantage",
+                                  self.get_alpha_vantage_fundamentals, (ticker,)))
                     
-            elif api == "yahoo_finance_summary":
-                for company in query_params["companies"]:
-                    ticker = company["ticker"]
-                    results[f"{ticker}_summary"] = self.get_yahoo_finance_summary(ticker)
+                elif api == "yahoo_finance_summary":
+                    tasks.append((f"{ticker}_summary", "yahoo",
+                                  self.get_yahoo_finance_summary, (ticker,)))
                     
-            elif api == "yahoo_finance_price":
-                for company in query_params["companies"]:
-                    ticker = company["ticker"]
+                elif api == "yahoo_finance_price":
                     time_frame = query_params["time_frame"]
-                    results[f"{ticker}_price_history"] = self.get_yahoo_finance_price_history(ticker, time_frame)
+                    tasks.append((f"{ticker}_price_history", "yahoo",
+                                  self.get_yahoo_finance_price_history, (ticker, time_frame)))
                     
-            elif api == "twelve_data_technical":
-                for company in query_params["companies"]:
-                    ticker = company["ticker"]
-                    results[f"{ticker}_technical"] = self.get_twelve_data_technical(ticker)
+                elif api == "twelve_data_technical" and self.technical_source == "local":
+                    # Yahoo prices, with a Twelve Data fallback limited by Twelve Data's own slots
+                    tasks.append((f"{ticker}_technical", None,
+                                  self.get_technical_indicators, (ticker,)))
+                    
+                elif api == "twelve_data_technical":
+                    tasks.append((f"{ticker}_technical", "twelve_data",
+                                  self.get_twelve_data_technical, (ticker,)))
         
-        return results
+        return tasks
+    
+    def _run_limited(self, provider: str, fetch: Callable, args: Tuple) -> Any:
+        """Run a fetch while holding one of the provider's concurrency slots"""
+        semaphore = self.provider_semaphores.get(provider)
+        if semaphore is None:
+            return fetch(*args)
+        with semaphore:
+            return fetch(*args)
+    
+    def _fetch_once(self, cache_key: str, fetch: Callable[[], Any]) -> Any:
+        """Return the cached value, or run fetch once for every concurrent caller of cache_key"""
+        cached = self.cache.get(cache_key)
+        metrics.record_cache("api", cached is not None)
+        if cached is not None:
+            return cached
+        
+        def lead():
+            # A flight that just finished may have filled the cache after our lookup
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            return fetch()
+        
+        return self.single_flight.do(cache_key, lead)
+    
+    def _provider_get(self, provider: str, url: str, params: Dict):
+        """One rate-limited provider request; latency excludes the rate-limit wait"""
+        self.rate_limiter.acquire(provider)
+        with metrics.timer("provider_request_seconds", provider=provider):
+            return self.transport.get(url, params=params)
+    
+    async def _aprovider_get(self, provider: str, url: str, params: Dict):
+        await self.rate_limiter.acquire_async(provider)
+        with metrics.timer("provider_request_seconds", provider=provider):
+            return await self.async_transport.get(url, params=params)
     
     def get_alpha_vantage_fundamentals(self, ticker: str) -> Dict:
         """Get fundamental financial data from Alpha Vantage"""
-        cache_key = f"av_fundamentals_{ticker}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-            
-        base_url = "https://www.alphavantage.co/query"
-        
-        # Income Statement
-        income_params = {
-            "function": "INCOME_STATEMENT",
-            "symbol": ticker,
-            "apikey": self.api_keys["alpha_vantage"]
-        }
-        income_response = requests.get(base_url, params=income_params)
-        income_data = income_response.json()
-        
-        # Balance Sheet
-        balance_params = {
-            "function": "BALANCE_SHEET",
-            "symbol": ticker,
-            "apikey": self.api_keys["alpha_vantage"]
-        }
-        balance_response = requests.get(base_url, params=balance_params)
-        balance_data = balance_response.json()
-        
-        # Cash Flow
-        cash_flow_params = {
-            "function": "CASH_FLOW",
-            "symbol": ticker,
-            "apikey": self.api_keys["alpha_vantage"]
-        }
-        cash_flow_response = requests.get(base_url, params=cash_flow_params)
-        cash_flow_data = cash_flow_response.json()
-        
-        # Overview
-        overview_params = {
-            "function": "OVERVIEW",
-            "symbol": ticker,
-            "apikey": self.api_keys["alpha_vantage"]
-        }
-        overview_response = requests.get(base_url, params=overview_params)
-        overview_data = overview_response.json()
-        
-        result = {
-            "income_statement": income_data,
-            "balance_sheet": balance_data,
-            "cash_flow": cash_flow_data,
-            "overview": overview_data
-        }
+        return self._fetch_once(f"av_fundamentals_{ticker}", lambda: self._fetch_alpha_vantage_fundamentals(ticker))
+    
+    def _fetch_alpha_vantage_fundamentals(self, ticker: str) -> Dict:
+        base_url = self.base_urls["alpha_vantage"]
         
-        # Cache the result
-        self.cache[cache_key] = result
+        # Income statement, balance sheet, cash flow and overview, one request each
+        result = {}
+        for name, params in self._alpha_vantage_requests(ticker).items():
+            response = self._provider_get("alpha_vantage", base_url, params)
+            result[name] = response.json()
         
+        return self._store_fundamentals(ticker, result)
+    
+    def _alpha_vantage_requests(self, ticker: str) -> Dict[str, Dict]:
+        return {
+            name: {"function": function, "symbol": ticker, "apikey": self.api_keys["alpha_vantage"]}
+            for name, function in AV_FUNCTIONS.items()
+        }
+    
+    def _store_fundamentals(self, ticker: str, result: Dict) -> Dict:
+        # Cache the result, unless a throttling or error notice would be persisted for days
+        if not any(key in data for data in result.values() for key in AV_ERROR_KEYS):
+            self.cache[f"av_fundamentals_{ticker}"] = result
         return result
     
     def get_yahoo_finance_summary(self, ticker: str) -> Dict:
         """Get company summary from Yahoo Finance"""
+        return self._fetch_once(f"yf_summary_{ticker}", lambda: self._fetch_yahoo_finance_summary(ticker))
+    
+    def _fetch_yahoo_finance_summary(self, ticker: str) -> Dict:
         cache_key = f"yf_summary_{ticker}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-            
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            result = {
-                "info": info,
-                "recommendations": stock.recommendations,
-                "major_holders": stock.major_holders,
-                "institutional_holders": stock.institutional_holders,
-                "news": stock.news
-            }
+            self.rate_limiter.acquire("yahoo")
+            with metrics.timer("provider_request_seconds", provider="yahoo"):
+                stock = self.yahoo_client.Ticker(ticker)
+                info = stock.info
+                
+                result = {
+                    "info": info,
+                    "recommendations": stock.recommendations,
+                    "major_holders": stock.major_holders,
+                    "institutional_holders": stock.institutional_holders,
+                    "news": stock.news
+                }
             
             # Cache the result
             self.cache[cache_key] = result
@@ -121,65 +288,165 @@ class EnhancedAPIConnector:
     
     def get_yahoo_finance_price_history(self, ticker: str, time_frame: Dict) -> pd.DataFrame:
         """Get historical price data from Yahoo Finance"""
-        # Determine period and interval based on time frame
-        period = "5y"  # Default to 5 years
-        
-        if time_frame.get("period"):
-            if "day" in time_frame["period"]:
-                period = time_frame["period"].replace("last ", "")
-            elif "week" in time_frame["period"]:
-                period = time_frame["period"].replace("last ", "")
-            elif "month" in time_frame["period"]:
-                period = time_frame["period"].replace("last ", "")
-            elif "year" in time_frame["period"]:
-                period = time_frame["period"].replace("last ", "")
-        
-        cache_key = f"yf_prices_{ticker}_{period}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-            
+        # Serve the requested window from the per-ticker store, fetching only missing ranges
+        start, end = resolve_window(time_frame)
+        
         try:
-            stock = yf.Ticker(ticker)
-            history = stock.history(period=period)
-            
-            # Cache the result
-            self.cache[cache_key] = history
-            
-            return history
+            return self.single_flight.do(
+                f"yf_prices_{ticker}_{start}_{end}",
+                lambda: self.price_store.get(ticker, start, end, lambda s, e: self._fetch_price_range(ticker, s, e))
+            )
         except Exception as e:
             return pd.DataFrame({"error": [str(e)]})
     
+    def _fetch_price_range(self, ticker: str, start: date, end: date) -> pd.DataFrame:
+        """Download daily bars for an inclusive date range"""
+        self.rate_limiter.acquire("yahoo")
+        with metrics.timer("provider_request_seconds", provider="yahoo"):
+            stock = self.yahoo_client.Ticker(ticker)
+            # yfinance treats end as exclusive
+            return stock.history(start=start.isoformat(), end=(end + timedelta(days=1)).isoformat())
+    
+    def get_technical_indicators(self, ticker: str) -> Dict:
+        """Compute SMA/EMA/RSI/MACD from Yahoo price history, falling back to Twelve Data"""
+        history = self._run_limited("yahoo", self.get_yahoo_finance_price_history, (ticker, INDICATOR_LOOKBACK))
+        indicators = compute_indicators({ticker: history}, self.indicator_windows).get(ticker)
+        
+        if indicators is None or any(payload["status"] != "ok" for payload in indicators.values()):
+            return self._run_limited("twelve_data", self.get_twelve_data_technical, (ticker,))
+        return indicators
+    
+    def get_technical_indicators_batch(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Compute indicators for many tickers in one vectorized pass"""
+        histories = {
+            ticker: self.get_yahoo_finance_price_history(ticker, INDICATOR_LOOKBACK) for ticker in tickers
+        }
+        results = compute_indicators(histories, self.indicator_windows)
+        
+        for ticker in tickers:
+            if ticker not in results or any(payload["status"] != "ok" for payload in results[ticker].values()):
+                results[ticker] = self._run_limited("twelve_data", self.get_twelve_data_technical, (ticker,))
+        return results
+    
     def get_twelve_data_technical(self, ticker: str) -> Dict:
         """Get technical indicators from Twelve Data"""
-        cache_key = f"twelve_data_{ticker}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-            
-        base_url = "https://api.twelvedata.com"
-        
+        return self._fetch_once(f"twelve_data_{ticker}", lambda: self._fetch_twelve_data_technical(ticker))
+    
+    def _fetch_twelve_data_technical(self, ticker: str) -> Dict:
         # Get multiple technical indicators
+        results = {}
+        for indicator, (url, params) in self._twelve_data_requests(ticker).items():
+            response = self._provider_get("twelve_data", url, params)
+            results[indicator] = response.json()
+        
+        return self._store_twelve_data(ticker, results)
+    
+    def _store_twelve_data(self, ticker: str, results: Dict) -> Dict:
+        # Cache the result, unless an indicator came back as a throttling or error payload
+        if not any(isinstance(payload, dict) and payload.get("status") == TD_ERROR_STATUS
+                   for payload in results.values()):
+            self.cache[f"twelve_data_{ticker}"] = results
+        return results
+    
+    def _twelve_data_requests(self, ticker: str) -> Dict[str, Tuple[str, Dict]]:
+        base_url = self.base_urls["twelve_data"]
         indicators = {
             "sma": {"endpoint": "/sma", "params": {"symbol": ticker, "interval": "1day", "time_period": 20}},
             "ema": {"endpoint": "/ema", "params": {"symbol": ticker, "interval": "1day", "time_period": 20}},
             "rsi": {"endpoint": "/rsi", "params": {"symbol": ticker, "interval": "1day", "time_period": 14}},
             "macd": {"endpoint": "/macd", "params": {"symbol": ticker, "interval": "1day"}}
         }
+        return {
+            indicator: (base_url + config["endpoint"], {**config["params"], "apikey": self.api_keys["twelve_data"]})
+            for indicator, config in indicators.items()
+        }
+    
+    # Async variants: network waits happen on the event loop, and only yfinance
+    # (which has no async API) and CPU work run on the loop's default executor
+    
+    async def aquery_apis(self, query_params: Dict) -> Dict[str, Any]:
+        """Coroutine version of query_apis; all tasks run concurrently on the event loop"""
+        tasks = self._plan_tasks(query_params)
+        # Every planned get_* fetch has an a-prefixed coroutine twin on this class
+        results = await asyncio.gather(*(
+            self._arun_limited(provider, getattr(self, "a" + fetch.__name__), args)
+            for _, provider, fetch, args in tasks
+        ))
+        return {key: result for (key, _, _, _), result in zip(tasks, results)}
+    
+    async def _arun_limited(self, provider: str, fetch: Callable[..., Awaitable], args: Tuple) -> Any:
+        loop = asyncio.get_running_loop()
+        semaphores = self._async_semaphores.get(loop)
+        if semaphores is None:
+            semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.provider_limits.items()}
+            self._async_semaphores = {l: v for l, v in self._async_semaphores.items() if not l.is_closed()}
+            self._async_semaphores[loop] = semaphores
+        semaphore = semaphores.get(provider)
+        if semaphore is None:
+            return await fetch(*args)
+        async with semaphore:
+            return await fetch(*args)
+    
+    async def _afetch_once(self, cache_key: str, fetch: Callable[[], Awaitable]) -> Any:
+        cached = self.cache.get(cache_key)
+        metrics.record_cache("api", cached is not None)
+        if cached is not None:
+            return cached
         
-        results = {}
+        async def lead():
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            return await fetch()
         
-        for indicator, config in indicators.items():
-            endpoint = config["endpoint"]
-            params = config["params"]
-            params["apikey"] = self.api_keys["twelve_data"]
-            
-            url = base_url + endpoint
-            response = requests.get(url, params=params)
-            results[indicator] = response.json()
-            
-            # Avoid rate limiting
-            time.sleep(0.5)
+        # Shares in-flight fetches with the threaded path as well
+        return await self.single_flight.do_async(cache_key, lead)
+    
+    async def aget_alpha_vantage_fundamentals(self, ticker: str) -> Dict:
+        """Coroutine version of get_alpha_vantage_fundamentals"""
+        return await self._afetch_once(f"av_fundamentals_{ticker}", lambda: self._afetch_alpha_vantage_fundamentals(ticker))
+    
+    async def _afetch_alpha_vantage_fundamentals(self, ticker: str) -> Dict:
+        base_url = self.base_urls["alpha_vantage"]
         
-        # Cache the result
-        self.cache[cache_key] = results
+        async def fetch(params):
+            response = await self._aprovider_get("alpha_vantage", base_url, params)
+            return response.json()
         
-        return results
+        requests = self._alpha_vantage_requests(ticker)
+        payloads = await asyncio.gather(*(fetch(params) for params in requests.values()))
+        return self._store_fundamentals(ticker, dict(zip(requests, payloads)))
+    
+    async def aget_yahoo_finance_summary(self, ticker: str) -> Dict:
+        """Coroutine version of get_yahoo_finance_summary"""
+        return await self._afetch_once(
+            f"yf_summary_{ticker}", lambda: asyncio.to_thread(self._fetch_yahoo_finance_summary, ticker)
+        )
+    
+    async def aget_yahoo_finance_price_history(self, ticker: str, time_frame: Dict) -> pd.DataFrame:
+        """Coroutine version of get_yahoo_finance_price_history"""
+        return await asyncio.to_thread(self.get_yahoo_finance_price_history, ticker, time_frame)
+    
+    async def aget_technical_indicators(self, ticker: str) -> Dict:
+        """Coroutine version of get_technical_indicators"""
+        history = await self._arun_limited(
+            "yahoo", self.aget_yahoo_finance_price_history, (ticker, INDICATOR_LOOKBACK)
+        )
+        indicators = compute_indicators({ticker: history}, self.indicator_windows).get(ticker)
+        
+        if indicators is None or any(payload["status"] != "ok" for payload in indicators.values()):
+            return await self._arun_limited("twelve_data", self.aget_twelve_data_technical, (ticker,))
+        return indicators
+    
+    async def aget_twelve_data_technical(self, ticker: str) -> Dict:
+        """Coroutine version of get_twelve_data_technical"""
+        return await self._afetch_once(f"twelve_data_{ticker}", lambda: self._afetch_twelve_data_technical(ticker))
+    
+    async def _afetch_twelve_data_technical(self, ticker: str) -> Dict:
+        async def fetch(url, params):
+            response = await self._aprovider_get("twelve_data", url, params)
+            return response.json()
+        
+        requests = self._twelve_data_requests(ticker)
+        payloads = await asyncio.gather(*(fetch(url, params) for url, params in requests.values()))
+        return self._store_twelve_data(ticker, dict(zip(requests, payloads)))
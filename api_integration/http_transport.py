@@ -0,0 +1,141 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    # Without httpx the async transport runs the pooled requests session on worker threads
+    httpx = None
+
+# Status codes worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Keep-alive connections kept open per host
+DEFAULT_POOL_SIZES = {
+    "www.alphavantage.co": 8,
+    "api.twelvedata.com": 8
+}
+
+# (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (3.05, 30)
+
+class HTTPTransport:
+    """Connection-pooled HTTP client shared by the API connectors
+
+    One requests.Session keeps TCP+TLS connections alive between calls, each host
+    gets its own pool size, and 429/5xx responses are retried with jittered
+    exponential backoff. Pass a different instance (or any object with a
+    compatible get method) to a connector to point it at a stub server in tests.
+    """
+
+    def __init__(self, pool_sizes: Dict[str, int] = None, default_pool_size: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30.0):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        # Retries are handled in get() so they can use jitter and Retry-After
+        default_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=default_pool_size, max_retries=0)
+        self.session.mount("http://", default_adapter)
+        self.session.mount("https://", default_adapter)
+        for host, size in {**DEFAULT_POOL_SIZES, **(pool_sizes or {})}.items():
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=0)
+            self.session.mount(f"https://{host}", adapter)
+            self.session.mount(f"http://{host}", adapter)
+
+    def _backoff(self, attempt: int, response: Optional[Any]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(self.max_backoff, float(retry_after))
+        # Full jitter keeps many workers from retrying in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def get(self, url: str, params: Dict = None, timeout=None, **kwargs) -> requests.Response:
+        """GET with pooled connections, a default timeout and retries on 429/5xx"""
+        timeout = timeout if timeout is not None else self.timeout
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+            time.sleep(self._backoff(attempt, response))
+
+    def close(self):
+        self.session.close()
+
+class AsyncHTTPTransport(HTTPTransport):
+    """Coroutine counterpart of HTTPTransport with the same pooling and retry policy
+
+    Uses an httpx.AsyncClient per event loop when httpx is installed, so waiting
+    on a provider never holds a thread. Otherwise get() runs the inherited
+    requests session on the loop's default executor.
+    """
+
+    def __init__(self, pool_sizes: Dict[str, int] = None, default_pool_size: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30.0):
+        super().__init__(pool_sizes, default_pool_size, timeout, max_retries, backoff_factor, max_backoff)
+        # One pool for all hosts, sized to the largest per-host pool
+        self.max_connections = max([default_pool_size, *DEFAULT_POOL_SIZES.values(), *(pool_sizes or {}).values()])
+        self._clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+
+    def _httpx_timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    def _client(self):
+        # An AsyncClient's connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            for closed_loop in [l for l in self._clients if l.is_closed()]:
+                del self._clients[closed_loop]
+            client = httpx.AsyncClient(
+                timeout=self._httpx_timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+            self._clients[loop] = client
+        return client
+
+    async def get(self, url: str, params: Dict = None, timeout=None, **kwargs):
+        """Async GET with a default timeout and retries on 429/5xx"""
+        if httpx is None:
+            return await asyncio.to_thread(super().get, url, params=params, timeout=timeout, **kwargs)
+
+        timeout = self._httpx_timeout(timeout if timeout is not None else self.timeout)
+        client = self._client()
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = await client.get(url, params=params, timeout=timeout, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    async def aclose(self):
+        """Close the client owned by the running loop and the fallback session"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        self.close()
@@ -0,0 +1,126 @@
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from api_integration.columnar_store import ColumnarPriceStore
+from monitoring import metrics
+
+# How long today's (possibly still moving) bar is trusted before it is refetched
+DEFAULT_REFRESH_INTERVAL = 15 * 60
+
+class PriceHistoryStore:
+    """Per-ticker daily price series that grows by fetching only missing date ranges"""
+
+    def __init__(self, columns: ColumnarPriceStore = None, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        # Memory-mapped column files, so the series survive restarts and every worker shares one copy
+        self.columns = columns if columns is not None else ColumnarPriceStore()
+        self.refresh_interval = refresh_interval
+
+    def _intervals(self, coverage: Optional[Dict]) -> List[Tuple[date, date, float]]:
+        """Covered (start, end, fetched_at) date intervals, sorted and non-overlapping"""
+        if coverage is None:
+            return []
+        if "intervals" not in coverage:
+            # Single-span coverage written before gaps were tracked
+            return [(date.fromisoformat(coverage["start"]), date.fromisoformat(coverage["end"]), coverage["fetched_at"])]
+        return [(date.fromisoformat(s), date.fromisoformat(e), f) for s, e, f in coverage["intervals"]]
+
+    def _merged(self, intervals: List[Tuple[date, date, float]]) -> List[Tuple[date, date, float]]:
+        merged = []
+        for start, end, fetched_at in sorted(intervals):
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                # The interval reaching further keeps its fetch time; it decides when the last bar goes stale
+                merged[-1] = (merged[-1][0],) + max(merged[-1][1:], (end, fetched_at))
+            else:
+                merged.append((start, end, fetched_at))
+        return merged
+
+    def _missing_ranges(self, coverage: Optional[Dict], start: date, end: date) -> List[Tuple[date, date]]:
+        """Gaps in the held intervals that must be fetched to cover [start, end]"""
+        today = date.today()
+        ranges = []
+        cursor = start
+        for covered_start, covered_end, fetched_at in self._intervals(coverage):
+            # The last covered day may have been fetched intraday; refresh it once it is stale
+            if covered_end >= today and time.time() - fetched_at > self.refresh_interval:
+                covered_end = today - timedelta(days=1)
+            if covered_end < cursor or covered_start > end:
+                continue
+            if covered_start > cursor:
+                ranges.append((cursor, covered_start - timedelta(days=1)))
+            cursor = covered_end + timedelta(days=1)
+
+        if cursor <= end:
+            # Overlap the last held bar so a partial bar is replaced by the final one
+            ranges.append((cursor - timedelta(days=1) if cursor > start else cursor, end))
+        return ranges
+
+    def get(self, ticker: str, start: date, end: date,
+            fetch: Callable[[date, date], pd.DataFrame]) -> pd.DataFrame:
+        """Return bars between start and end (inclusive), fetching only the gaps
+
+        The frame is a read-only view over the store's mapped files.
+        """
+        missing = self._missing_ranges(self.columns.coverage(ticker), start, end)
+        metrics.record_cache("prices", not missing)
+
+        if missing:
+            with self.columns.lock(ticker):
+                # Another thread or worker may have fetched the range while we waited
+                coverage = self.columns.coverage(ticker)
+                missing = self._missing_ranges(coverage, start, end)
+
+                pieces = [self.columns.frame(ticker)] if coverage else []
+                for range_start, range_end in missing:
+                    fetched = fetch(range_start, range_end)
+                    if fetched is not None and not fetched.empty:
+                        # Stored bars are keyed by exchange-local date
+                        pieces.append(fetched.set_axis(pd.DatetimeIndex(fetched.index).tz_localize(None).normalize()))
+
+                if missing and pieces:
+                    frame = pd.concat(pieces)
+                    frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+                    # Only a fetch that reached end refreshes the bar at end
+                    fetched_at = time.time() if missing[-1][1] == end else 0.0
+                    intervals = self._merged(self._intervals(coverage) + [(start, end, fetched_at)])
+                    self.columns.write(ticker, frame, {
+                        "intervals": [[s.isoformat(), e.isoformat(), f] for s, e, f in intervals]
+                    })
+
+        return self.columns.frame(ticker, start, end)
+
+def resolve_window(time_frame: Dict, today: Optional[date] = None) -> Tuple[date, date]:
+    """Turn a query time frame into an inclusive (start, end) date window"""
+    today = today or date.today()
+    time_frame = time_frame or {}
+    if time_frame.get("start_date"):
+        start = date.fromisoformat(time_frame["start_date"])
+        end = date.fromisoformat(time_frame["end_date"]) if time_frame.get("end_date") else today
+        end = min(end, today)
+        # A window that starts in the future (e.g. an LLM-refined typo) falls back to the default
+        if start <= end:
+            return start, end
+
+    period = time_frame.get("period")
+
+    # Default to 5 years, matching the previous period="5y" behaviour
+    offset = pd.DateOffset(years=5)
+    if period:
+        parts = period.replace("last ", "").split()
+        if len(parts) == 2 and parts[0].isdigit():
+            count, unit = int(parts[0]), parts[1].rstrip("s")
+            if unit == "quarter":
+                offset = pd.DateOffset(months=3 * count)
+            elif unit == "day":
+                offset = pd.DateOffset(days=count)
+            elif unit == "week":
+                offset = pd.DateOffset(weeks=count)
+            elif unit == "month":
+                offset = pd.DateOffset(months=count)
+            elif unit == "year":
+                offset = pd.DateOffset(years=count)
+
+    start = (pd.Timestamp(today) - offset).date()
+    return start, today
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+# Requests allowed per provider; None means no limit for that window
+DEFAULT_RATE_LIMITS = {
+    "alpha_vantage": {"per_minute": 5, "per_day": 500},
+    "twelve_data": {"per_minute": 8, "per_day": 800},
+    "yahoo": {"per_minute": 60, "per_day": None}
+}
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than the caller allows"""
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_per_second
+
+    def consume(self):
+        # Tokens may go negative: the deficit is a reservation later callers queue behind
+        self.tokens -= 1
+
+class RateLimiter:
+    """Thread-safe token buckets per provider, with per-minute and per-day windows"""
+
+    def __init__(self, limits: Dict[str, Dict[str, Optional[int]]] = None):
+        self.limits = {provider: dict(config) for provider, config in DEFAULT_RATE_LIMITS.items()}
+        for provider, config in (limits or {}).items():
+            self.limits.setdefault(provider, {}).update(config)
+
+        self._lock = threading.Lock()
+        self.buckets = {provider: self._create_buckets(config) for provider, config in self.limits.items()}
+
+    def _create_buckets(self, config: Dict[str, Optional[int]]):
+        buckets = []
+        if config.get("per_minute"):
+            buckets.append(TokenBucket(config["per_minute"], config["per_minute"] / 60.0))
+        if config.get("per_day"):
+            buckets.append(TokenBucket(config["per_day"], config["per_day"] / 86400.0))
+        return buckets
+
+    def _reserve(self, provider: str, timeout: Optional[float]) -> float:
+        """Reserve a slot for one request and return how long the caller must wait"""
+        buckets = self.buckets.get(provider)
+        if not buckets:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            wait = max(bucket.wait_time(now) for bucket in buckets)
+            if timeout is not None and wait > timeout:
+                raise RateLimitExceeded(
+                    f"{provider} rate limit requires waiting {wait:.1f}s (timeout {timeout}s)"
+                )
+            for bucket in buckets:
+                bucket.consume()
+            return wait
+
+    def acquire(self, provider: str, timeout: Optional[float] = None):
+        """Block until a request to the provider is allowed"""
+        wait = self._reserve(provider, timeout)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, provider: str, timeout: Optional[float] = None):
+        """Coroutine version of acquire that yields to the event loop while waiting"""
+        wait = self._reserve(provider, timeout)
+        if wait > 0:
+            await asyncio.sleep(wait)
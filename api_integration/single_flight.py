@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one in-flight execution
+
+    Threads and coroutines share the same table of in-flight calls, so an asyncio
+    caller can join a fetch a worker thread started and vice versa.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        # The event loop only keeps weak references to tasks
+        self._tasks = set()
+
+    def _join_or_lead(self, key: str):
+        """Return (future, is_leader) for the key"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all threads asking for key at the same time"""
+        future, is_leader = self._join_or_lead(key)
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Coroutine version of do; followers await the leader without blocking the loop
+
+        The fetch runs as its own task and every caller awaits it through a
+        shield, so cancelling one caller (a timeout or a dropped client) never
+        cancels the fetch the others are waiting on.
+        """
+        future, is_leader = self._join_or_lead(key)
+        if is_leader:
+            task = asyncio.ensure_future(fn())
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+        # Without the shield, cancelling the wrapper would cancel the shared future too
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _settle(self, key: str, future: Future, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            self._finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, result=task.result())
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
@@ -0,0 +1,311 @@
+"""Offline benchmarks for the financial analysis pipeline
+
+A local HTTP stub serves the providers from synthetic fixtures: payloads
+shaped like Alpha Vantage and Twelve Data responses with made-up numbers, not
+recordings. yfinance and the LLM are replaced by deterministic fakes with
+configurable latency, so runs need no API keys or network and are comparable
+between commits.
+
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --save-baseline
+    python -m benchmarks.run_benchmarks --fail-on-regression
+
+Timings depend on the machine, so no baseline is committed: save one on the
+machine that runs the comparison. --fail-on-regression fails when there is no
+baseline, or when a scenario has no baseline entry, instead of passing silently.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from agents.helper_agent import create_financial_analysis_graph, generate_visualizations
+from api_integration.cache import TieredCache
+from api_integration.enhanced_api_connector import EnhancedAPIConnector
+from api_integration.rate_limiter import RateLimiter
+from benchmarks.stubs import FakeLLM, FakeYahoo, StubProviderServer, ticker_symbols, write_listings
+from query_processing.enhanced_query_processor import EnhancedQueryProcessor
+from query_processing.model_registry import DEFAULT_MODEL, current_rss_bytes
+from visualizations.chart_rendering import shutdown_render_pool
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SCENARIOS = ("query_processing", "query_apis", "graph", "visualizations", "concurrent")
+
+# 100-ticker runs draw hundreds of figures per call; they are closed after each run
+plt.rcParams["figure.max_open_warning"] = 0
+
+# The stub has no quotas, so only the connector's concurrency limits shape the fan-out
+UNLIMITED = {provider: {"per_minute": None, "per_day": None} for provider in ("alpha_vantage", "twelve_data", "yahoo")}
+ALL_APIS = ["alpha_vantage_fundamentals", "yahoo_finance_summary", "twelve_data_technical", "yahoo_finance_price"]
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def summarize(name: str, latencies: List[float], wall_seconds: float, **extra) -> Dict:
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "name": name,
+        "operations": len(latencies),
+        "throughput_per_s": len(latencies) / wall_seconds if wall_seconds else 0.0,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "rss_bytes": current_rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        **extra
+    }
+
+def measure(name: str, operation: Callable[[], object], repeats: int, **extra) -> Dict:
+    """Run operation repeats times back to back"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeats):
+        began = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - began)
+    return summarize(name, latencies, time.perf_counter() - started, **extra)
+
+def measure_concurrent(name: str, operations: List[Callable[[], object]], workers: int, **extra) -> Dict:
+    """Run operations on a thread pool; latency is per operation, throughput over the whole batch"""
+    def timed(operation):
+        began = time.perf_counter()
+        operation()
+        return time.perf_counter() - began
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(executor.map(timed, operations))
+    return summarize(name, latencies, time.perf_counter() - started, workers=workers, **extra)
+
+def measure_async(name: str, coroutines: List[Callable[[], object]], **extra) -> Dict:
+    """Run coroutine factories concurrently on one event loop"""
+    async def timed(factory):
+        began = time.perf_counter()
+        await factory()
+        return time.perf_counter() - began
+
+    async def run_all():
+        return await asyncio.gather(*(timed(factory) for factory in coroutines))
+
+    started = time.perf_counter()
+    latencies = asyncio.run(run_all())
+    return summarize(name, latencies, time.perf_counter() - started, **extra)
+
+class Bench:
+    def __init__(self, args, stub: StubProviderServer, workdir: str):
+        self.args = args
+        self.stub = stub
+        self.workdir = workdir
+        self.yahoo = FakeYahoo(latency=args.provider_latency)
+        self.llm = FakeLLM(latency=args.llm_latency, tokens_per_second=args.llm_tokens_per_second)
+        self.listings_path = os.path.join(workdir, "listings.csv")
+        self.symbols = ticker_symbols(max(args.tickers + [args.concurrency]))
+        self._query_processor = None
+
+    def connector(self) -> EnhancedAPIConnector:
+        # A fresh in-memory cache and price directory per connector keep "cold" runs cold
+        return EnhancedAPIConnector(
+            {"alpha_vantage": "benchmark", "twelve_data": "benchmark"},
+            rate_limiter=RateLimiter(UNLIMITED), cache=TieredCache(disk=None),
+            base_urls=self.stub.base_urls, yahoo_client=self.yahoo,
+            price_dir=tempfile.mkdtemp(dir=self.workdir)
+        )
+
+    @property
+    def query_processor(self) -> EnhancedQueryProcessor:
+        if self._query_processor is None:
+            self._query_processor = EnhancedQueryProcessor(
+                None, model_name=self.args.spacy_model, ticker_listings_path=self.listings_path, llm=self.llm
+            )
+        return self._query_processor
+
+    def query(self, tickers: List[str]) -> str:
+        return f"Analyze the revenue and ebitda of {', '.join(tickers)} over the last 2 years"
+
+    def parameters(self, tickers: List[str]) -> Dict:
+        return {
+            "companies": [{"name": ticker, "ticker": ticker} for ticker in tickers],
+            "time_frame": {"period": "last 2 years"},
+            "metrics": ["revenue", "ebitda"],
+            "analysis_type": "analysis",
+            "apis_to_query": ALL_APIS
+        }
+
+    def state(self, query: str) -> Dict:
+        return {"query": query, "query_parameters": {}, "api_results": {}, "sec_analysis": {},
+                "market_analysis": {}, "technical_analysis": {}, "report": {}, "error": ""}
+
+    def run_query_processing(self) -> List[Dict]:
+        results = []
+        processor = self.query_processor
+        # Warm up so model loading and matcher setup stay out of the per-query latencies
+        processor.process_query(self.query(self.symbols[:1]))
+        for count in self.args.tickers:
+            query = self.query(self.symbols[:count])
+            results.append(measure(f"query_processing/{count}_tickers", lambda: processor.process_query(query),
+                                   self.args.repeats))
+        queries = [self.query(self.symbols[i:i + 1]) for i in range(self.args.concurrency)]
+        results.append(measure(f"query_processing/batch_{len(queries)}", lambda: processor.process_queries(queries), 1))
+        return results
+
+    def run_query_apis(self) -> List[Dict]:
+        results = []
+        for count in self.args.tickers:
+            parameters = self.parameters(self.symbols[:count])
+            results.append(measure(f"query_apis/{count}_tickers/cold",
+                                   lambda: self.connector().query_apis(parameters), self.args.repeats))
+            warm = self.connector()
+            warm.query_apis(parameters)
+            results.append(measure(f"query_apis/{count}_tickers/warm",
+                                   lambda: warm.query_apis(parameters), self.args.repeats))
+        return results
+
+    def run_graph(self) -> List[Dict]:
+        results = []
+        for count in self.args.tickers:
+            query = self.query(self.symbols[:count])
+
+            def run():
+                graph = create_financial_analysis_graph(self.connector(), self.query_processor, self.llm)
+                final_state = graph.invoke(self.state(query))
+                if final_state["error"]:
+                    raise RuntimeError(final_state["error"])
+
+            results.append(measure(f"graph/{count}_tickers", run, self.args.repeats))
+        return results
+
+    def run_visualizations(self) -> List[Dict]:
+        results = []
+        connector = self.connector()
+        for count in self.args.tickers:
+            api_results = connector.query_apis(self.parameters(self.symbols[:count]))
+            for output_format in ("png", None):
+                label = output_format or "figure"
+
+                def run():
+                    generate_visualizations(api_results, {}, output_format=output_format)
+                    plt.close("all")
+
+                results.append(measure(f"visualizations/{count}_tickers/{label}", run, self.args.repeats))
+        shutdown_render_pool()
+        return results
+
+    def run_concurrent(self) -> List[Dict]:
+        queries = [self.query(self.symbols[i:i + 1]) for i in range(self.args.concurrency)]
+        connector = self.connector()
+        graph = create_financial_analysis_graph(connector, self.query_processor, self.llm)
+        results = [measure_concurrent(
+            f"concurrent/{len(queries)}_queries/threads",
+            [lambda query=query: graph.invoke(self.state(query)) for query in queries],
+            workers=self.args.workers
+        )]
+
+        connector = self.connector()
+        async_graph = create_financial_analysis_graph(connector, self.query_processor, self.llm, use_async=True)
+        results.append(measure_async(
+            f"concurrent/{len(queries)}_queries/async",
+            [lambda query=query: async_graph.ainvoke(self.state(query)) for query in queries]
+        ))
+        return results
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[Dict]:
+    """Per-scenario ratios against the baseline; regressions exceed the tolerance"""
+    comparisons = []
+    for result in results:
+        reference = baseline.get(result["name"])
+        if reference is None:
+            continue
+        p50_ratio = result["p50_ms"] / reference["p50_ms"] if reference["p50_ms"] else 1.0
+        throughput_ratio = (result["throughput_per_s"] / reference["throughput_per_s"]
+                            if reference["throughput_per_s"] else 1.0)
+        comparisons.append({
+            "name": result["name"],
+            "p50_ratio": p50_ratio,
+            "throughput_ratio": throughput_ratio,
+            "regression": p50_ratio > 1 + tolerance or throughput_ratio < 1 - tolerance
+        })
+    return comparisons
+
+def print_report(results: List[Dict], comparisons: List[Dict]):
+    by_name = {comparison["name"]: comparison for comparison in comparisons}
+    print(f"{'scenario':<44} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}  vs baseline")
+    for result in results:
+        comparison = by_name.get(result["name"])
+        versus = ""
+        if comparison:
+            versus = f"p50 x{comparison['p50_ratio']:.2f}" + ("  REGRESSION" if comparison["regression"] else "")
+        print(f"{result['name']:<44} {result['throughput_per_s']:>9.2f} {result['p50_ms']:>9.1f} "
+              f"{result['p99_ms']:>9.1f} {result['peak_rss_bytes'] / 2 ** 20:>8.0f}  {versus}")
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--tickers", nargs="+", type=int, default=[1, 10, 100], help="tickers per query")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="queries in the concurrent scenarios")
+    parser.add_argument("--workers", type=int, default=16, help="threads for the threaded concurrent scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM time to first token (s)")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--provider-latency", type=float, default=0.05, help="stub provider round trip (s)")
+    parser.add_argument("--spacy-model", default=DEFAULT_MODEL, help="spaCy model name or path")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    if args.fail_on_regression and not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; create one with --save-baseline first")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir, StubProviderServer(latency=args.provider_latency) as stub:
+        bench = Bench(args, stub, workdir)
+        write_listings(bench.listings_path, bench.symbols)
+        for scenario in args.scenarios:
+            results.extend(getattr(bench, f"run_{scenario}")())
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as stored:
+            baseline = {result["name"]: result for result in json.load(stored)["results"]}
+    comparisons = compare(results, baseline, args.tolerance)
+    print_report(results, comparisons)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": results,
+        "comparisons": comparisons
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.fail_on_regression and not args.save_baseline:
+        missing = [result["name"] for result in results if result["name"] not in baseline]
+        if missing:
+            print(f"No baseline entry for: {', '.join(missing)}; re-run with --save-baseline", file=sys.stderr)
+            return 1
+        if any(comparison["regression"] for comparison in comparisons):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
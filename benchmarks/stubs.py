@@ -0,0 +1,247 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import AsyncIterator, Dict, Iterator, List
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from query_processing.ticker_index import AMBIGUOUS_TICKERS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Sections the report prompt asks for
+REPORT_SECTIONS = [
+    "executive_summary", "financial_performance_analysis", "market_context_and_positioning",
+    "technical_outlook", "conclusion_and_recommendations"
+]
+
+def load_fixture_templates() -> Dict[str, Dict[str, str]]:
+    """Synthetic provider responses as JSON text with a {symbol} placeholder
+
+    The payloads follow the providers' response shapes with made-up, internally
+    consistent numbers; they are not recordings of real responses.
+    """
+    templates = {}
+    for provider in ("alpha_vantage", "twelve_data"):
+        with open(os.path.join(FIXTURES_DIR, f"{provider}.json")) as fixture:
+            templates[provider] = {name: json.dumps(body) for name, body in json.load(fixture).items()}
+    return templates
+
+class StubProviderServer:
+    """Local HTTP server answering Alpha Vantage and Twelve Data requests from synthetic fixtures
+
+    Use as a context manager; base_urls is ready to pass to EnhancedAPIConnector.
+    latency is added to every response to stand in for the provider's round trip.
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1"):
+        self.latency = latency
+        self.templates = load_fixture_templates()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_urls(self) -> Dict[str, str]:
+        host, port = self.server.server_address[:2]
+        return {"alpha_vantage": f"http://{host}:{port}/query", "twelve_data": f"http://{host}:{port}"}
+
+    def _respond(self, path: str, params: Dict[str, str]) -> str:
+        symbol = params.get("symbol", "")
+        if path == "/query":
+            template = self.templates["alpha_vantage"].get(params.get("function", ""))
+            if template is None:
+                return json.dumps({"Error Message": "Invalid API call."})
+        else:
+            template = self.templates["twelve_data"].get(path.lstrip("/"))
+            if template is None:
+                return json.dumps({"code": 404, "message": "Not found", "status": "error"})
+        return template.replace("{symbol}", symbol)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = stub._respond(url.path, params).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "StubProviderServer":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-provider", daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+class FakeTicker:
+    """Stand-in for yfinance.Ticker with deterministic prices per symbol"""
+
+    def __init__(self, symbol: str, latency: float = 0.0):
+        self.symbol = symbol
+        self.latency = latency
+        self._seed = sum(ord(c) * 31 ** i for i, c in enumerate(symbol)) % (2 ** 32)
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def info(self) -> Dict:
+        self._wait()
+        return {
+            "shortName": f"{self.symbol} Holdings Inc", "sector": "Technology", "industry": "Software",
+            "marketCap": 250_000_000_000, "trailingPE": 28.4, "forwardPE": 24.1,
+            "recommendationKey": "buy", "recommendationMean": 2.1, "numberOfAnalystOpinions": 31,
+            "targetMeanPrice": 215.0, "currentPrice": 198.5, "fiftyTwoWeekHigh": 230.1,
+            "fiftyTwoWeekLow": 150.2, "beta": 1.1
+        }
+
+    @property
+    def recommendations(self) -> pd.DataFrame:
+        return pd.DataFrame({"period": ["0m", "-1m"], "strongBuy": [8, 7], "buy": [15, 16],
+                             "hold": [6, 6], "sell": [1, 1], "strongSell": [0, 0]})
+
+    @property
+    def major_holders(self) -> pd.DataFrame:
+        return pd.DataFrame({"Value": [0.0007, 0.61]}, index=["insidersPercentHeld", "institutionsPercentHeld"])
+
+    @property
+    def institutional_holders(self) -> pd.DataFrame:
+        return pd.DataFrame({"Holder": ["Vanguard Group Inc", "Blackrock Inc."], "pctHeld": [0.09, 0.07]})
+
+    @property
+    def news(self):
+        return [{"title": f"{self.symbol} reports quarterly results", "publisher": "Newswire"}]
+
+    def history(self, start: str = None, end: str = None, **kwargs) -> pd.DataFrame:
+        self._wait()
+        # yfinance treats end as exclusive and returns exchange-local timestamps
+        dates = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), tz="America/New_York")
+        # Prices depend only on symbol and date, so overlapping requests agree
+        day_numbers = (dates.tz_localize(None) - pd.Timestamp("2000-01-01")).days.to_numpy()
+        wave = np.sin(day_numbers * 0.37 + self._seed % 1000) * 0.1 + np.cos(day_numbers * 0.011) * 0.02
+        close = 100 * np.exp(day_numbers * 0.0002 + wave)
+        return pd.DataFrame({
+            "Open": close * 0.995, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+            "Volume": (1_000_000 + (day_numbers * 7919 + self._seed) % 500_000).astype(np.int64),
+            "Dividends": 0.0, "Stock Splits": 0.0
+        }, index=dates.rename("Date"))
+
+class FakeYahoo:
+    """Module-like stand-in for yfinance, passed to EnhancedAPIConnector(yahoo_client=...)"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def Ticker(self, symbol: str) -> FakeTicker:
+        return FakeTicker(symbol, self.latency)
+
+class FakeLLM:
+    """LLM stand-in answering the pipeline's prompts with well-formed JSON
+
+    latency is the time to the first token and tokens_per_second the decoding
+    speed, so both blocking calls and streams take a realistic amount of time.
+    """
+
+    model_name = "fake-llm"
+    temperature = 0
+
+    def __init__(self, latency: float = 0.5, tokens_per_second: float = 200.0, chunk_chars: int = 16):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if "Extract the time frame" in prompt:
+            return json.dumps({"start_date": "None", "end_date": "None", "period": "None"})
+        if "Return your report as a JSON" in prompt:
+            report = {section: f"Benchmark {section.replace('_', ' ')}." for section in REPORT_SECTIONS}
+            report["visualizations"] = ["price_chart", "volume_chart", "revenue_chart"]
+            return json.dumps(report)
+        match = re.search(r"JSON with keys for (.+?)\.", prompt)
+        keys = re.split(r",\s*(?:and\s+)?|\s+and\s+", match.group(1)) if match else ["analysis"]
+        return json.dumps({key.strip(): f"Benchmark {key.strip()} for this query." for key in keys})
+
+    def _decode_seconds(self, text: str) -> float:
+        # Roughly 4 characters per token
+        return len(text) / 4 / self.tokens_per_second
+
+    def _chunks(self, text: str):
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+
+    def __call__(self, prompt: str) -> str:
+        answer = self._answer(prompt)
+        time.sleep(self.latency + self._decode_seconds(answer))
+        return answer
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        return self(prompt)
+
+    async def ainvoke(self, prompt: str, **kwargs) -> str:
+        answer = self._answer(prompt)
+        await asyncio.sleep(self.latency + self._decode_seconds(answer))
+        return answer
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        answer = self._answer(prompt)
+        time.sleep(self.latency)
+        for chunk in self._chunks(answer):
+            time.sleep(self._decode_seconds(chunk))
+            yield chunk
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        answer = self._answer(prompt)
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(answer):
+            await asyncio.sleep(self._decode_seconds(chunk))
+            yield chunk
+
+def ticker_symbols(count: int) -> List[str]:
+    """Distinct three-letter symbols (AAA, AAB, ...) that are not everyday abbreviations"""
+    symbols = []
+    for i in range(26 ** 3):
+        symbol = "".join(chr(ord("A") + (i // 26 ** p) % 26) for p in (2, 1, 0))
+        if symbol not in AMBIGUOUS_TICKERS:
+            symbols.append(symbol)
+        if len(symbols) == count:
+            break
+    return symbols
+
+def write_listings(path: str, symbols: List[str]):
+    """Listings CSV for EnhancedQueryProcessor(ticker_listings_path=...)"""
+    with open(path, "w") as listings:
+        listings.write("symbol,name\n")
+        for symbol in symbols:
+            listings.write(f"{symbol},{symbol} Holdings Inc\n")
@@ -1,9 +1,142 @@
 import pandas as pd
+import numpy as np
+from typing import Dict, List, Any
+
+# Alpha Vantage statement payloads and the report lists inside them
+STATEMENTS = ("income_statement", "balance_sheet", "cash_flow")
+REPORT_KEYS = {"annual": "annualReports", "quarterly": "quarterlyReports"}
+
+# Text columns kept as categoricals; everything else in a statement is numeric
+CATEGORICAL_COLUMNS = ("reportedCurrency",)
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
 
 class DataProcessor:
     def normalize_data(self, data: Dict) -> pd.DataFrame:
         return pd.DataFrame([data])
 
-data_processor = DataProcessor()
-normalized_data = data_processor.normalize_data({"company": "TSLA", "metric": "revenue", "value": 1000000})
-print(normalized_data)
+    def normalize_fundamentals(self, fundamentals: Dict[str, Dict], frequency: str = "annual") -> pd.DataFrame:
+        """Turn Alpha Vantage statements for many tickers into one typed frame
+
+        The result is indexed by (ticker, fiscal_date), sorted oldest first, with
+        one float64 column per line item across the income statement, balance
+        sheet and cash flow, and categorical ticker/currency columns.
+        """
+        report_key = REPORT_KEYS[frequency]
+        statement_frames = []
+        for statement in STATEMENTS:
+            records = [
+                {**report, "ticker": ticker}
+                for ticker, payload in fundamentals.items()
+                if isinstance(payload, dict)
+                for report in payload.get(statement, {}).get(report_key, [])
+            ]
+            if not records:
+                continue
+            frame = pd.DataFrame.from_records(records)
+            frame["fiscal_date"] = pd.to_datetime(frame.pop("fiscalDateEnding"), errors="coerce")
+            frame = frame.dropna(subset=["fiscal_date"]).set_index(["ticker", "fiscal_date"])
+            # concat aligns on the index, which must be unique; keep the first report per period
+            frame = frame[~frame.index.duplicated(keep="first")]
+            if statement_frames:
+                # Line items like reportedCurrency repeat across statements
+                frame = frame.drop(columns=[c for c in frame.columns if c in statement_frames[0].columns])
+            statement_frames.append(frame)
+
+        if not statement_frames:
+            return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=["ticker", "fiscal_date"]))
+
+        return self._typed(pd.concat(statement_frames, axis=1, join="outer"))
+
+    def _typed(self, frame: pd.DataFrame) -> pd.DataFrame:
+        numeric_columns = [c for c in frame.columns if c not in CATEGORICAL_COLUMNS]
+        # Alpha Vantage encodes numbers as strings and missing values as "None"
+        typed = frame[numeric_columns].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+        for column in CATEGORICAL_COLUMNS:
+            if column in frame.columns:
+                typed[column] = frame[column].astype("category")
+
+        tickers = typed.index.get_level_values("ticker")
+        dates = typed.index.get_level_values("fiscal_date")
+        typed.index = pd.MultiIndex.from_arrays(
+            [pd.CategoricalIndex(tickers, name="ticker"), pd.DatetimeIndex(dates, name="fiscal_date")]
+        )
+        return typed.sort_index()
+
+    def normalize_prices(self, prices: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Stack per-ticker OHLCV frames into one frame indexed by (ticker, date)"""
+        frames = {
+            ticker: frame for ticker, frame in prices.items()
+            if isinstance(frame, pd.DataFrame) and "Close" in frame.columns and not frame.empty
+        }
+        if not frames:
+            return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=["ticker", "date"]))
+
+        columns = [c for c in PRICE_COLUMNS if all(c in f.columns for f in frames.values())]
+        stacked = pd.concat(
+            {
+                ticker: frame[columns + (["Volume"] if "Volume" in frame.columns else [])].set_axis(
+                    pd.DatetimeIndex(frame.index).tz_localize(None).normalize(), axis=0
+                )
+                for ticker, frame in frames.items()
+            },
+            names=["ticker", "date"]
+        )
+        stacked[columns] = stacked[columns].astype(np.float64)
+        if "Volume" in stacked.columns:
+            stacked["Volume"] = stacked["Volume"].fillna(0).astype(np.int64)
+        stacked.index = stacked.index.set_levels(
+            pd.CategoricalIndex(stacked.index.levels[0], name="ticker"), level="ticker"
+        )
+        return stacked.sort_index()
+
+    def normalize_api_results(self, api_results: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+        """Normalize everything in api_results once so consumers share typed frames"""
+        fundamentals = {k[:-len("_fundamentals")]: v for k, v in api_results.items() if k.endswith("_fundamentals")}
+        prices = {k[:-len("_price_history")]: v for k, v in api_results.items() if k.endswith("_price_history")}
+        return {
+            "annual": self.normalize_fundamentals(fundamentals, "annual"),
+            "quarterly": self.normalize_fundamentals(fundamentals, "quarterly"),
+            "prices": self.normalize_prices(prices)
+        }
+
+    def compute_ratios(self, statements: pd.DataFrame) -> pd.DataFrame:
+        """Profitability, leverage and cash-flow ratios for every (ticker, fiscal_date) row at once"""
+        def column(name: str) -> pd.Series:
+            if name in statements.columns:
+                return statements[name]
+            return pd.Series(np.nan, index=statements.index)
+
+        revenue = column("totalRevenue")
+        equity = column("totalShareholderEquity")
+        debt = column("shortLongTermDebtTotal").fillna(column("longTermDebt"))
+        free_cash_flow = column("operatingCashflow") - column("capitalExpenditures")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = pd.DataFrame({
+                "gross_margin": column("grossProfit") / revenue,
+                "operating_margin": column("operatingIncome") / revenue,
+                "net_margin": column("netIncome") / revenue,
+                "return_on_equity": column("netIncome") / equity,
+                "debt_to_equity": debt / equity,
+                "current_ratio": column("totalCurrentAssets") / column("totalCurrentLiabilities"),
+                "free_cash_flow": free_cash_flow,
+                "free_cash_flow_margin": free_cash_flow / revenue
+            }, index=statements.index)
+        return ratios.replace([np.inf, -np.inf], np.nan)
+
+    def compute_growth(self, frame: pd.DataFrame, columns: List[str] = None, periods: int = 1) -> pd.DataFrame:
+        """Period-over-period growth per ticker, computed for all tickers in one grouped pass"""
+        columns = columns or ["totalRevenue", "grossProfit", "operatingIncome", "netIncome", "operatingCashflow"]
+        columns = [c for c in columns if c in frame.columns]
+        growth = frame.sort_index()[columns].groupby(level="ticker", observed=True).pct_change(periods, fill_method=None)
+        return growth.replace([np.inf, -np.inf], np.nan).add_suffix("_growth")
+
+    def compare(self, frame: pd.DataFrame, column: str) -> pd.DataFrame:
+        """One column side by side across tickers (dates as rows, tickers as columns)"""
+        return frame[column].unstack("ticker")
+
+if __name__ == "__main__":
+    data_processor = DataProcessor()
+    normalized_data = data_processor.normalize_data({"company": "TSLA", "metric": "revenue", "value": 1000000})
+    print(normalized_data)
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any
+
+# Same windows the Twelve Data requests used
+DEFAULT_WINDOWS = {
+    "sma": 20,
+    "ema": 20,
+    "rsi": 14,
+    "macd": (12, 26, 9)
+}
+
+# Number of most recent values returned per indicator, like Twelve Data's default outputsize
+DEFAULT_OUTPUT_SIZE = 30
+
+INDICATOR_NAMES = {
+    "sma": "SMA - Simple Moving Average",
+    "ema": "EMA - Exponential Moving Average",
+    "rsi": "RSI - Relative Strength Index",
+    "macd": "MACD - Moving Average Convergence Divergence"
+}
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average along the last axis of a (tickers, days) array"""
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=-1)
+    counts = np.cumsum(valid, axis=-1)
+
+    window_sums = sums.copy()
+    window_counts = counts.copy()
+    window_sums[..., window:] -= sums[..., :-window]
+    window_counts[..., window:] -= counts[..., :-window]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = window_sums / window
+    # Only report a value once the window holds `window` real observations
+    result[window_counts < window] = np.nan
+    return result
+
+def _smoothed(values: np.ndarray, alpha: float, seed: np.ndarray) -> np.ndarray:
+    """Recursive exponential smoothing, vectorized across tickers
+
+    Each row starts from its seed (the SMA of its first full window) and missing
+    observations carry the previous value forward.
+    """
+    result = np.full(values.shape, np.nan)
+    previous = np.full(values.shape[:-1], np.nan)
+    for t in range(values.shape[-1]):
+        current = values[..., t]
+        updated = alpha * current + (1 - alpha) * previous
+        updated = np.where(np.isnan(current), previous, updated)
+        previous = np.where(np.isnan(previous), seed[..., t], updated)
+        result[..., t] = previous
+    return result
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    return _smoothed(values, 2.0 / (window + 1), sma(values, window))
+
+def rsi(values: np.ndarray, window: int) -> np.ndarray:
+    """Wilder's RSI"""
+    delta = np.diff(values, axis=-1, prepend=np.nan)
+    gains = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+    losses = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+
+    alpha = 1.0 / window
+    average_gain = _smoothed(gains, alpha, sma(gains, window))
+    average_loss = _smoothed(losses, alpha, sma(losses, window))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        strength = average_gain / average_loss
+        result = 100.0 - 100.0 / (1.0 + strength)
+    # No losses in the window means maximum strength
+    result = np.where((average_loss == 0) & ~np.isnan(average_gain), 100.0, result)
+    return result
+
+def macd(values: np.ndarray, fast: int, slow: int, signal: int) -> Dict[str, np.ndarray]:
+    line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(line, signal)
+    return {
+        "macd": line,
+        "macd_signal": signal_line,
+        "macd_hist": line - signal_line
+    }
+
+def compute_indicator_arrays(closes: np.ndarray, windows: Dict[str, Any] = None) -> Dict[str, np.ndarray]:
+    """Compute every indicator for a (tickers, days) array of closing prices"""
+    windows = {**DEFAULT_WINDOWS, **(windows or {})}
+    arrays = {
+        "sma": sma(closes, windows["sma"]),
+        "ema": ema(closes, windows["ema"]),
+        "rsi": rsi(closes, windows["rsi"])
+    }
+    arrays.update(macd(closes, *windows["macd"]))
+    return arrays
+
+def _as_payload(ticker: str, indicator: str, window: Any, dates: pd.Index,
+                columns: Dict[str, np.ndarray], output_size: int) -> Dict:
+    """Shape one indicator like a Twelve Data response (newest values first, string numbers)"""
+    valid = ~np.isnan(columns[indicator])
+    positions = np.flatnonzero(valid)[::-1][:output_size]
+
+    values = []
+    for position in positions:
+        entry = {"datetime": dates[position].strftime("%Y-%m-%d")}
+        for name, column in columns.items():
+            entry[name] = f"{column[position]:.5f}"
+        values.append(entry)
+
+    indicator_meta = {"name": INDICATOR_NAMES[indicator], "series_type": "close"}
+    if indicator == "macd":
+        indicator_meta.update({"fast_period": window[0], "slow_period": window[1], "signal_period": window[2]})
+    else:
+        indicator_meta["time_period"] = window
+
+    return {
+        "meta": {"symbol": ticker, "interval": "1day", "indicator": indicator_meta},
+        "values": values,
+        "status": "ok" if values else "error"
+    }
+
+def compute_indicators(price_frames: Dict[str, pd.DataFrame], windows: Dict[str, Any] = None,
+                       output_size: int = DEFAULT_OUTPUT_SIZE) -> Dict[str, Dict]:
+    """Compute SMA/EMA/RSI/MACD for many tickers in one vectorized pass
+
+    Every ticker is computed over its own trading days, so its values do not
+    depend on which other tickers are in the batch. Returns {ticker: {"sma": ...,
+    "ema": ..., "rsi": ..., "macd": ...}} in the same shape get_twelve_data_technical
+    returns.
+    """
+    windows = {**DEFAULT_WINDOWS, **(windows or {})}
+    frames = {
+        ticker: frame for ticker, frame in price_frames.items()
+        if isinstance(frame, pd.DataFrame) and "Close" in frame.columns and not frame.empty
+    }
+    if not frames:
+        return {}
+
+    # Each ticker keeps its own trading days: rows are right-aligned by position and
+    # padded with NaN at the start, which the indicators treat as not yet observed
+    series = {}
+    for ticker, frame in frames.items():
+        close = frame["Close"].set_axis(pd.DatetimeIndex(frame.index).tz_localize(None).normalize())
+        close = close[~close.index.duplicated(keep="last")].sort_index().dropna()
+        if not close.empty:
+            series[ticker] = close
+    if not series:
+        return {}
+
+    length = max(len(close) for close in series.values())
+    closes = np.full((len(series), length), np.nan)
+    for row, close in enumerate(series.values()):
+        closes[row, length - len(close):] = close.to_numpy(dtype=np.float64)
+    arrays = compute_indicator_arrays(closes, windows)
+
+    results = {}
+    for row, (ticker, close) in enumerate(series.items()):
+        start = length - len(close)
+        columns = {name: values[row, start:] for name, values in arrays.items()}
+        results[ticker] = {
+            "sma": _as_payload(ticker, "sma", windows["sma"], close.index,
+                               {"sma": columns["sma"]}, output_size),
+            "ema": _as_payload(ticker, "ema", windows["ema"], close.index,
+                               {"ema": columns["ema"]}, output_size),
+            "rsi": _as_payload(ticker, "rsi", windows["rsi"], close.index,
+                               {"rsi": columns["rsi"]}, output_size),
+            "macd": _as_payload(ticker, "macd", windows["macd"], close.index,
+                                {name: columns[name] for name in ("macd", "macd_signal", "macd_hist")},
+                                output_size)
+        }
+    return results
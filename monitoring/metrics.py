@@ -0,0 +1,240 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Set PIPELINE_METRICS=1 to record from startup; otherwise call enable()
+_enabled = os.environ.get("PIPELINE_METRICS", "") == "1"
+
+# Returned by timer() while disabled so timed blocks cost one function call
+_NULL_TIMER = nullcontext()
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+class MetricSet:
+    """Counters plus (count, sum, max) summaries of observed durations, keyed by name and labels"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.summaries: Dict[Tuple[str, Labels], list] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float, labels: Labels):
+        with self._lock:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Labels):
+        with self._lock:
+            summary = self.summaries.setdefault((name, labels), [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view grouped the way the pipeline reports it"""
+        with self._lock:
+            counters = dict(self.counters)
+            summaries = {key: list(value) for key, value in self.summaries.items()}
+
+        def by_label(name: str, label: str) -> Dict[str, Dict[str, float]]:
+            grouped = {}
+            for (metric, labels), (count, total, longest) in summaries.items():
+                if metric == name:
+                    key = dict(labels).get(label, "")
+                    grouped[key] = {"count": count, "seconds": total, "max_seconds": longest}
+            return grouped
+
+        caches = {}
+        for (metric, labels), value in counters.items():
+            if metric == "cache_requests_total":
+                labels = dict(labels)
+                entry = caches.setdefault(labels["cache"], {"hits": 0, "misses": 0})
+                entry["hits" if labels["result"] == "hit" else "misses"] += value
+        for entry in caches.values():
+            total = entry["hits"] + entry["misses"]
+            entry["hit_ratio"] = entry["hits"] / total if total else 0.0
+
+        # Totals over every source; "estimated" is the part no provider reported
+        tokens = {"prompt": 0, "completion": 0, "estimated": {"prompt": 0, "completion": 0}}
+        for (metric, labels), value in counters.items():
+            if metric == "llm_tokens_total":
+                labels = dict(labels)
+                tokens[labels["kind"]] += value
+                if labels.get("source") == "estimated":
+                    tokens["estimated"][labels["kind"]] += value
+
+        return {
+            "nodes": by_label("node_seconds", "node"),
+            "providers": by_label("provider_request_seconds", "provider"),
+            "cache": caches,
+            "llm_tokens": tokens,
+            "charts": by_label("chart_render_seconds", "format")
+        }
+
+    def prometheus_text(self, prefix: str = "financial_pipeline_") -> str:
+        """Counters and summaries in the Prometheus text exposition format"""
+        def series(name: str, labels: Labels) -> str:
+            rendered = ",".join(f'{key}="{value}"' for key, value in labels)
+            return f"{prefix}{name}{{{rendered}}}" if rendered else f"{prefix}{name}"
+
+        with self._lock:
+            lines = []
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                lines += [f"{series(n, labels)} {value}" for (n, labels), value in self.counters.items() if n == name]
+            for name in sorted({name for name, _ in self.summaries}):
+                lines.append(f"# TYPE {prefix}{name} summary")
+                for (n, labels), (count, total, _) in self.summaries.items():
+                    if n == name:
+                        lines.append(f"{series(name + '_count', labels)} {count}")
+                        lines.append(f"{series(name + '_sum', labels)} {total}")
+        return "\n".join(lines) + "\n"
+
+class Trace(MetricSet):
+    """Metrics for one request, collected alongside the process-wide registry"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        return {"total_seconds": time.perf_counter() - self.started, **self.snapshot()}
+
+REGISTRY = MetricSet()
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("pipeline_trace", default=None)
+
+def enabled() -> bool:
+    return _enabled
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def increment(name: str, value: float = 1, **labels):
+    if not _enabled:
+        return
+    key = _labels(labels)
+    REGISTRY.increment(name, value, key)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.increment(name, value, key)
+
+def observe(name: str, seconds: float, **labels):
+    if not _enabled:
+        return
+    key = _labels(labels)
+    REGISTRY.observe(name, seconds, key)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.observe(name, seconds, key)
+
+class _Timer:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name: str, labels: Dict[str, Any]):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+def timer(name: str, **labels):
+    """Context manager recording the block's wall time under name"""
+    return _Timer(name, labels) if _enabled else _NULL_TIMER
+
+def record_cache(cache: str, hit: bool):
+    increment("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+def record_llm_tokens(node: str, prompt_tokens: int, completion_tokens: int, source: str = "provider"):
+    """Count tokens used by an LLM call; source is "provider", "cache" or "estimated" """
+    if not _enabled:
+        return
+    increment("llm_tokens_total", prompt_tokens, node=node, kind="prompt", source=source)
+    increment("llm_tokens_total", completion_tokens, node=node, kind="completion", source=source)
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """Wrap a graph node to record its wall time; returns node itself while disabled
+
+    Nodes are wrapped when the graph is built, so enable metrics before
+    calling create_financial_analysis_graph.
+    """
+    if not _enabled:
+        return node
+
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def timed_async_node(state):
+            with timer("node_seconds", node=name):
+                return await node(state)
+        return timed_async_node
+
+    @functools.wraps(node)
+    def timed_node(state):
+        with timer("node_seconds", node=name):
+            return node(state)
+    return timed_node
+
+@contextmanager
+def trace():
+    """Collect metrics recorded in this context (and threads it hands work to) into a Trace
+
+    Yields None while metrics are disabled.
+    """
+    if not _enabled:
+        yield None
+        return
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+def export_json(path: str, trace: Trace = None):
+    """Write a trace summary, or the process-wide snapshot, to a JSON file"""
+    data = trace.summary() if trace is not None else {"pid": os.getpid(), **REGISTRY.snapshot()}
+    with open(path, "w") as output:
+        json.dump(data, output, indent=2)
+
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve the registry as Prometheus text on /metrics from a daemon thread"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -1,24 +1,61 @@
 import re
-from typing import Dict, List, Tuple
-import spacy
-from spacy.matcher import Matcher, PhraseMatcher
+import os
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Union
+from spacy.matcher import Matcher
+from spacy.tokens import Doc
 from langchain.llms import OpenAI
 from langchain.prompts import PromptTemplate
 
+from agents.llm_cache import CachedLLM
+from query_processing.model_registry import get_nlp, DEFAULT_MODEL
+from query_processing.ticker_index import TickerIndex, load_ticker_index
+from query_processing.time_parser import parse_iso_date, parse_time_frame, HIGH_CONFIDENCE
+
+# Listings file (CSV or exchange listing) for the full ticker index; without one, the built-in
+# names are used and any ticker-shaped word that is not an everyday abbreviation counts
+DEFAULT_TICKER_LISTINGS = os.environ.get("TICKER_LISTINGS_PATH")
+
+# Parser results below this confidence are refined by the LLM
+DEFAULT_TIME_CONFIDENCE_THRESHOLD = 0.6
+
 class EnhancedQueryProcessor:
-    def __init__(self, llm_api_key: str):
-        # Load NER model for financial entity extraction
-        self.nlp = spacy.load("en_core_web_lg")
+    def __init__(self, llm_api_key: str, time_confidence_threshold: float = DEFAULT_TIME_CONFIDENCE_THRESHOLD,
+                 model_name: str = DEFAULT_MODEL, ticker_listings_path: str = DEFAULT_TICKER_LISTINGS,
+                 llm=None):
+        # NER model for financial entity extraction; loaded once per process on first use
+        self.model_name = model_name
+        self._matcher = None
+        # Reentrant: registering the metric patterns goes back through the matcher property
+        self._matcher_lock = threading.RLock()
         
-        # Connect to LLM for query understanding
-        self.llm = OpenAI(api_key=llm_api_key)
+        # Connect to LLM for query understanding, reusing answers for repeated prompts
+        self.llm = llm if llm is not None else CachedLLM(OpenAI(api_key=llm_api_key))
+        self.time_confidence_threshold = time_confidence_threshold
+        # Runs the occasional LLM time-frame lookup alongside entity extraction
+        self.executor = ThreadPoolExecutor(max_workers=4)
         
         # Initialize company to ticker mapping database
-        self.company_to_ticker = self._initialize_company_database()
+        if ticker_listings_path:
+            self.ticker_index = load_ticker_index(ticker_listings_path)
+        else:
+            self.ticker_index = TickerIndex.from_mapping(self._initialize_company_database())
+        self.company_to_ticker = self.ticker_index.name_to_symbol
         
-        # Create matcher for financial metrics
-        self.matcher = Matcher(self.nlp.vocab)
-        self.metric_patterns = self._create_financial_metric_patterns()
+    @property
+    def nlp(self):
+        return get_nlp(self.model_name)
+    
+    @property
+    def matcher(self) -> Matcher:
+        # Create matcher for financial metrics lazily, since it needs the model's vocab
+        with self._matcher_lock:
+            if self._matcher is None:
+                self._matcher = Matcher(self.nlp.vocab)
+                self._create_financial_metric_patterns()
+        return self._matcher
         
     def _initialize_company_database(self) -> Dict[str, str]:
         # In production, this would connect to a comprehensive database
@@ -45,36 +82,50 @@ class EnhancedQueryProcessor:
         self.matcher.add("INTEREST_RATE", [[{"LOWER": "interest"}, {"LOWER": "rate"}]])
         # Many more financial metrics would be added
         
-    def extract_companies(self, query: str) -> List[Dict[str, str]]:
+    def extract_companies(self, query: str, doc: Doc = None) -> List[Dict[str, str]]:
         """Extract company entities and map to stock tickers"""
-        doc = self.nlp(query.lower())
+        # NER works better on the original casing; names are lowercased for the lookup instead
+        doc = doc if doc is not None else self.nlp(query)
         companies = []
         
-        # Extract organization entities
+        # Names and aliases from the ticker index
+        companies.extend(self.ticker_index.match_names(doc))
+        
+        # Organization entities the phrase matcher missed, resolved exactly or fuzzily
+        matched_names = {company["name"] for company in companies}
         for ent in doc.ents:
-            if ent.label_ == "ORG":
-                company_name = ent.text.lower()
-                if company_name in self.company_to_ticker:
+            if ent.label_ == "ORG" and ent.text.lower() not in matched_names:
+                ticker = self.ticker_index.lookup(ent.text)
+                if ticker:
                     companies.append({
-                        "name": company_name,
-                        "ticker": self.company_to_ticker[company_name]
+                        "name": ent.text.lower(),
+                        "ticker": ticker
                     })
         
-        # Also check for ticker symbols directly in text
-        ticker_pattern = r'\b[A-Z]{1,5}\b'  # Simple pattern for stock tickers
-        potential_tickers = re.findall(ticker_pattern, query)
-        for ticker in potential_tickers:
-            # Verify if it's a valid ticker (would connect to a ticker validation service)
+        # Also check for ticker symbols directly in text, keeping only real listings
+        for ticker in self.ticker_index.find_tickers(query):
             companies.append({
                 "name": ticker,
                 "ticker": ticker
             })
-            
-        return companies
+        
+        # Each company once, in order of first mention
+        unique = {}
+        for company in companies:
+            unique.setdefault(company["ticker"], company)
+        return list(unique.values())
     
     def extract_time_frame(self, query: str) -> Dict[str, str]:
         """Extract time frame information from query"""
-        # Using LLM to extract time frame information
+        time_frame = parse_time_frame(query)
+        if time_frame["confidence"] >= self.time_confidence_threshold:
+            return time_frame
+        
+        # Only ambiguous wording is worth an LLM round-trip
+        return self._refine_time_frame_with_llm(query, time_frame)
+    
+    def _refine_time_frame_with_llm(self, query: str, time_frame: Dict) -> Dict:
+        """Ask the LLM to resolve a time frame the deterministic parser was unsure about"""
         prompt_template = PromptTemplate(
             input_variables=["query"],
             template="""
@@ -88,30 +139,28 @@ class EnhancedQueryProcessor:
         )
         
         prompt = prompt_template.format(query=query)
-        time_frame_json = self.llm(prompt)
-        
-        # In a real implementation, we would parse the JSON response
-        # For this example, we'll return a simplified version
-        
-        # Simple regex extraction as fallback
-        year_pattern = r'\b\d{4}\b'
-        years = re.findall(year_pattern, query)
-        
-        quarter_pattern = r'\bQ[1-4]\s+\d{4}\b'
-        quarters = re.findall(quarter_pattern, query)
+        refined = dict(time_frame)
+        try:
+            answer = self.llm(prompt)
+            parsed = json.loads(getattr(answer, "content", answer))
+            if not isinstance(parsed, dict):
+                return refined
+        except Exception:
+            # Keep the parser's result if the LLM is unavailable or returns malformed JSON
+            return refined
         
-        time_period_pattern = r'\blast\s+(\d+)\s+(day|days|week|weeks|month|months|year|years)\b'
-        period_match = re.search(time_period_pattern, query)
-        
-        return {
-            "years": years,
-            "quarters": quarters,
-            "period": period_match.group(0) if period_match else None
-        }
+        for key in ("start_date", "end_date"):
+            value = parsed.get(key)
+            # The LLM can repeat an impossible date from the query ("2024-02-30")
+            if value and value != "None" and re.fullmatch(r"\d{4}-\d{2}-\d{2}", value) and parse_iso_date(value):
+                refined[key] = value
+        if refined["start_date"]:
+            refined["confidence"] = HIGH_CONFIDENCE
+        return refined
     
-    def extract_metrics(self, query: str) -> List[str]:
+    def extract_metrics(self, query: str, doc: Doc = None) -> List[str]:
         """Extract financial metrics of interest"""
-        doc = self.nlp(query)
+        doc = doc if doc is not None else self.nlp(query)
         matches = self.matcher(doc)
         
         metrics = []
@@ -144,14 +193,54 @@ class EnhancedQueryProcessor:
         # Default to summary if no specific type detected
         return "summary"
     
+    def _start_time_frame(self, query: str) -> Union[Dict, Future]:
+        """Parse the time frame, handing ambiguous ones to the LLM in the background"""
+        time_frame = parse_time_frame(query)
+        if time_frame["confidence"] < self.time_confidence_threshold:
+            return self.executor.submit(self._refine_time_frame_with_llm, query, time_frame)
+        return time_frame
+    
     def process_query(self, query: str) -> Dict:
         """Main method to process financial queries"""
+        # Let the LLM work on an ambiguous time frame while the NER pass runs
+        time_frame = self._start_time_frame(query)
+        # A single pipeline pass shared by company and metric extraction
+        doc = self.nlp(query)
+        return self._build_query_parameters(query, doc, time_frame)
+    
+    def process_queries(self, queries: List[str], batch_size: int = 64, n_process: int = 1) -> List[Dict]:
+        """Process many queries, streaming them through nlp.pipe in batches
+        
+        A query that fails to parse gets {"error": ...} in place of its
+        parameters, so one bad query does not fail the rest of the batch.
+        """
+        time_frames = []
+        for query in queries:
+            try:
+                time_frames.append(self._start_time_frame(query))
+            except Exception as e:
+                time_frames.append(e)
+        
+        docs = self.nlp.pipe(queries, batch_size=batch_size, n_process=n_process)
+        query_parameters = []
+        for query, doc, time_frame in zip(queries, docs, time_frames):
+            try:
+                if isinstance(time_frame, Exception):
+                    raise time_frame
+                query_parameters.append(self._build_query_parameters(query, doc, time_frame))
+            except Exception as e:
+                query_parameters.append({"error": f"Error processing query: {str(e)}"})
+        return query_parameters
+    
+    def _build_query_parameters(self, query: str, doc: Doc, time_frame: Union[Dict, Future]) -> Dict:
         # Extract all relevant information
-        companies = self.extract_companies(query)
-        time_frame = self.extract_time_frame(query)
-        metrics = self.extract_metrics(query)
+        companies = self.extract_companies(query, doc)
+        metrics = self.extract_metrics(query, doc)
         analysis_type = self.determine_analysis_type(query)
         
+        if isinstance(time_frame, Future):
+            time_frame = time_frame.result()
+        
         # Determine which APIs to query based on the extracted information
         apis_to_query = self._select_apis(metrics, analysis_type)
         
@@ -0,0 +1,72 @@
+import gc
+import os
+import resource
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import spacy
+from spacy.language import Language
+
+DEFAULT_MODEL = "en_core_web_lg"
+
+# Query processing only needs NER (and the tok2vec layer it listens to); the
+# Matcher works on token text, so the tagger, parser and lemmatizer are never
+# loaded at all.
+DEFAULT_EXCLUDED_PIPES = ("tagger", "parser", "attribute_ruler", "lemmatizer", "senter")
+
+_lock = threading.Lock()
+_models: Dict[Tuple[str, Tuple[str, ...]], Language] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to peak RSS (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+def get_nlp(name: str = DEFAULT_MODEL, exclude: Iterable[str] = DEFAULT_EXCLUDED_PIPES) -> Language:
+    """Return the process-wide pipeline for name, loading it on first use"""
+    key = (name, tuple(sorted(exclude)))
+    nlp = _models.get(key)
+    if nlp is not None:
+        return nlp
+
+    with _lock:
+        nlp = _models.get(key)
+        if nlp is None:
+            rss_before = current_rss_bytes()
+            started = time.perf_counter()
+            nlp = spacy.load(name, exclude=list(key[1]))
+            _stats[name] = {
+                "load_seconds": time.perf_counter() - started,
+                "rss_before_bytes": rss_before,
+                "rss_after_bytes": current_rss_bytes(),
+                "pid": os.getpid()
+            }
+            _models[key] = nlp
+    return nlp
+
+def preload(names: Iterable[str] = (DEFAULT_MODEL,), exclude: Iterable[str] = DEFAULT_EXCLUDED_PIPES):
+    """Load models in a parent process before forking workers
+
+    The model weights then live in pages the workers share copy-on-write.
+    gc.freeze() moves everything allocated so far out of the collector's
+    generations so that collections in the children do not write to (and
+    therefore copy) those shared pages.
+    """
+    for name in names:
+        get_nlp(name, exclude)
+    gc.collect()
+    gc.freeze()
+
+def model_stats(name: Optional[str] = None) -> Dict:
+    """Cold-start time and RSS growth per loaded model, plus current RSS"""
+    stats = {model: dict(values) for model, values in _stats.items() if name in (None, model)}
+    for values in stats.values():
+        values["rss_growth_bytes"] = values["rss_after_bytes"] - values["rss_before_bytes"]
+    return {"models": stats, "current_rss_bytes": current_rss_bytes(), "pid": os.getpid()}
@@ -0,0 +1,221 @@
+import csv
+import difflib
+import os
+import pickle
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+import spacy
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc
+from spacy.util import filter_spans
+
+ARTIFACT_VERSION = 2
+
+# Uppercase words that look like tickers in finance questions but almost never mean one.
+# A cashtag ($A, $AI) still resolves them explicitly.
+AMBIGUOUS_TICKERS = {
+    "A", "I", "AI", "CEO", "CFO", "COO", "CTO", "EPS", "ETF", "FY", "GDP", "IPO", "IT", "PE",
+    "Q", "QOQ", "ROE", "ROI", "SEC", "US", "USA", "USD", "YOY", "YTD", "EBITDA", "API", "ESG",
+    "EV", "FCF", "M", "B", "K", "OR", "AND", "ON", "ALL", "ARE", "BE", "SO", "NOW", "GO"
+}
+
+# Legal-form suffixes stripped from listing names to get the name people actually type
+NAME_SUFFIXES = re.compile(
+    r"[,.]?\s+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc|llc|lp|sa|nv|ag|se|"
+    r"holdings?|group|class [a-c]( common stock| ordinary shares)?|common stock|ordinary shares|"
+    r"american depositary shares)\.?$",
+    re.IGNORECASE
+)
+TICKER_PATTERN = re.compile(r"(?<![\w$])([A-Z]{1,5}(?:\.[A-Z])?)\b")
+CASHTAG_PATTERN = re.compile(r"\$([A-Za-z]{1,5}(?:\.[A-Za-z])?)\b")
+
+def normalize_name(name: str) -> str:
+    """Lowercase a listing name and drop legal-form suffixes ("Apple Inc." -> "apple")"""
+    # Exchange listings append the security type: "Apple Inc. - Common Stock"
+    name = name.split(" - ")[0].strip()
+    if name.lower().startswith("the "):
+        name = name[4:]
+    previous = None
+    while previous != name:
+        previous = name
+        name = NAME_SUFFIXES.sub("", name).strip()
+    return name.lower()
+
+class TickerIndex:
+    """Symbols plus name/alias lookup for listed companies
+
+    Built from a local listings file (CSV with symbol,name[,aliases] columns, or
+    an exchange's pipe-delimited listing with Symbol|Security Name), then saved
+    together with its PhraseMatcher as a binary artifact, so later starts skip
+    tokenizing every name.
+
+    An index built from a partial mapping (complete=False) cannot rule symbols
+    out, so find_tickers accepts any ticker-shaped word that is not an
+    everyday abbreviation.
+    """
+
+    def __init__(self, name_to_symbol: Dict[str, str], symbols: Iterable[str] = None,
+                 complete: bool = True, matcher: PhraseMatcher = None):
+        self.name_to_symbol = dict(name_to_symbol)
+        self.symbols = frozenset(symbols if symbols is not None else self.name_to_symbol.values())
+        self.complete = complete
+
+        # First-letter buckets keep fuzzy matching away from a full scan
+        self._buckets: Dict[str, List[str]] = defaultdict(list)
+        for name in self.name_to_symbol:
+            self._buckets[name[:1]].append(name)
+
+        self._matcher = matcher
+        self._matcher_lock = threading.Lock()
+
+    @classmethod
+    def from_mapping(cls, company_to_ticker: Dict[str, str]) -> "TickerIndex":
+        return cls({name.lower(): ticker for name, ticker in company_to_ticker.items()}, complete=False)
+
+    @classmethod
+    def from_listings(cls, path: str) -> "TickerIndex":
+        """Build an index from a CSV or pipe-delimited listings file"""
+        with open(path, newline="", encoding="utf-8") as listings:
+            sample = listings.readline()
+            listings.seek(0)
+            delimiter = "|" if sample.count("|") > sample.count(",") else ","
+            rows = csv.DictReader(listings, delimiter=delimiter)
+
+            name_to_symbol = {}
+            symbols = set()
+            for row in rows:
+                row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+                symbol = (row.get("symbol") or row.get("ticker") or "").upper()
+                name = row.get("name") or row.get("security name") or row.get("company name") or ""
+                # Skip test issues and footer lines in exchange listing files
+                if not symbol or not name or row.get("test issue") == "Y":
+                    continue
+
+                symbols.add(symbol)
+                for alias in [name] + [a for a in row.get("aliases", "").split("|") if a]:
+                    # First listing wins, so a company's common stock beats its later share classes
+                    name_to_symbol.setdefault(normalize_name(alias), symbol)
+                    name_to_symbol.setdefault(alias.strip().lower(), symbol)
+
+        name_to_symbol.pop("", None)
+        return cls(name_to_symbol, symbols)
+
+    def save(self, path: str):
+        with open(path, "wb") as artifact:
+            pickle.dump({"version": ARTIFACT_VERSION, "name_to_symbol": self.name_to_symbol,
+                         "symbols": sorted(self.symbols), "complete": self.complete,
+                         "matcher": self.phrase_matcher()}, artifact, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "TickerIndex":
+        with open(path, "rb") as artifact:
+            data = pickle.load(artifact)
+        if data.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported ticker index artifact version in {path}")
+        return cls(data["name_to_symbol"], data["symbols"], data["complete"], data["matcher"])
+
+    def is_ticker(self, token: str) -> bool:
+        return token in self.symbols
+
+    def lookup(self, name: str, fuzzy_cutoff: float = 0.88) -> Optional[str]:
+        """Resolve a company name exactly, then by normalized name, then fuzzily"""
+        name = name.strip().lower()
+        for candidate in (name, normalize_name(name)):
+            if candidate in self.name_to_symbol:
+                return self.name_to_symbol[candidate]
+
+        close = difflib.get_close_matches(normalize_name(name), self._buckets.get(name[:1], []),
+                                          n=1, cutoff=fuzzy_cutoff)
+        return self.name_to_symbol[close[0]] if close else None
+
+    def phrase_matcher(self) -> PhraseMatcher:
+        """PhraseMatcher over every name and alias, built once and saved with the artifact
+
+        Patterns are tokenized with a blank English pipeline, which shares its
+        tokenizer rules with the en_core_web models and carries no vectors. The
+        matcher compares LOWER hashes, so it matches docs from any English vocab.
+        """
+        with self._matcher_lock:
+            if self._matcher is None:
+                blank = spacy.blank("en")
+                matcher = PhraseMatcher(blank.vocab, attr="LOWER")
+                matcher.add("COMPANY", list(blank.tokenizer.pipe(self.name_to_symbol)))
+                self._matcher = matcher
+            return self._matcher
+
+    def warm_up(self) -> "TickerIndex":
+        """Build the matcher now, e.g. in a parent process before forking workers"""
+        self.phrase_matcher()
+        return self
+
+    def match_names(self, doc: Doc) -> List[Dict[str, str]]:
+        """Company names and aliases mentioned in the doc (longest match wins)"""
+        matcher = self.phrase_matcher()
+        spans = filter_spans([doc[start:end] for _, start, end in matcher(doc)])
+        companies = []
+        for span in spans:
+            name = span.text.lower()
+            # One-word names are often ordinary words ("target", "block"), so require capitalization
+            if len(span) == 1 and not (span[0].is_title or span[0].is_upper):
+                continue
+            if name in self.name_to_symbol:
+                companies.append({"name": name, "ticker": self.name_to_symbol[name]})
+        return companies
+
+    def find_tickers(self, text: str) -> List[str]:
+        """Ticker symbols in the text that are real listings and not everyday abbreviations"""
+        tickers = [
+            t.upper() for t in CASHTAG_PATTERN.findall(text)
+            if t.upper() in self.symbols or not self.complete
+        ]
+        tickers += [
+            t for t in TICKER_PATTERN.findall(text)
+            if (t in self.symbols or not self.complete) and t not in AMBIGUOUS_TICKERS
+        ]
+        return tickers
+
+_indexes: Dict[str, TickerIndex] = {}
+_indexes_lock = threading.Lock()
+
+def load_ticker_index(listings_path: str, artifact_path: str = None) -> TickerIndex:
+    """Process-wide index for a listings file, loaded on first use
+
+    Uses the prebuilt artifact if it is newer than the listings file and
+    rebuilds it otherwise. Loading in a parent process before forking shares
+    the index and its matcher with every worker.
+    """
+    artifact_path = artifact_path or listings_path + ".index.pkl"
+    with _indexes_lock:
+        index = _indexes.get(artifact_path)
+        if index is not None:
+            return index
+
+        index = None
+        if os.path.exists(artifact_path) and (
+            not os.path.exists(listings_path) or os.path.getmtime(artifact_path) >= os.path.getmtime(listings_path)
+        ):
+            try:
+                index = TickerIndex.load(artifact_path)
+            except ValueError:
+                # Artifact from an older version; rebuild it below
+                index = None
+        if index is None:
+            index = TickerIndex.from_listings(listings_path)
+            index.save(artifact_path)
+        _indexes[artifact_path] = index
+        return index
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the ticker index artifact from a listings file")
+    parser.add_argument("listings", help="CSV (symbol,name,aliases) or pipe-delimited exchange listing")
+    parser.add_argument("--output", help="Artifact path (defaults to <listings>.index.pkl)")
+    args = parser.parse_args()
+
+    index = TickerIndex.from_listings(args.listings)
+    index.save(args.output or args.listings + ".index.pkl")
+    print(f"Indexed {len(index.symbols)} symbols and {len(index.name_to_symbol)} names")
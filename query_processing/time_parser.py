@@ -0,0 +1,197 @@
+import re
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Confidence assigned when the parser recognized an explicit time expression
+HIGH_CONFIDENCE = 1.0
+# No time expression at all: the default window is almost certainly what the user wants
+NO_TIME_CONFIDENCE = 0.8
+# Vague wording ("recently", "long term") that only an LLM can pin down
+VAGUE_CONFIDENCE = 0.3
+# A period that has not started yet ("Q2 2030"): probably a typo or a forecast question
+FUTURE_CONFIDENCE = 0.3
+# A date-shaped typo ("2024-02-30") that only an LLM can guess the meaning of
+INVALID_DATE_CONFIDENCE = 0.3
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12
+}
+ORDINAL_QUARTERS = {"first": 1, "1st": 1, "second": 2, "2nd": 2, "third": 3, "3rd": 3, "fourth": 4, "4th": 4}
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "twelve": 12
+}
+UNIT_OFFSETS = {
+    "day": lambda n: pd.DateOffset(days=n),
+    "week": lambda n: pd.DateOffset(weeks=n),
+    "month": lambda n: pd.DateOffset(months=n),
+    "quarter": lambda n: pd.DateOffset(months=3 * n),
+    "year": lambda n: pd.DateOffset(years=n)
+}
+
+VAGUE_PATTERN = re.compile(r"\b(recent(ly)?|lately|long[- ]term|short[- ]term|historical(ly)?|"
+                           r"over time|these days|in the past|previous(ly)?)\b", re.IGNORECASE)
+
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_YEAR = r"(?:19|20)\d{2}"
+
+ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+RELATIVE = re.compile(r"\b(?:last|past|previous|trailing)\s+(?:(\d+|" + "|".join(NUMBER_WORDS) + r")\s+)?"
+                      r"(day|week|month|quarter|year)s?\b", re.IGNORECASE)
+QUARTER = re.compile(r"\bQ([1-4])\s*(?:FY\s*)?'?(" + _YEAR + r"|\d{2})\b", re.IGNORECASE)
+FISCAL_QUARTER = re.compile(r"\b(?:FY\s*'?|fiscal\s+(?:year\s+)?)(" + _YEAR + r"|\d{2})\s*Q([1-4])\b", re.IGNORECASE)
+QUARTER_SHORT = re.compile(r"\b([1-4])Q\s*'?(" + _YEAR + r"|\d{2})\b", re.IGNORECASE)
+QUARTER_WORDS = re.compile(r"\b(" + "|".join(ORDINAL_QUARTERS) + r")\s+quarter\s+(?:of\s+)?(?:fiscal\s+)?(?:year\s+)?("
+                           + _YEAR + r")\b", re.IGNORECASE)
+FISCAL_YEAR = re.compile(r"\b(?:FY\s*'?|fiscal\s+(?:year\s+)?)(" + _YEAR + r"|\d{2})\b", re.IGNORECASE)
+YTD = re.compile(r"\b(ytd|year[- ]to[- ]date)\b", re.IGNORECASE)
+THIS_PERIOD = re.compile(r"\bthis\s+(year|quarter|month)\b", re.IGNORECASE)
+MONTH_YEAR = re.compile(r"\b(" + _MONTH_NAMES + r")\.?\s+(" + _YEAR + r")\b", re.IGNORECASE)
+YEAR_RANGE = re.compile(r"\b(?:from\s+|between\s+)?(" + _YEAR + r")\s*(?:-|–|to|through|until|and)\s*(" + _YEAR + r")\b",
+                        re.IGNORECASE)
+SINCE = re.compile(r"\bsince\s+(" + _YEAR + r")\b", re.IGNORECASE)
+YEAR = re.compile(r"\b(" + _YEAR + r")\b")
+
+def parse_iso_date(text: str) -> Optional[date]:
+    """The date for a YYYY-MM-DD string, or None if no such day exists"""
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+def _full_year(text: str) -> int:
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+def quarter_bounds(year: int, quarter: int, fiscal_year_end_month: int = 12) -> Tuple[date, date]:
+    """Start and end of a (fiscal) quarter; fiscal years are named after the calendar year they end in"""
+    end_month = (fiscal_year_end_month + 3 * quarter - 1) % 12 + 1
+    end_year = year if end_month <= fiscal_year_end_month else year - 1
+    end = (pd.Timestamp(year=end_year, month=end_month, day=1) + pd.offsets.MonthEnd(0)).date()
+    start = (pd.Timestamp(end) - pd.offsets.MonthBegin(3)).date()
+    return start, end
+
+def fiscal_year_bounds(year: int, fiscal_year_end_month: int = 12) -> Tuple[date, date]:
+    end = (pd.Timestamp(year=year, month=fiscal_year_end_month, day=1) + pd.offsets.MonthEnd(0)).date()
+    start = (pd.Timestamp(end) - pd.DateOffset(years=1) + timedelta(days=1)).date()
+    return start, end
+
+def _month_bounds(year: int, month: int) -> Tuple[date, date]:
+    start = date(year, month, 1)
+    return start, (pd.Timestamp(start) + pd.offsets.MonthEnd(0)).date()
+
+def parse_time_frame(query: str, today: Optional[date] = None, fiscal_year_end_month: int = 12) -> Dict:
+    """Parse the time expression in a query into normalized start and end dates
+
+    Understands quarters (Q3 2024, 3Q24, FY2024 Q3, third quarter of 2024), fiscal years
+    (FY2023), relative periods (last 5 years, past quarter), explicit date and
+    year ranges, month names, "since 2020" and YTD. The result keeps the
+    years/quarters/period keys the rest of the pipeline already reads, plus a
+    confidence score used to decide whether an LLM needs to look at the query.
+    A window that starts after today is dropped with low confidence, and an
+    impossible date ("2024-02-30") is ignored with low confidence.
+    """
+    today = today or date.today()
+    start: Optional[date] = None
+    end: Optional[date] = None
+    period: Optional[str] = None
+    confidence = HIGH_CONFIDENCE
+
+    quarters: List[str] = [f"Q{q} {_full_year(y)}" for q, y in QUARTER.findall(query)]
+    quarters += [f"Q{q} {_full_year(y)}" for y, q in FISCAL_QUARTER.findall(query)]
+    quarters += [f"Q{q} {_full_year(y)}" for q, y in QUARTER_SHORT.findall(query)]
+    quarters += [f"Q{ORDINAL_QUARTERS[q.lower()]} {y}" for q, y in QUARTER_WORDS.findall(query)]
+    years = YEAR.findall(query)
+
+    iso_matches = ISO_DATE.findall(query)
+    iso_dates = [parsed for parsed in map(parse_iso_date, iso_matches) if parsed is not None]
+    relative = RELATIVE.search(query)
+    fiscal_years = FISCAL_YEAR.findall(query)
+    months = MONTH_YEAR.findall(query)
+    year_range = YEAR_RANGE.search(query)
+    since = SINCE.search(query)
+    this_period = THIS_PERIOD.search(query)
+
+    if len(iso_dates) >= 2:
+        start, end = sorted(iso_dates[:2])
+    elif iso_dates and since is None:
+        start = iso_dates[0]
+        end = today
+    elif relative:
+        count_text, unit = relative.group(1), relative.group(2).lower()
+        if count_text is None:
+            count = 1
+        elif count_text.isdigit():
+            count = int(count_text)
+        else:
+            count = NUMBER_WORDS[count_text.lower()]
+        start = (pd.Timestamp(today) - UNIT_OFFSETS[unit](count)).date()
+        end = today
+        period = f"last {count} {unit}s"
+    elif YTD.search(query) or (this_period and this_period.group(1).lower() == "year"):
+        start, end = date(today.year, 1, 1), today
+        period = "ytd"
+    elif this_period:
+        unit = this_period.group(1).lower()
+        if unit == "quarter":
+            start = date(today.year, 3 * ((today.month - 1) // 3) + 1, 1)
+        else:
+            start = date(today.year, today.month, 1)
+        end = today
+        period = f"this {unit}"
+    elif quarters:
+        bounds = []
+        for quarter in quarters:
+            q, y = quarter[1], quarter.split()[1]
+            bounds.extend(quarter_bounds(int(y), int(q), fiscal_year_end_month))
+        start, end = min(bounds), max(bounds)
+        period = quarters[0] if len(quarters) == 1 else f"{quarters[0]} - {quarters[-1]}"
+    elif fiscal_years:
+        bounds = []
+        for year in fiscal_years:
+            bounds.extend(fiscal_year_bounds(_full_year(year), fiscal_year_end_month))
+        start, end = min(bounds), max(bounds)
+        period = f"FY{_full_year(fiscal_years[0])}"
+    elif months:
+        bounds = []
+        for month, year in months:
+            bounds.extend(_month_bounds(int(year), MONTHS[month.lower()]))
+        start, end = min(bounds), max(bounds)
+    elif year_range:
+        first, last = sorted(int(y) for y in year_range.groups())
+        start, end = date(first, 1, 1), date(last, 12, 31)
+    elif since:
+        start, end = date(int(since.group(1)), 1, 1), today
+    elif iso_dates:
+        start, end = iso_dates[0], today
+    elif years:
+        first, last = min(int(y) for y in years), max(int(y) for y in years)
+        start, end = date(first, 1, 1), date(last, 12, 31)
+    elif VAGUE_PATTERN.search(query):
+        confidence = VAGUE_CONFIDENCE
+    else:
+        confidence = NO_TIME_CONFIDENCE
+
+    if len(iso_dates) < len(iso_matches):
+        # Parse what is valid, but let the LLM look at the invalid date
+        confidence = min(confidence, INVALID_DATE_CONFIDENCE)
+
+    if start is not None and start > today:
+        start = end = None
+        confidence = FUTURE_CONFIDENCE
+    elif end is not None and end > today:
+        end = today
+
+    return {
+        "start_date": start.isoformat() if start else None,
+        "end_date": end.isoformat() if end else None,
+        "period": period,
+        "years": years,
+        "quarters": quarters,
+        "confidence": confidence
+    }
@@ -0,0 +1,327 @@
+"""Pre-forked HTTP service around FinancialAnalysisSystem
+
+The master process loads configuration and the spaCy model, binds the
+listening socket and forks the workers, so the model's pages are shared
+copy-on-write. Every worker builds its own FinancialAnalysisSystem (HTTP
+sessions, SQLite connections and thread pools must not cross a fork) and
+serves requests on an event loop through the async pipeline. All workers
+share the on-disk SQLite cache.
+
+    python -m service.worker_service --port 8080 --workers 4
+
+    POST /analyze  {"query": "..."}  -> {"report": {...}, "charts": {name: base64 png}}
+    GET  /healthz                    -> worker status
+    GET  /metrics                    -> Prometheus text for the answering worker
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from monitoring import metrics
+from query_processing.enhanced_query_processor import DEFAULT_TICKER_LISTINGS
+from query_processing.model_registry import DEFAULT_MODEL, preload
+from query_processing.ticker_index import load_ticker_index
+from visualizations.chart_rendering import get_render_pool, shutdown_render_pool
+
+# Largest request body accepted; queries are short text
+MAX_BODY_BYTES = 64 * 1024
+
+# Time a client gets to send its request line and headers
+HEADER_TIMEOUT = 10.0
+
+# Minimum seconds between restarts of crashed workers, so a crash loop cannot fork-bomb
+RESPAWN_INTERVAL = 1.0
+
+HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+    504: "Gateway Timeout"
+}
+
+class ServiceConfig:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, workers: int = None,
+                 concurrency: int = 32, max_queue: int = 64, request_timeout: float = 120.0,
+                 drain_timeout: float = 30.0, backlog: int = 512, chart_format: str = "png",
+                 render_processes: int = 1, spacy_model: str = DEFAULT_MODEL, enable_metrics: bool = False,
+                 api_keys: Dict[str, str] = None, ticker_listings_path: str = DEFAULT_TICKER_LISTINGS):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count()
+        # Queries analysed at once per worker; they mostly wait on providers and the LLM
+        self.concurrency = concurrency
+        # Requests a worker holds beyond that before answering 503
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self.drain_timeout = drain_timeout
+        self.backlog = backlog
+        self.chart_format = chart_format
+        # Chart render processes per worker; workers already cover the cores
+        self.render_processes = render_processes
+        self.spacy_model = spacy_model
+        self.ticker_listings_path = ticker_listings_path
+        self.enable_metrics = enable_metrics
+        self.api_keys = api_keys or {
+            "openai": os.environ.get("OPENAI_API_KEY", ""),
+            "alpha_vantage": os.environ.get("ALPHA_VANTAGE_API_KEY", ""),
+            "twelve_data": os.environ.get("TWELVE_DATA_API_KEY", "")
+        }
+
+def build_system(config: ServiceConfig):
+    """Default system factory, called in each worker after the fork"""
+    from agents.financial_analysis_system import FinancialAnalysisSystem
+
+    return FinancialAnalysisSystem(
+        config.api_keys["openai"], config.api_keys["alpha_vantage"], config.api_keys["twelve_data"],
+        chart_format=config.chart_format, enable_metrics=config.enable_metrics,
+        spacy_model=config.spacy_model, ticker_listings_path=config.ticker_listings_path
+    )
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return str(value)
+
+class Worker:
+    """One pre-forked process: an asyncio HTTP server with bounded concurrency"""
+
+    def __init__(self, config: ServiceConfig, system):
+        self.config = config
+        self.system = system
+        self.in_flight = 0
+        self.draining = False
+        self.connections = set()
+        self.slots: Optional[asyncio.Semaphore] = None
+
+    async def run(self, sock: socket.socket):
+        loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(self.config.concurrency)
+        stop = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+
+        server = await asyncio.start_server(self._serve_connection, sock=sock)
+        await stop.wait()
+
+        # Stop accepting, then give in-flight requests until the drain timeout to finish
+        self.draining = True
+        server.close()
+        if self.connections:
+            await asyncio.wait(set(self.connections), timeout=self.config.drain_timeout)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(self._read_request(reader), HEADER_TIMEOUT)
+            except ValueError as e:
+                status, payload, headers = 413 if "too large" in str(e) else 400, {"error": str(e)}, {}
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+            else:
+                status, payload, headers = await self._route(method, path, body)
+            await self._write_response(writer, status, payload, headers)
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = await reader.readline()
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError("malformed request line")
+        method, path, _ = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?")[0], body
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload, headers: Dict[str, str]):
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, default=_json_default).encode("utf-8"), "application/json"
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if path == "/healthz":
+            return 200, {"status": "draining" if self.draining else "ok", "pid": os.getpid(),
+                         "in_flight": self.in_flight, "max_in_flight": self._capacity()}, {}
+        if path == "/metrics":
+            return 200, metrics.REGISTRY.prometheus_text(), {}
+        if path != "/analyze":
+            return 404, {"error": f"Unknown path {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "Use POST"}, {"Allow": "POST"}
+
+        try:
+            query = json.loads(body or b"{}").get("query")
+        except (ValueError, AttributeError):
+            query = None
+        if not isinstance(query, str) or not query.strip():
+            return 400, {"error": "Body must be JSON with a non-empty \"query\" string"}, {}
+        return await self._analyze(query)
+
+    def _capacity(self) -> int:
+        return self.config.concurrency + self.config.max_queue
+
+    async def _analyze(self, query: str):
+        # Backpressure: refuse instead of queuing without bound
+        if self.draining or self.in_flight >= self._capacity():
+            return 503, {"error": "Server busy, retry later"}, {"Retry-After": "1"}
+
+        self.in_flight += 1
+        try:
+            # The timeout covers time spent queued for a slot as well as the analysis
+            result = await asyncio.wait_for(self._run_query(query), self.config.request_timeout)
+        except asyncio.TimeoutError:
+            return 504, {"error": f"Analysis did not finish within {self.config.request_timeout}s"}, {}
+        except Exception as e:
+            return 500, {"error": f"Error processing query: {str(e)}"}, {}
+        finally:
+            self.in_flight -= 1
+
+        if "error" in result:
+            return 500, {"error": result["error"]}, {}
+        response = {"report": result["report"], "charts": result.get("visualizations", {})}
+        if "metrics" in result:
+            response["metrics"] = result["metrics"]
+        return 200, response, {}
+
+    async def _run_query(self, query: str) -> Dict:
+        async with self.slots:
+            return await self.system.aprocess_financial_query(query)
+
+def _worker_main(config: ServiceConfig, sock: socket.socket, system_factory: Callable) -> int:
+    # The master's handlers must not run in the child
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Size this worker's render pool before anything creates it with one process per core
+    get_render_pool(max_workers=config.render_processes)
+    system = system_factory(config)
+    try:
+        asyncio.run(Worker(config, system).run(sock))
+    finally:
+        shutdown_render_pool()
+    return 0
+
+class Master:
+    """Forks the workers, replaces ones that die, and drains them all on SIGTERM/SIGINT"""
+
+    def __init__(self, config: ServiceConfig, sock: socket.socket, system_factory: Callable):
+        self.config = config
+        self.sock = sock
+        self.system_factory = system_factory
+        self.workers: Dict[int, float] = {}
+        self.stopping = False
+        self.last_spawn = 0.0
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = _worker_main(self.config, self.sock, self.system_factory)
+            except BaseException as e:
+                print(f"worker {os.getpid()} failed: {e!r}", file=sys.stderr)
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        self.last_spawn = time.monotonic()
+
+    def _stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.config.workers):
+            self._spawn()
+
+        deadline = None
+        while self.workers:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.workers.pop(pid, None)
+                continue
+
+            if self.stopping:
+                deadline = deadline or time.monotonic() + self.config.drain_timeout + 5
+                if time.monotonic() > deadline:
+                    for pid in list(self.workers):
+                        os.kill(pid, signal.SIGKILL)
+            elif len(self.workers) < self.config.workers and time.monotonic() - self.last_spawn > RESPAWN_INTERVAL:
+                self._spawn()
+            time.sleep(0.1)
+        self.sock.close()
+
+def serve(config: ServiceConfig, system_factory: Callable = build_system):
+    """Preload shared state, bind the socket and run the pre-forked workers until stopped"""
+    if config.enable_metrics:
+        metrics.enable()
+    # Loaded once here and shared copy-on-write by every worker; workers get the
+    # same objects from the process-wide registries
+    if config.ticker_listings_path:
+        load_ticker_index(config.ticker_listings_path).warm_up()
+    preload([config.spacy_model])
+
+    sock = socket.create_server((config.host, config.port), backlog=config.backlog)
+    sock.setblocking(False)
+    print(f"Serving on {config.host}:{sock.getsockname()[1]} with {config.workers} workers", file=sys.stderr)
+    Master(config, sock, system_factory).run()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-forked HTTP service for financial analysis queries")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--concurrency", type=int, default=32, help="queries analysed at once per worker")
+    parser.add_argument("--max-queue", type=int, default=64, help="requests queued per worker before 503")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds (504)")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="seconds to finish requests on SIGTERM")
+    parser.add_argument("--chart-format", choices=["png", "svg"], default="png")
+    parser.add_argument("--spacy-model", default=DEFAULT_MODEL)
+    parser.add_argument("--ticker-listings", default=DEFAULT_TICKER_LISTINGS, help="listings file for the ticker index")
+    parser.add_argument("--metrics", action="store_true", help="record pipeline metrics")
+    args = parser.parse_args(argv)
+
+    serve(ServiceConfig(
+        host=args.host, port=args.port, workers=args.workers, concurrency=args.concurrency,
+        max_queue=args.max_queue, request_timeout=args.timeout, drain_timeout=args.drain_timeout,
+        chart_format=args.chart_format, spacy_model=args.spacy_model, enable_metrics=args.metrics,
+        ticker_listings_path=args.ticker_listings
+    ))
+
+if __name__ == "__main__":
+    main()
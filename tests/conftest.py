@@ -0,0 +1,13 @@
+import pytest
+import spacy
+
+@pytest.fixture(scope="session")
+def spacy_model_path(tmp_path_factory):
+    """A small English pipeline saved like a packaged model: an untrained NER plus a pipe the registry excludes"""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("ner")
+    nlp.add_pipe("attribute_ruler")
+    nlp.initialize()
+    path = tmp_path_factory.mktemp("model") / "en_test"
+    nlp.to_disk(path)
+    return str(path)
@@ -0,0 +1,58 @@
+import pickle
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+
+from api_integration.cache import SQLiteCache, TieredCache, UnsupportedValue, decode_value, encode_value
+
+def _summary():
+    return {
+        "info": {"shortName": "Apple Inc.", "marketCap": 3.4e12, "sector": "Technology"},
+        "recommendations": pd.DataFrame({"period": ["0m", "-1m"], "buy": [15, 16]}),
+        "major_holders": pd.DataFrame({"Value": [0.0007, 0.61]}, index=["insiders", "institutions"]),
+        "news": [{"title": "Apple reports results"}]
+    }
+
+def test_summary_with_frames_round_trips_without_pickle():
+    codec, payload = encode_value(_summary())
+    assert codec == "mixed"
+    assert b"pandas.core" not in payload
+
+    decoded = decode_value(codec, payload)
+    assert decoded["info"] == _summary()["info"]
+    assert decoded["news"] == _summary()["news"]
+    pd.testing.assert_frame_equal(decoded["recommendations"], _summary()["recommendations"])
+    pd.testing.assert_frame_equal(decoded["major_holders"], _summary()["major_holders"])
+
+def test_plain_documents_and_frames_use_json_and_parquet():
+    assert encode_value({"a": [1, 2]})[0] == "json"
+    frame = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.date_range("2024-01-01", periods=2, name="Date"))
+    codec, payload = encode_value(frame)
+    assert codec in ("parquet", "frame_json")
+    pd.testing.assert_frame_equal(decode_value(codec, payload), frame, check_freq=False)
+
+def test_langchain_messages_keep_their_metadata():
+    messages = pytest.importorskip("langchain_core.messages")
+    message = messages.AIMessage(content="report", usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15})
+    decoded = decode_value(*encode_value(message))
+    assert decoded.content == "report"
+    assert decoded.usage_metadata["input_tokens"] == 12
+
+def test_unsupported_values_stay_in_memory(tmp_path):
+    cache = TieredCache(disk=SQLiteCache(str(tmp_path / "cache.sqlite")))
+    value = {"when": object()}
+    with pytest.raises(UnsupportedValue):
+        encode_value(value)
+    cache.set("yf_summary_X", value)
+    assert cache.get("yf_summary_X") is value
+    assert cache.disk.get("yf_summary_X") is None
+
+def test_pickled_rows_are_never_loaded(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    disk = SQLiteCache(path)
+    with sqlite3.connect(path) as connection:
+        connection.execute("INSERT INTO cache VALUES (?, ?, ?, ?)",
+                           ("yf_summary_X", "pickle", pickle.dumps({"a": 1}), time.time() + 60))
+    assert disk.get("yf_summary_X") is None
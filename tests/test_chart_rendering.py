@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualizations import chart_rendering
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+@pytest.fixture(scope="module", autouse=True)
+def render_pool():
+    yield
+    chart_rendering.shutdown_render_pool()
+
+def _api_results():
+    index = pd.bdate_range("2024-01-01", periods=120, name="Date")
+    prices = pd.DataFrame({"Close": np.linspace(100, 160, 120), "Volume": np.full(120, 5e6)}, index=index)
+    return {"AAPL_price_history": prices, "MSFT_price_history": prices[["Close"]] * 3}
+
+def _annual_statements():
+    index = pd.MultiIndex.from_product(
+        [["AAPL"], pd.to_datetime(["2021-12-31", "2022-12-31", "2023-12-31"])], names=["ticker", "fiscalDateEnding"]
+    )
+    return pd.DataFrame({"totalRevenue": [365e9, 394e9, 383e9]}, index=index)
+
+def test_specs_are_plain_data_for_every_chart():
+    specs = chart_rendering.build_chart_specs(_api_results(), _annual_statements())
+    assert [spec["name"] for spec in specs] == [
+        "AAPL_price_chart", "AAPL_volume_chart", "MSFT_price_chart", "AAPL_revenue_chart"
+    ]
+    revenue = specs[-1]
+    assert list(revenue["x"]) == ["2021-12-31", "2022-12-31", "2023-12-31"]
+    assert list(revenue["y"]) == [365e9, 394e9, 383e9]
+    assert all(isinstance(spec["y"], np.ndarray) for spec in specs)
+
+def test_render_chart_encodes_without_pyplot():
+    spec = chart_rendering.build_chart_specs(_api_results(), pd.DataFrame())[0]
+    assert chart_rendering.render_chart(spec, "png").startswith(PNG_SIGNATURE)
+    assert b"<svg" in chart_rendering.render_chart(spec, "svg")
+    with pytest.raises(ValueError, match="Unsupported chart format"):
+        chart_rendering.render_chart(spec, "gif")
+
+def test_pool_renders_the_same_charts_as_the_caller():
+    specs = chart_rendering.build_chart_specs(_api_results(), _annual_statements())
+    parallel = chart_rendering.render_charts(specs, max_workers=2)
+    serial = chart_rendering.render_charts(specs, parallel=False)
+    assert list(parallel) == [spec["name"] for spec in specs]
+    assert all(chart.startswith(PNG_SIGNATURE) for chart in parallel.values())
+    assert parallel == serial
+
+def test_output_dir_receives_one_file_per_chart(tmp_path):
+    specs = chart_rendering.build_chart_specs(_api_results(), pd.DataFrame())
+    output_dir = str(tmp_path / "charts")
+    paths = dict(chart_rendering.iter_render_charts(specs, output_dir=output_dir, max_workers=2))
+    assert sorted(paths) == sorted(spec["name"] for spec in specs)
+    for name, path in paths.items():
+        assert path == os.path.join(output_dir, f"{name}.png")
+        with open(path, "rb") as chart:
+            assert chart.read(8) == PNG_SIGNATURE
@@ -0,0 +1,34 @@
+import numpy as np
+
+from data.data_processor import DataProcessor
+
+def _statement(*rows):
+    return {"annualReports": [{"fiscalDateEnding": date, "reportedCurrency": "USD", **items} for date, items in rows]}
+
+def test_normalize_fundamentals_merges_statements():
+    fundamentals = {
+        "AAPL": {
+            "income_statement": _statement(("2023-09-30", {"totalRevenue": "383285000000"}),
+                                           ("2024-09-28", {"totalRevenue": "391035000000"})),
+            "balance_sheet": _statement(("2024-09-28", {"totalAssets": "364980000000"}))
+        }
+    }
+    frame = DataProcessor().normalize_fundamentals(fundamentals)
+    assert list(frame.index.get_level_values("fiscal_date").year) == [2023, 2024]
+    assert frame["totalRevenue"].dtype == np.float64
+    assert np.isnan(frame["totalAssets"].iloc[0])
+    assert frame["totalAssets"].iloc[1] == 364980000000
+
+def test_normalize_fundamentals_tolerates_repeated_and_bad_dates():
+    fundamentals = {
+        "MSFT": {
+            "income_statement": _statement(("2024-12-31", {"totalRevenue": "100"}),
+                                           ("2024-12-31", {"totalRevenue": "999"}),
+                                           ("None", {"totalRevenue": "5"})),
+            "cash_flow": _statement(("2024-12-31", {"operatingCashflow": "40"}))
+        }
+    }
+    frame = DataProcessor().normalize_fundamentals(fundamentals)
+    assert len(frame) == 1
+    assert frame["totalRevenue"].iloc[0] == 100
+    assert frame["operatingCashflow"].iloc[0] == 40
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from visualizations.downsampling import bucket_aggregate, downsample_spec, lttb
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[437] = 10.0
+    y[801] = -10.0
+    xs, ys = lttb(x, y, 100)
+    assert len(xs) == 100
+    assert xs[0] == 0 and xs[-1] == 999
+    assert np.all(np.diff(xs) > 0)
+    assert 437 in xs and 801 in xs
+
+def test_lttb_passthrough_and_nan_handling():
+    x = np.arange(10)
+    y = np.arange(10, dtype=float)
+    y[3] = np.nan
+    xs, ys = lttb(x, y, 50)
+    assert len(xs) == 9 and 3 not in xs
+    xs, ys = lttb(x, y, 2)
+    assert len(xs) == 9
+
+def test_lttb_datetime_axis():
+    x = np.arange("2020-01-01", "2024-01-01", dtype="datetime64[D]")
+    y = np.cumsum(np.random.default_rng(0).normal(size=len(x)))
+    xs, ys = lttb(x, y, 200)
+    assert xs.dtype == x.dtype
+    assert len(xs) == 200 and xs[0] == x[0] and xs[-1] == x[-1]
+
+def test_bucket_aggregate_sum_mean_max():
+    x = np.arange(100, dtype=float)
+    y = np.ones(100)
+    starts, sums, width = bucket_aggregate(x, y, 10, how="sum")
+    assert len(starts) == 10 and sums.sum() == 100
+    assert width == pytest.approx(9.9 * 0.9)
+    _, means, _ = bucket_aggregate(x, y, 10)
+    assert np.all(means == 1.0)
+    y[42] = 7.0
+    _, maxima, _ = bucket_aggregate(x, y, 10, how="max")
+    assert maxima.max() == 7.0
+
+def test_downsample_spec_leaves_unmarked_series_alone():
+    spec = {"x": np.arange(5000), "y": np.arange(5000, dtype=float), "downsample": None}
+    assert downsample_spec(spec, 6, 100) is spec
+    reduced = downsample_spec(dict(spec, downsample="lttb"), 6, 100)
+    assert len(reduced["x"]) == 600
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from api_integration.cache import TieredCache
+from api_integration.enhanced_api_connector import EnhancedAPIConnector
+from api_integration.rate_limiter import RateLimiter
+
+UNLIMITED = {provider: {"per_minute": None, "per_day": None} for provider in ("alpha_vantage", "twelve_data", "yahoo")}
+
+class Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+class TransportStandIn:
+    """HTTPTransport stand-in answering every request with its symbol, or failing for `failing` symbols
+
+    Tracks the most requests in flight at once per provider URL.
+    """
+
+    def __init__(self, failing=(), delay=0.0, payload=None):
+        self.failing = set(failing)
+        self.delay = delay
+        self.payload = payload or (lambda url, params: {"symbol": params["symbol"]})
+        self.requests = []
+        self.in_flight = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, **kwargs):
+        provider = "twelve_data" if "twelvedata" in url else "alpha_vantage"
+        with self._lock:
+            self.requests.append((url, dict(params)))
+            self.in_flight[provider] = self.in_flight.get(provider, 0) + 1
+            self.peak[provider] = max(self.peak.get(provider, 0), self.in_flight[provider])
+        try:
+            time.sleep(self.delay)
+            if params["symbol"] in self.failing:
+                raise ConnectionError(f"Cannot reach {url}")
+            return Response(self.payload(url, params))
+        finally:
+            with self._lock:
+                self.in_flight[provider] -= 1
+
+class AsyncTransportStandIn(TransportStandIn):
+    """AsyncHTTPTransport stand-in; waits with asyncio.sleep so requests overlap on one thread"""
+
+    async def get(self, url, params=None, **kwargs):
+        provider = "twelve_data" if "twelvedata" in url else "alpha_vantage"
+        self.requests.append((url, dict(params)))
+        self.in_flight[provider] = self.in_flight.get(provider, 0) + 1
+        self.peak[provider] = max(self.peak.get(provider, 0), self.in_flight[provider])
+        try:
+            await asyncio.sleep(self.delay)
+            if params["symbol"] in self.failing:
+                raise ConnectionError(f"Cannot reach {url}")
+            return Response(self.payload(url, params))
+        finally:
+            self.in_flight[provider] -= 1
+
+class YahooStandIn:
+    """yfinance stand-in with no price history, so indicators fall back to Twelve Data"""
+
+    def Ticker(self, symbol):
+        return self
+
+    def history(self, start=None, end=None):
+        return pd.DataFrame()
+
+def _connector(tmp_path, transport, **kwargs) -> EnhancedAPIConnector:
+    return EnhancedAPIConnector(
+        {"alpha_vantage": "key", "twelve_data": "key"}, transport=transport, cache=TieredCache(),
+        rate_limiter=RateLimiter(UNLIMITED), price_dir=str(tmp_path / "prices"), **kwargs
+    )
+
+def _params(*tickers, apis=("alpha_vantage_fundamentals",)):
+    return {"companies": [{"ticker": ticker} for ticker in tickers], "apis_to_query": list(apis), "time_frame": {}}
+
+def test_batch_fetches_shared_tickers_once(tmp_path):
+    transport = TransportStandIn()
+    connector = _connector(tmp_path, transport)
+    results = connector.query_apis_batch([_params("AAPL", "MSFT"), _params("MSFT")])
+    assert list(results[0]) == ["AAPL_fundamentals", "MSFT_fundamentals"]
+    assert results[1]["MSFT_fundamentals"]["overview"] == {"symbol": "MSFT"}
+    # Four statements per distinct ticker
+    assert len(transport.requests) == 8
+
+@pytest.mark.parametrize("execution_mode", ["threaded", "sequential"])
+def test_batch_failure_only_fails_the_queries_that_need_it(tmp_path, execution_mode):
+    connector = _connector(tmp_path, TransportStandIn(failing={"DOWN"}), execution_mode=execution_mode)
+    results = connector.query_apis_batch([_params("AAPL"), _params("DOWN", "AAPL"), _params("MSFT")])
+    assert results[0]["AAPL_fundamentals"]["overview"] == {"symbol": "AAPL"}
+    assert results[1] == {"error": "Error querying APIs: Cannot reach https://www.alphavantage.co/query"}
+    assert results[2]["MSFT_fundamentals"]["overview"] == {"symbol": "MSFT"}
+
+def test_single_query_still_raises(tmp_path):
+    connector = _connector(tmp_path, TransportStandIn(failing={"DOWN"}))
+    with pytest.raises(ConnectionError):
+        connector.query_apis(_params("AAPL", "DOWN"))
+
+def test_fan_out_respects_provider_concurrency(tmp_path):
+    transport = TransportStandIn(delay=0.02)
+    connector = _connector(tmp_path, transport, provider_concurrency={"alpha_vantage": 3})
+    results = connector.query_apis(_params("A", "B", "C", "D", "E", "F"))
+    assert [results[f"{t}_fundamentals"]["overview"] for t in "ABCDEF"] == [{"symbol": t} for t in "ABCDEF"]
+    assert transport.peak["alpha_vantage"] == 3
+
+def test_sequential_mode_fetches_one_at_a_time(tmp_path):
+    transport = TransportStandIn(delay=0.01)
+    connector = _connector(tmp_path, transport, execution_mode="sequential")
+    connector.query_apis(_params("A", "B", "C"))
+    assert transport.peak["alpha_vantage"] == 1
+
+@pytest.mark.parametrize("twelve_data_slots", [1, 3])
+def test_twelve_data_fallback_uses_its_own_slots(tmp_path, twelve_data_slots):
+    transport = TransportStandIn(delay=0.02)
+    connector = _connector(tmp_path, transport, yahoo_client=YahooStandIn(),
+                           provider_concurrency={"yahoo": 1, "twelve_data": twelve_data_slots})
+    results = connector.query_apis(_params("A", "B", "C", apis=["twelve_data_technical"]))
+    assert results["A_technical"]["sma"] == {"symbol": "A"}
+    assert transport.peak["twelve_data"] == twelve_data_slots
+
+def test_twelve_data_error_payloads_are_not_cached(tmp_path):
+    throttled = {"code": 429, "message": "You have run out of API credits", "status": "error"}
+    transport = TransportStandIn(payload=lambda url, params: throttled)
+    connector = _connector(tmp_path, transport, technical_source="twelve_data")
+    assert connector.get_twelve_data_technical("A")["sma"] == throttled
+    connector.get_twelve_data_technical("A")
+    assert len(transport.requests) == 8
+
+    transport.payload = lambda url, params: {"status": "ok", "values": []}
+    connector.get_twelve_data_technical("A")
+    connector.get_twelve_data_technical("A")
+    assert len(transport.requests) == 12
+
+def test_async_fan_out_matches_the_threaded_path(tmp_path):
+    transport = AsyncTransportStandIn(delay=0.01)
+    connector = _connector(tmp_path, TransportStandIn(), async_transport=transport,
+                           provider_concurrency={"alpha_vantage": 3})
+    results = asyncio.run(connector.aquery_apis(_params("A", "B", "C")))
+    assert results == _connector(tmp_path, TransportStandIn()).query_apis(_params("A", "B", "C"))
+    # Every statement for every ticker was in flight at once
+    assert transport.peak["alpha_vantage"] == 12
+
+def test_async_fan_out_respects_provider_concurrency(tmp_path):
+    transport = AsyncTransportStandIn(delay=0.01)
+    connector = _connector(tmp_path, TransportStandIn(), async_transport=transport, yahoo_client=YahooStandIn(),
+                           provider_concurrency={"alpha_vantage": 2, "yahoo": 1, "twelve_data": 1})
+    params = _params("A", "B", "C", "D", apis=["alpha_vantage_fundamentals", "twelve_data_technical"])
+    results = asyncio.run(connector.aquery_apis(params))
+    assert results["D_technical"]["rsi"] == {"symbol": "D"}
+    # A slot covers one ticker's fetch, which sends its requests together
+    assert transport.peak["alpha_vantage"] == 2 * 4
+    assert transport.peak["twelve_data"] == 4
+
+def test_concurrent_async_callers_share_one_fetch(tmp_path):
+    transport = AsyncTransportStandIn(delay=0.01)
+    connector = _connector(tmp_path, TransportStandIn(), async_transport=transport)
+
+    async def callers():
+        return await asyncio.gather(*(connector.aget_alpha_vantage_fundamentals("A") for _ in range(5)))
+
+    results = asyncio.run(callers())
+    assert all(result == results[0] for result in results)
+    assert len(transport.requests) == 4
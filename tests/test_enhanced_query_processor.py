@@ -0,0 +1,104 @@
+import json
+import threading
+
+import pytest
+
+query_module = pytest.importorskip("query_processing.enhanced_query_processor", exc_type=ImportError)
+
+class LLMStandIn:
+    def __init__(self, answer=None):
+        self.answer = answer or {"start_date": "None", "end_date": "None", "period": "None"}
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return json.dumps(self.answer)
+
+def _processor(spacy_model_path, llm=None):
+    return query_module.EnhancedQueryProcessor(
+        "unused", model_name=spacy_model_path, ticker_listings_path=None, llm=llm or LLMStandIn()
+    )
+
+def test_batch_reports_parse_failures_per_query(spacy_model_path, monkeypatch):
+    parse_time_frame = query_module.parse_time_frame
+
+    def failing_parse(query, *args, **kwargs):
+        if "broken" in query:
+            raise ValueError("day is out of range for month")
+        return parse_time_frame(query, *args, **kwargs)
+
+    monkeypatch.setattr(query_module, "parse_time_frame", failing_parse)
+    results = _processor(spacy_model_path).process_queries(["Apple revenue in 2023", "broken query", "Summarize TSLA"])
+    assert results[0]["companies"] == [{"name": "apple", "ticker": "AAPL"}]
+    assert results[1] == {"error": "Error processing query: day is out of range for month"}
+    assert results[2]["companies"] == [{"name": "TSLA", "ticker": "TSLA"}]
+
+def test_impossible_date_goes_to_the_llm(spacy_model_path):
+    llm = LLMStandIn({"start_date": "2024-02-29", "end_date": "2024-02-30", "period": "None"})
+    parameters = _processor(spacy_model_path, llm).process_query("AAPL close on 2024-02-30")
+    assert len(llm.prompts) == 1
+    # The LLM's valid start is used, its impossible end is not
+    assert parameters["time_frame"]["start_date"] == "2024-02-29"
+    assert parameters["time_frame"]["end_date"] == "2024-12-31"
+
+def test_processors_load_the_model_lazily_and_share_it(spacy_model_path, monkeypatch):
+    loaded = []
+    get_nlp = query_module.get_nlp
+    monkeypatch.setattr(query_module, "get_nlp", lambda name: loaded.append(name) or get_nlp(name))
+    first, second = _processor(spacy_model_path), _processor(spacy_model_path)
+    assert loaded == []
+    assert first.nlp is second.nlp
+    assert first.process_query("Compare TSLA revenue")["metrics"] == ["revenue"]
+
+class CountingNLP:
+    """Wraps a pipeline and counts how it is run"""
+
+    def __init__(self, nlp):
+        self._nlp = nlp
+        self.calls = []
+        self.ran = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self._nlp, name)
+
+    def __call__(self, text):
+        self.calls.append("call")
+        self.ran.set()
+        return self._nlp(text)
+
+    def pipe(self, texts, **kwargs):
+        self.calls.append("pipe")
+        self.ran.set()
+        return self._nlp.pipe(texts, **kwargs)
+
+@pytest.fixture
+def counting_nlp(spacy_model_path, monkeypatch):
+    counting = CountingNLP(query_module.get_nlp(spacy_model_path))
+    monkeypatch.setattr(query_module, "get_nlp", lambda name: counting)
+    return counting
+
+def test_query_runs_the_pipeline_once(spacy_model_path, counting_nlp):
+    parameters = _processor(spacy_model_path).process_query("Analyze Apple revenue and EBITDA in 2023")
+    assert counting_nlp.calls == ["call"]
+    assert parameters["companies"] == [{"name": "apple", "ticker": "AAPL"}]
+    assert parameters["metrics"] == ["revenue", "EBITDA"]
+    assert parameters["analysis_type"] == "analysis"
+
+def test_batch_pipes_once_and_matches_single_queries(spacy_model_path, counting_nlp):
+    queries = ["Analyze Apple revenue in 2023", "Compare MSFT and NVDA EBITDA", "Tesla financials last year"]
+    processor = _processor(spacy_model_path)
+    batched = processor.process_queries(queries, batch_size=2)
+    assert counting_nlp.calls == ["pipe"]
+    assert batched == [processor.process_query(query) for query in queries]
+
+def test_llm_time_frame_overlaps_the_pipeline(spacy_model_path, counting_nlp):
+    class WaitingLLM(LLMStandIn):
+        def __call__(self, prompt):
+            # Only answers once the NER pass has started, so a serial run would time out
+            self.overlapped = counting_nlp.ran.wait(timeout=5)
+            return super().__call__(prompt)
+
+    llm = WaitingLLM({"start_date": "2024-01-01", "end_date": "2024-03-31", "period": "Q1 2024"})
+    parameters = _processor(spacy_model_path, llm).process_query("AAPL performance recently")
+    assert llm.overlapped
+    assert parameters["time_frame"]["start_date"] == "2024-01-01"
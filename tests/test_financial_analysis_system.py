@@ -0,0 +1,192 @@
+import asyncio
+import json
+
+import pandas as pd
+
+import pytest
+
+from api_integration.cache import TieredCache
+from api_integration.enhanced_api_connector import EnhancedAPIConnector
+from api_integration.rate_limiter import RateLimiter
+
+system_module = pytest.importorskip("agents.financial_analysis_system", exc_type=ImportError)
+helper_agent = pytest.importorskip("agents.helper_agent", exc_type=ImportError)
+
+UNLIMITED = {provider: {"per_minute": None, "per_day": None} for provider in ("alpha_vantage", "twelve_data", "yahoo")}
+
+class Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+class TransportStandIn:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.requests = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.requests += 1
+        if params["symbol"] in self.failing:
+            raise ConnectionError("Alpha Vantage is unreachable")
+        return Response({"symbol": params["symbol"]})
+
+class AsyncTransportStandIn(TransportStandIn):
+    async def get(self, url, params=None, **kwargs):
+        await asyncio.sleep(0)
+        return super().get(url, params, **kwargs)
+
+class QueryProcessorStandIn:
+    """Treats every word of the query as a ticker; "BAD" fails to parse"""
+
+    def __init__(self, apis=("alpha_vantage_fundamentals",)):
+        self.apis = list(apis)
+
+    def process_query(self, query):
+        if "BAD" in query:
+            raise ValueError("day is out of range for month")
+        return {"companies": [{"ticker": word} for word in query.split()],
+                "apis_to_query": self.apis, "time_frame": {}}
+
+    def process_queries(self, queries):
+        outputs = []
+        for query in queries:
+            try:
+                outputs.append(self.process_query(query))
+            except ValueError as e:
+                outputs.append({"error": f"Error processing query: {str(e)}"})
+        return outputs
+
+class YahooStandIn:
+    def Ticker(self, symbol):
+        return self
+
+    def history(self, start=None, end=None):
+        dates = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        return pd.DataFrame({"Close": range(100, 100 + len(dates)), "Volume": 1_000_000}, index=dates)
+
+class StreamingLLMStandIn:
+    """Answers analyst prompts whole and streams the report in small chunks"""
+
+    report = {"executive_summary": "Steady", "conclusion": "Hold"}
+
+    def __call__(self, prompt):
+        return llm_stand_in(prompt)
+
+    def _chunks(self):
+        text = json.dumps(self.report)
+        return [text[start:start + 8] for start in range(0, len(text), 8)]
+
+    def stream(self, prompt):
+        yield from self._chunks()
+
+    async def astream(self, prompt):
+        for chunk in self._chunks():
+            yield chunk
+
+def llm_stand_in(prompt):
+    return json.dumps({"prompt_chars": len(prompt)})
+
+def _system(tmp_path, transport, async_transport=None, llm=llm_stand_in, query_processor=None):
+    connector = EnhancedAPIConnector(
+        {"alpha_vantage": "key", "twelve_data": "key"}, transport=transport, async_transport=async_transport,
+        cache=TieredCache(),
+        rate_limiter=RateLimiter(UNLIMITED), price_dir=str(tmp_path / "prices"), yahoo_client=YahooStandIn()
+    )
+    # Skip __init__, which builds a real OpenAI client
+    system = system_module.FinancialAnalysisSystem.__new__(system_module.FinancialAnalysisSystem)
+    system.chart_format = None
+    system.llm = llm
+    system.query_processor = query_processor or QueryProcessorStandIn()
+    system.api_connector = connector
+    system.workflow = helper_agent.create_financial_analysis_graph(connector, system.query_processor, llm)
+    system.async_workflow = helper_agent.create_financial_analysis_graph(
+        connector, system.query_processor, llm, use_async=True
+    )
+    return system
+
+def test_batch_shares_fetches_between_queries(tmp_path):
+    transport = TransportStandIn()
+    results = _system(tmp_path, transport).process_financial_queries(["AAPL MSFT", "MSFT", "AAPL"])
+    assert all("report" in result for result in results)
+    assert transport.requests == 8
+
+def test_batch_isolates_parse_and_fetch_failures(tmp_path):
+    system = _system(tmp_path, TransportStandIn(failing={"DOWN"}))
+    results = system.process_financial_queries(["AAPL", "BAD", "DOWN", "MSFT"])
+    assert "report" in results[0] and "report" in results[3]
+    assert results[1] == {"error": "Error processing query: day is out of range for month"}
+    assert results[2] == {"error": "Error querying APIs: Alpha Vantage is unreachable"}
+    # The same failures from the single-query path
+    assert system.process_financial_query("BAD") == results[1]
+    assert system.process_financial_query("DOWN") == results[2]
+
+def test_async_queries_run_together_and_match_the_sync_path(tmp_path):
+    queries = ["AAPL MSFT", "MSFT", "BAD", "DOWN"]
+    async_transport = AsyncTransportStandIn(failing={"DOWN"})
+    system = _system(tmp_path, TransportStandIn(failing={"DOWN"}), async_transport)
+
+    async def run_all():
+        return await asyncio.gather(*(system.aprocess_financial_query(query) for query in queries))
+
+    results = asyncio.run(run_all())
+    assert "report" in results[0] and "report" in results[1]
+    assert results[2] == {"error": "Error processing query: day is out of range for month"}
+    assert results[3] == {"error": "Error querying APIs: Alpha Vantage is unreachable"}
+    # Four statements each for AAPL, MSFT (shared by two queries) and the failing DOWN
+    assert async_transport.requests == 12
+
+    sync_results = _system(tmp_path / "sync", TransportStandIn(failing={"DOWN"})).process_financial_queries(queries)
+    assert [result.get("report") for result in results] == [result.get("report") for result in sync_results]
+
+def _streaming_system(tmp_path):
+    query_processor = QueryProcessorStandIn(apis=["alpha_vantage_fundamentals", "yahoo_finance_price"])
+    return _system(tmp_path, TransportStandIn(failing={"DOWN"}), AsyncTransportStandIn(failing={"DOWN"}),
+                   llm=StreamingLLMStandIn(), query_processor=query_processor)
+
+def _collapse(events):
+    # Runs of the same event (tokens, datasets, analyses in completion order) count once
+    kinds = []
+    for event in events:
+        if not kinds or kinds[-1] != event["event"]:
+            kinds.append(event["event"])
+    return kinds
+
+def _check_stream(events):
+    assert _collapse(events) == ["query_parameters", "dataset", "analysis", "report_token", "report_section",
+                                 "chart", "done"]
+    assert sorted(event["name"] for event in events if event["event"] == "dataset") == [
+        "AAPL_fundamentals", "AAPL_price_history"
+    ]
+    assert sorted(event["name"] for event in events if event["event"] == "analysis") == [
+        "market_analysis", "sec_analysis", "technical_analysis"
+    ]
+    tokens = [event["data"] for event in events if event["event"] == "report_token"]
+    assert len(tokens) > 1
+    assert json.loads("".join(tokens)) == StreamingLLMStandIn.report
+    assert [(event["name"], event["data"]) for event in events if event["event"] == "report_section"] == [
+        ("executive_summary", "Steady"), ("conclusion", "Hold")
+    ]
+    charts = [event["name"] for event in events if event["event"] == "chart"]
+    assert charts == ["AAPL_price_chart", "AAPL_volume_chart"]
+    done = events[-1]["data"]
+    assert done["report"]["visualizations"] == charts
+    assert list(done["visualizations"]) == charts
+
+def test_stream_yields_results_in_pipeline_order(tmp_path):
+    events = list(_streaming_system(tmp_path).stream_financial_query("AAPL"))
+    _check_stream(events)
+    result = _streaming_system(tmp_path / "blocking").process_financial_query("AAPL")
+    assert events[-1]["data"]["report"] == result["report"]
+
+def test_async_stream_yields_the_same_events(tmp_path):
+    async def collect():
+        return [event async for event in _streaming_system(tmp_path).astream_financial_query("AAPL")]
+
+    _check_stream(asyncio.run(collect()))
+
+def test_stream_ends_with_an_error_event(tmp_path):
+    events = list(_streaming_system(tmp_path).stream_financial_query("DOWN"))
+    assert _collapse(events) == ["query_parameters", "error"]
+    assert events[-1]["data"] == "Error querying APIs: Alpha Vantage is unreachable"
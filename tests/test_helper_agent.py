@@ -0,0 +1,86 @@
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+helper_agent = pytest.importorskip("agents.helper_agent", exc_type=ImportError)
+
+REPORT_MARKER = "Generate a comprehensive financial report"
+
+class ConnectorStandIn:
+    def __init__(self, api_results):
+        self.api_results = api_results
+
+    def query_apis(self, query_parameters):
+        return self.api_results
+
+class QueryProcessorStandIn:
+    def process_query(self, query):
+        return {"companies": [{"ticker": "AAPL"}], "apis_to_query": ["alpha_vantage_fundamentals"]}
+
+class AnalystsLLM:
+    """Answers analyst prompts only once all expected analysts are waiting at once
+
+    If the analysts ran one after another the barrier would time out, so a
+    successful run shows they overlapped.
+    """
+
+    def __init__(self, analysts=3, failing=()):
+        self.barrier = threading.Barrier(analysts, timeout=5)
+        self.failing = failing
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        if REPORT_MARKER in prompt:
+            return json.dumps({"executive_summary": "ok"})
+        self.barrier.wait()
+        for marker in self.failing:
+            if marker in prompt:
+                raise RuntimeError(f"{marker} unavailable")
+        return json.dumps({"analysis": "ok"})
+
+def _api_results(with_prices=True):
+    api_results = {"AAPL_fundamentals": {"overview": {"Name": "Apple"}}}
+    if with_prices:
+        api_results["AAPL_price_history"] = pd.DataFrame(
+            {"Close": [1.0, 2.0]}, index=pd.date_range("2024-01-01", periods=2, name="Date")
+        )
+    return api_results
+
+def _run(llm, api_results):
+    graph = helper_agent.create_financial_analysis_graph(
+        ConnectorStandIn(api_results), QueryProcessorStandIn(), llm
+    )
+    return graph.invoke({"query": "How is AAPL doing?"})
+
+def test_merge_errors_keeps_every_distinct_error():
+    assert helper_agent.merge_errors("", "b") == "b"
+    assert helper_agent.merge_errors("a", "") == "a"
+    assert helper_agent.merge_errors("a", "a") == "a"
+    assert helper_agent.merge_errors("a", "b") == "a; b"
+
+def test_analysts_run_in_parallel_before_the_report():
+    llm = AnalystsLLM()
+    state = _run(llm, _api_results())
+    assert state["report"] == {"executive_summary": "ok"}
+    assert state["sec_analysis"] == state["market_analysis"] == state["technical_analysis"] == {"analysis": "ok"}
+    # The report is written once, after all three analyses
+    assert REPORT_MARKER in llm.prompts[-1]
+    assert len(llm.prompts) == 4
+
+def test_concurrent_failures_are_merged_and_skip_the_report():
+    llm = AnalystsLLM(failing=("SEC filing expert", "technical analysis expert"))
+    state = _run(llm, _api_results())
+    assert "report" not in state
+    assert not any(REPORT_MARKER in prompt for prompt in llm.prompts)
+    errors = sorted(state["error"].split("; "))
+    assert errors == ["Error analyzing SEC filings: SEC filing expert unavailable",
+                      "Error performing technical analysis: technical analysis expert unavailable"]
+
+def test_technical_analysis_is_skipped_without_prices():
+    llm = AnalystsLLM(analysts=2)
+    state = _run(llm, _api_results(with_prices=False))
+    assert state["technical_analysis"] == {"message": "No price data available for technical analysis"}
+    assert "report" in state
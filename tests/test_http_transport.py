@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api_integration.http_transport import AsyncHTTPTransport, HTTPTransport
+
+class StubProvider(BaseHTTPRequestHandler):
+    """Answers each GET with the next (status, headers) in the server's script, then 200"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.client_address)
+            status, headers = server.script.pop(0) if server.script else (200, {})
+        body = b'{"ok": true}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def provider():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubProvider)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.script = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/query"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_throttling_and_server_errors_are_retried(provider):
+    provider.script = [(429, {"Retry-After": "0"}), (503, {})]
+    transport = HTTPTransport(backoff_factor=0.001)
+    response = transport.get(provider.url, params={"symbol": "AAPL"})
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert len(provider.requests) == 3
+
+def test_last_response_is_returned_when_retries_run_out(provider):
+    provider.script = [(502, {})] * 5
+    response = HTTPTransport(max_retries=2, backoff_factor=0.001).get(provider.url)
+    assert response.status_code == 502
+    assert len(provider.requests) == 3
+
+def test_client_errors_are_not_retried(provider):
+    provider.script = [(404, {})]
+    assert HTTPTransport(backoff_factor=0.001).get(provider.url).status_code == 404
+    assert len(provider.requests) == 1
+
+def test_connections_are_kept_alive_between_calls(provider):
+    transport = HTTPTransport()
+    for _ in range(5):
+        transport.get(provider.url)
+    # Every request arrived over the same client socket
+    assert len(set(provider.requests)) == 1
+
+def test_retry_after_is_honoured_up_to_the_cap():
+    class Throttled:
+        headers = {"Retry-After": "120"}
+
+    transport = HTTPTransport(backoff_factor=1, max_backoff=5)
+    assert transport._backoff(0, Throttled()) == 5
+    assert all(0 <= transport._backoff(2, None) <= 4 for _ in range(20))
+
+def test_async_transport_retries_and_reuses_connections(provider):
+    provider.script = [(500, {}), (429, {"Retry-After": "0"})]
+
+    async def fetch_all():
+        transport = AsyncHTTPTransport(backoff_factor=0.001)
+        first = await transport.get(provider.url)
+        rest = [await transport.get(provider.url) for _ in range(3)]
+        await transport.aclose()
+        return [first, *rest]
+
+    responses = asyncio.run(fetch_all())
+    assert [response.status_code for response in responses] == [200] * 4
+    assert len(provider.requests) == 6
+    assert len(set(provider.requests[2:])) == 1
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from agents.llm_cache import CachedLLM, acomplete, complete, stream_completion
+from api_integration.cache import TieredCache
+
+messages = pytest.importorskip("langchain_core.messages")
+
+class ChatStandIn:
+    """Chat-model shaped stand-in that reports usage like ChatOpenAI"""
+
+    model_name = "chat-stand-in"
+    temperature = 0
+
+    def invoke(self, prompt):
+        return messages.AIMessage(content="answer", usage_metadata={
+            "input_tokens": 11, "output_tokens": 2, "total_tokens": 13})
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+    def stream(self, prompt):
+        yield messages.AIMessageChunk(content="ans")
+        yield messages.AIMessageChunk(content="wer", usage_metadata={
+            "input_tokens": 11, "output_tokens": 2, "total_tokens": 13})
+
+def test_complete_reports_provider_usage():
+    usage = {}
+    assert complete(ChatStandIn(), "prompt", usage) == "answer"
+    assert usage == {"prompt_tokens": 11, "completion_tokens": 2, "source": "provider"}
+
+def test_stream_collects_usage_from_chunks():
+    usage = {}
+    assert "".join(stream_completion(ChatStandIn(), "prompt", usage)) == "answer"
+    assert usage["prompt_tokens"] == 11 and usage["completion_tokens"] == 2
+
+def test_cache_hits_cost_no_tokens():
+    llm = CachedLLM(ChatStandIn(), cache=TieredCache(disk=None))
+    first, second = {}, {}
+    assert asyncio.run(acomplete(llm, "prompt", first)) == "answer"
+    assert asyncio.run(acomplete(llm, "prompt", second)) == "answer"
+    assert first["source"] == "provider"
+    assert second == {"prompt_tokens": 0, "completion_tokens": 0, "source": "cache"}
+
+def test_models_without_usage_leave_it_empty():
+    usage = {}
+    assert complete(lambda prompt: "text", "prompt", usage) == "text"
+    assert usage == {}
+
+def test_invoke_results_do_not_leak_into_text_calls():
+    llm = CachedLLM(ChatStandIn(), cache=TieredCache(disk=None))
+    assert isinstance(llm.invoke("prompt"), messages.AIMessage)
+    assert llm("prompt") == "answer"
+    assert complete(llm, "prompt") == "answer"
+    assert asyncio.run(acomplete(llm, "prompt")) == "answer"
+    # Each call style is still served from its own cache entry
+    assert isinstance(llm.invoke("prompt"), messages.AIMessage)
+    assert llm.stats()["hits"] == 3
+
+def test_acall_models_report_usage():
+    class AcallStandIn:
+        async def acall(self, prompt):
+            return ChatStandIn().invoke(prompt)
+
+    usage = {}
+    assert asyncio.run(acomplete(AcallStandIn(), "prompt", usage)) == "answer"
+    assert usage["source"] == "provider" and usage["prompt_tokens"] == 11
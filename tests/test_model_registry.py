@@ -0,0 +1,35 @@
+import threading
+
+from query_processing import model_registry
+
+def test_model_is_loaded_once_and_shared(spacy_model_path, monkeypatch):
+    loads = []
+    load = model_registry.spacy.load
+
+    def counting_load(name, **kwargs):
+        loads.append(name)
+        return load(name, **kwargs)
+
+    monkeypatch.setattr(model_registry.spacy, "load", counting_load)
+    monkeypatch.setattr(model_registry, "_models", {})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(model_registry.get_nlp(spacy_model_path)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [spacy_model_path]
+    assert all(nlp is results[0] for nlp in results)
+
+def test_unused_pipes_are_excluded(spacy_model_path):
+    nlp = model_registry.get_nlp(spacy_model_path)
+    assert nlp.pipe_names == ["ner"]
+    assert "attribute_ruler" in model_registry.get_nlp(spacy_model_path, exclude=()).pipe_names
+
+def test_stats_report_the_cold_start(spacy_model_path):
+    model_registry.get_nlp(spacy_model_path)
+    stats = model_registry.model_stats(spacy_model_path)
+    assert stats["models"][spacy_model_path]["load_seconds"] > 0
+    assert stats["current_rss_bytes"] > 0
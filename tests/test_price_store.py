@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from api_integration.columnar_store import ColumnarPriceStore
+from api_integration.price_store import PriceHistoryStore, resolve_window
+
+class FakeFetch:
+    """Daily bars whose close encodes the date, recording every requested range"""
+
+    def __init__(self):
+        self.ranges = []
+
+    def __call__(self, start: date, end: date) -> pd.DataFrame:
+        self.ranges.append((start, end))
+        dates = pd.bdate_range(start, end, tz="America/New_York")
+        return pd.DataFrame({"Close": dates.dayofyear.to_numpy(dtype=np.float64),
+                             "Volume": np.full(len(dates), 100, dtype=np.int64)}, index=dates)
+
+def _store(tmp_path) -> PriceHistoryStore:
+    return PriceHistoryStore(ColumnarPriceStore(str(tmp_path)))
+
+def test_repeated_window_is_served_from_the_store(tmp_path):
+    store, fetch = _store(tmp_path), FakeFetch()
+    first = store.get("AAA", date(2024, 1, 1), date(2024, 3, 31), fetch)
+    second = store.get("AAA", date(2024, 2, 1), date(2024, 2, 29), fetch)
+    assert fetch.ranges == [(date(2024, 1, 1), date(2024, 3, 31))]
+    assert len(first) == 65
+    assert second.index[0] == pd.Timestamp("2024-02-01") and second.index[-1] == pd.Timestamp("2024-02-29")
+
+def test_disjoint_window_fetches_only_that_window(tmp_path):
+    store, fetch = _store(tmp_path), FakeFetch()
+    store.get("AAA", date(2021, 10, 1), date(2021, 12, 31), fetch)
+    frame = store.get("AAA", date(2010, 1, 1), date(2010, 1, 31), fetch)
+    assert fetch.ranges[-1] == (date(2010, 1, 1), date(2010, 1, 31))
+    assert frame.index.min() >= pd.Timestamp("2010-01-01") and frame.index.max() <= pd.Timestamp("2010-01-31")
+
+def test_window_spanning_two_intervals_fetches_the_gap_between(tmp_path):
+    store, fetch = _store(tmp_path), FakeFetch()
+    store.get("AAA", date(2020, 1, 1), date(2020, 3, 31), fetch)
+    store.get("AAA", date(2020, 7, 1), date(2020, 9, 30), fetch)
+    frame = store.get("AAA", date(2020, 2, 1), date(2020, 8, 31), fetch)
+    assert fetch.ranges[-1] == (date(2020, 4, 1), date(2020, 6, 30))
+    assert len(fetch.ranges) == 3
+    assert frame.index.is_monotonic_increasing and not frame.index.has_duplicates
+
+def test_extending_forward_overlaps_the_last_held_bar(tmp_path):
+    store, fetch = _store(tmp_path), FakeFetch()
+    store.get("AAA", date(2024, 1, 1), date(2024, 1, 31), fetch)
+    store.get("AAA", date(2024, 1, 1), date(2024, 2, 29), fetch)
+    assert fetch.ranges[-1] == (date(2024, 1, 31), date(2024, 2, 29))
+
+def test_stale_bar_for_today_is_refetched(tmp_path):
+    store, fetch = _store(tmp_path), FakeFetch()
+    store.refresh_interval = -1
+    today = date.today()
+    store.get("AAA", today - timedelta(days=30), today, fetch)
+    store.get("AAA", today - timedelta(days=30), today, fetch)
+    assert fetch.ranges[-1] == (today - timedelta(days=1), today)
+
+def test_frames_are_views_on_the_mapped_files(tmp_path):
+    store, fetch = _store(tmp_path), FakeFetch()
+    frame = store.get("AAA", date(2024, 1, 1), date(2024, 1, 31), fetch)
+    _, columns = store.columns.columns("AAA")
+    assert np.shares_memory(frame["Close"].to_numpy(), columns["Close"])
+
+def test_resolve_window_periods_and_dates():
+    today = date(2025, 6, 30)
+    assert resolve_window({"period": "last 2 quarters"}, today) == (date(2024, 12, 30), today)
+    assert resolve_window({}, today) == (date(2020, 6, 30), today)
+    assert resolve_window({"start_date": "2025-01-01", "end_date": "2026-01-01"}, today) == (date(2025, 1, 1), today)
+    # A window starting in the future never reaches the store inverted
+    assert resolve_window({"start_date": "2027-04-01", "end_date": "2027-06-30"}, today) == (date(2020, 6, 30), today)
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from agents.prompt_builder import CHARS_PER_TOKEN, PromptCompactor, estimate_tokens, price_statistics
+
+def _statement_rows(count):
+    return [{"fiscalDateEnding": f"{2024 - year}-12-31", "totalRevenue": str(1000 + year),
+             "netIncome": str(100 + year), "reportedCurrency": "USD", "otherNonOperatingIncome": "None"}
+            for year in range(count)]
+
+def _prices(days=300):
+    index = pd.bdate_range("2023-01-02", periods=days, name="Date")
+    close = 100 + np.cumsum(np.random.default_rng(7).normal(0, 1, days))
+    return pd.DataFrame({"Close": close, "Volume": np.full(days, 1_000_000)}, index=index)
+
+def _api_results():
+    statement = {"annualReports": _statement_rows(20), "quarterlyReports": _statement_rows(80)}
+    return {
+        "AAPL_fundamentals": {
+            "overview": {"Name": "Apple", "Sector": "Technology", "Description": "x" * 5000, "PERatio": "None"},
+            "income_statement": statement, "balance_sheet": statement, "cash_flow": statement
+        },
+        "AAPL_summary": {
+            "info": {"shortName": "Apple Inc.", "marketCap": 3.4e12, "longBusinessSummary": "y" * 5000},
+            "recommendations": pd.DataFrame({"period": [f"-{n}m" for n in range(12)], "buy": range(12)}),
+            "news": [{"title": f"Headline {n}", "link": "https://example.com"} for n in range(50)]
+        },
+        "AAPL_price_history": _prices(),
+        "AAPL_technical": {"RSI": {"values": [{"datetime": str(n), "rsi": "50"} for n in range(500)]}}
+    }
+
+def test_each_analyst_only_sees_its_datasets():
+    compactor = PromptCompactor()
+    sec = json.loads(compactor.digest("sec", _api_results()))["AAPL"]
+    market = json.loads(compactor.digest("market", _api_results()))["AAPL"]
+    technical = json.loads(compactor.digest("technical", _api_results()))["AAPL"]
+
+    assert sec["overview"] == {"Name": "Apple", "Sector": "Technology"}
+    assert len(sec["income_statement"]["annual"]) == 4
+    assert sec["income_statement"]["annual"][0] == {"fiscalDateEnding": "2024-12-31", "totalRevenue": "1000",
+                                                    "netIncome": "100"}
+    assert set(market) == {"info", "recommendations", "news", "price"}
+    assert market["info"] == {"shortName": "Apple Inc.", "marketCap": 3.4e12}
+    assert market["news"] == [f"Headline {n}" for n in range(5)]
+    assert set(technical) == {"price", "indicators"}
+    assert len(technical["indicators"]["RSI"]) == 5
+
+def test_digests_are_far_smaller_than_the_raw_payload():
+    raw = json.dumps(_api_results(), default=str)
+    for analyst in ("sec", "market", "technical"):
+        digest = PromptCompactor().digest(analyst, _api_results())
+        assert estimate_tokens(digest) <= 3000
+        assert len(digest) < len(raw) / 10
+
+def test_tight_budgets_drop_rows_before_truncating():
+    digest = PromptCompactor(token_budget=250).digest("sec", _api_results())
+    sec = json.loads(digest)["AAPL"]
+    assert len(sec["income_statement"]["annual"]) == 2
+    assert len(sec["cash_flow"]["quarterly"]) == 2
+
+def test_digest_is_cut_when_one_row_still_does_not_fit():
+    digest = PromptCompactor(token_budget=50).digest("sec", _api_results())
+    assert digest.endswith("... [truncated]")
+    assert len(digest) == 50 * CHARS_PER_TOKEN + len("... [truncated]")
+
+def test_price_statistics_match_pandas():
+    prices = _prices()
+    close = prices["Close"]
+    stats = price_statistics(prices)
+    assert stats["last_close"] == round(close.iloc[-1], 2)
+    assert stats["period_change_pct"] == round((close.iloc[-1] / close.iloc[0] - 1) * 100, 2)
+    assert stats["change_1m_pct"] == round((close.iloc[-1] / close.iloc[-22] - 1) * 100, 2)
+    assert stats["sma_200"] == round(close.rolling(200).mean().iloc[-1], 2)
+    assert stats["avg_volume_20d"] == 1_000_000
+    assert price_statistics(prices.head(30)).get("sma_50") is None
+    assert price_statistics(pd.DataFrame()) == {}
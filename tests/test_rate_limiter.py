@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+from api_integration.rate_limiter import RateLimiter, RateLimitExceeded, TokenBucket
+
+def test_bucket_refills_at_its_rate():
+    bucket = TokenBucket(capacity=2, refill_per_second=1.0)
+    now = bucket.updated_at
+    bucket.consume()
+    bucket.consume()
+    assert bucket.wait_time(now) == pytest.approx(1.0)
+    assert bucket.wait_time(now + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(now + 5) == 0.0
+    assert bucket.tokens == 2
+
+def test_burst_then_queued_reservations():
+    limiter = RateLimiter({"test": {"per_minute": 60, "per_day": None}})
+    waits = [limiter._reserve("test", None) for _ in range(62)]
+    assert waits[:60] == [0.0] * 60
+    # Each caller past the burst waits one refill interval longer than the previous
+    assert waits[60] == pytest.approx(1.0, abs=0.05)
+    assert waits[61] == pytest.approx(2.0, abs=0.05)
+
+def test_timeout_raises_without_consuming():
+    limiter = RateLimiter({"test": {"per_minute": 1, "per_day": None}})
+    limiter.acquire("test")
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("test", timeout=0.1)
+    assert limiter.buckets["test"][0].tokens == pytest.approx(0.0, abs=0.01)
+
+def test_day_window_limits_independently():
+    limiter = RateLimiter({"test": {"per_minute": 100, "per_day": 2}})
+    limiter.acquire("test")
+    limiter.acquire("test")
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("test", timeout=1)
+
+def test_unknown_and_unlimited_providers_never_wait():
+    limiter = RateLimiter({"free": {"per_minute": None, "per_day": None}})
+    started = time.monotonic()
+    for _ in range(100):
+        limiter.acquire("free")
+        limiter.acquire("unknown")
+    assert time.monotonic() - started < 0.5
+
+def test_async_acquire_sleeps_on_the_loop():
+    limiter = RateLimiter({"test": {"per_minute": 600, "per_day": None}})
+    limiter.buckets["test"][0].tokens = 0
+
+    async def run():
+        started = time.monotonic()
+        await limiter.acquire_async("test")
+        return time.monotonic() - started
+
+    assert 0.05 <= asyncio.run(run()) < 0.5
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api_integration.single_flight import SingleFlight
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("provider down")
+
+    async def main():
+        return await asyncio.gather(flight.do_async("key", fail), flight.do_async("key", fail),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.in_flight() == 0
+
+def test_cancelling_the_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "value"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do_async("key", fetch))
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "value"
+    assert len(calls) == 1
+
+def test_cancelling_a_follower_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.1)
+        return "value"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do_async("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        followers[0].cancel()
+        return await asyncio.gather(leader, followers[1])
+
+    assert asyncio.run(main()) == ["value", "value"]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.technical_indicators import DEFAULT_WINDOWS, compute_indicators
+
+def _prices(seed: int, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    steps = np.random.default_rng(seed).normal(0, 1.5, len(dates))
+    return pd.DataFrame({"Close": 100 + np.cumsum(steps)}, index=dates)
+
+def _seeded_ema(values: pd.Series, window: int, alpha: float = None) -> pd.Series:
+    """Recursive EMA started from the SMA of the first full window, as Twelve Data does"""
+    values = values.dropna()
+    seeded = values.iloc[window - 1:].copy()
+    seeded.iloc[0] = values.iloc[:window].mean()
+    return seeded.ewm(alpha=alpha or 2.0 / (window + 1), adjust=False).mean()
+
+def _reference(close: pd.Series) -> dict:
+    delta = close.diff()
+    average_gain = _seeded_ema(delta.clip(lower=0), DEFAULT_WINDOWS["rsi"], 1.0 / DEFAULT_WINDOWS["rsi"])
+    average_loss = _seeded_ema(-delta.clip(upper=0), DEFAULT_WINDOWS["rsi"], 1.0 / DEFAULT_WINDOWS["rsi"])
+    fast, slow, signal = DEFAULT_WINDOWS["macd"]
+    line = (_seeded_ema(close, fast) - _seeded_ema(close, slow)).dropna()
+    return {
+        "sma": close.rolling(DEFAULT_WINDOWS["sma"]).mean(),
+        "ema": _seeded_ema(close, DEFAULT_WINDOWS["ema"]),
+        "rsi": 100 - 100 / (1 + average_gain / average_loss),
+        "macd": line,
+        "macd_signal": _seeded_ema(line, signal)
+    }
+
+def _latest(payload: dict, name: str) -> pd.Series:
+    values = payload["values"]
+    return pd.Series([float(value[name]) for value in values],
+                     index=pd.DatetimeIndex([value["datetime"] for value in values]))
+
+def test_matches_pandas_reference():
+    dates = pd.bdate_range("2024-01-01", periods=250)
+    frame = _prices(0, dates)
+    result = compute_indicators({"AAA": frame})["AAA"]
+    reference = _reference(frame["Close"])
+
+    for indicator, name in [("sma", "sma"), ("ema", "ema"), ("rsi", "rsi"), ("macd", "macd"), ("macd", "macd_signal")]:
+        payload = _latest(result[indicator], name)
+        assert len(payload) == 30
+        expected = reference[name].reindex(payload.index)
+        # Payload values are rounded to five decimals
+        np.testing.assert_allclose(payload.to_numpy(), expected.to_numpy(), atol=1e-5)
+    assert result["sma"]["values"][0]["datetime"] == dates[-1].strftime("%Y-%m-%d")
+
+def test_ticker_values_do_not_depend_on_the_batch():
+    dates = pd.bdate_range("2024-01-01", periods=200)
+    own = _prices(1, dates[dates.day != 15])
+    # Different holidays and a later listing date
+    other = _prices(2, dates[(dates.day != 3) & (dates >= dates[40])])
+
+    alone = compute_indicators({"OWN": own})["OWN"]
+    batched = compute_indicators({"OTHER": other, "OWN": own})
+    assert batched["OWN"] == alone
+    assert batched["OTHER"] == compute_indicators({"OTHER": other})["OTHER"]
+
+def test_short_or_missing_histories():
+    dates = pd.bdate_range("2024-01-01", periods=10)
+    results = compute_indicators({
+        "SHORT": _prices(3, dates),
+        "EMPTY": pd.DataFrame(),
+        "FAILED": pd.DataFrame({"error": ["timeout"]})
+    })
+    assert list(results) == ["SHORT"]
+    assert {payload["status"] for payload in results["SHORT"].values()} == {"error"}
+
+def test_timezone_aware_index_keeps_dates():
+    dates = pd.bdate_range("2024-01-01", periods=60, tz="America/New_York")
+    result = compute_indicators({"AAA": _prices(4, dates)})["AAA"]
+    assert result["sma"]["values"][0]["datetime"] == "2024-03-22"
+    assert result["sma"]["status"] == "ok"
@@ -0,0 +1,28 @@
+import spacy
+
+from query_processing.ticker_index import TickerIndex, load_ticker_index
+
+def _write_listings(path):
+    path.write_text("symbol,name,aliases\nJPM,JPMorgan Chase & Co.,chase\nBAC,Bank of America Corporation,\n")
+    return str(path)
+
+def test_partial_index_accepts_unlisted_tickers():
+    index = TickerIndex.from_mapping({"tesla": "TSLA"})
+    assert index.find_tickers("Compare JPM and BAC revenue with AI and the CEO") == ["JPM", "BAC"]
+
+def test_complete_index_only_accepts_listed_tickers(tmp_path):
+    index = TickerIndex.from_listings(_write_listings(tmp_path / "listings.csv"))
+    assert index.find_tickers("Compare JPM, XYZ and $bac") == ["BAC", "JPM"]
+
+def test_artifact_carries_the_phrase_matcher(tmp_path):
+    listings = _write_listings(tmp_path / "listings.csv")
+    load_ticker_index(listings)
+
+    index = TickerIndex.load(listings + ".index.pkl")
+    assert index._matcher is not None
+    doc = spacy.blank("en")("How did Bank of America and JPMorgan Chase do?")
+    assert [company["ticker"] for company in index.match_names(doc)] == ["BAC", "JPM"]
+
+def test_load_ticker_index_is_shared_per_process(tmp_path):
+    listings = _write_listings(tmp_path / "listings.csv")
+    assert load_ticker_index(listings) is load_ticker_index(listings)
@@ -0,0 +1,55 @@
+from datetime import date
+
+from query_processing.time_parser import (
+    FUTURE_CONFIDENCE, HIGH_CONFIDENCE, INVALID_DATE_CONFIDENCE, NO_TIME_CONFIDENCE, VAGUE_CONFIDENCE,
+    parse_time_frame
+)
+
+TODAY = date(2025, 6, 30)
+
+def _window(query: str, **kwargs):
+    result = parse_time_frame(query, today=TODAY, **kwargs)
+    return result["start_date"], result["end_date"]
+
+def test_quarter_forms():
+    expected = ("2024-07-01", "2024-09-30")
+    assert _window("Revenue in Q3 2024") == expected
+    assert _window("Revenue in 3Q24") == expected
+    assert _window("Revenue in the third quarter of 2024") == expected
+
+def test_fiscal_year_then_quarter():
+    # Fiscal year ending in September: FY2025 Q2 is January to March 2025
+    assert _window("AAPL margins FY 2025 Q2", fiscal_year_end_month=9) == ("2025-01-01", "2025-03-31")
+    assert _window("AAPL margins FY25 Q2", fiscal_year_end_month=9) == ("2025-01-01", "2025-03-31")
+    assert parse_time_frame("FY2025 Q2", today=TODAY)["quarters"] == ["Q2 2025"]
+    assert _window("AAPL margins FY2024") == ("2024-01-01", "2024-12-31")
+
+def test_relative_and_ranges():
+    assert _window("last 5 years") == ("2020-06-30", "2025-06-30")
+    assert _window("past quarter") == ("2025-03-30", "2025-06-30")
+    assert _window("from 2020 to 2022") == ("2020-01-01", "2022-12-31")
+    assert _window("since 2021") == ("2021-01-01", "2025-06-30")
+    assert _window("between 2024-01-15 and 2024-03-01") == ("2024-01-15", "2024-03-01")
+    assert _window("YTD performance") == ("2025-01-01", "2025-06-30")
+
+def test_current_period_is_clamped_to_today():
+    result = parse_time_frame("Q2 2025 earnings", today=date(2025, 5, 15))
+    assert (result["start_date"], result["end_date"]) == ("2025-04-01", "2025-05-15")
+    assert result["confidence"] == HIGH_CONFIDENCE
+
+def test_future_window_is_dropped_with_low_confidence():
+    result = parse_time_frame("Q2 2027 revenue", today=TODAY)
+    assert result["start_date"] is None and result["end_date"] is None
+    assert result["confidence"] == FUTURE_CONFIDENCE
+
+def test_impossible_date_is_left_to_the_llm():
+    result = parse_time_frame("AAPL close on 2024-02-30", today=TODAY)
+    assert result["confidence"] == INVALID_DATE_CONFIDENCE
+    # The valid end of a range is still used
+    result = parse_time_frame("between 2024-01-15 and 2024-02-30", today=TODAY)
+    assert (result["start_date"], result["end_date"]) == ("2024-01-15", "2025-06-30")
+    assert result["confidence"] == INVALID_DATE_CONFIDENCE
+
+def test_confidence_without_explicit_dates():
+    assert parse_time_frame("How is MSFT doing recently?", today=TODAY)["confidence"] == VAGUE_CONFIDENCE
+    assert parse_time_frame("Compare AAPL and MSFT", today=TODAY)["confidence"] == NO_TIME_CONFIDENCE
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from agents.workflow_coordinator_agent import SupervisorAgent
+
+class AgentStandIn:
+    """Answers for all three agents, tracking how many calls run at once"""
+
+    def __init__(self, delays=None, failing=()):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, kind, company):
+        with self._lock:
+            self.calls.append((kind, company))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delays.get(company, 0.01))
+            if (kind, company) in self.failing:
+                raise RuntimeError(f"{kind} unavailable for {company}")
+            return {"kind": kind, "company": company}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def analyze_sec_filings(self, company):
+        return self._answer("sec", company)
+
+    def gather_market_data(self, company):
+        return self._answer("market", company)
+
+    def perform_technical_analysis(self, company):
+        return self._answer("technical", company)
+
+def _supervisor(agent):
+    return SupervisorAgent(agent, agent, agent)
+
+def test_reports_match_one_company_at_a_time():
+    companies = ["TSLA", "AAPL", "TSLA"]
+    reports = list(_supervisor(AgentStandIn()).coordinate_many(companies))
+    expected = [_supervisor(AgentStandIn()).coordinate_workflow(company) for company in companies]
+    # A company listed twice is reported twice
+    assert sorted(reports, key=repr) == sorted(expected, key=repr)
+
+def test_calls_share_one_bounded_pool():
+    agent = AgentStandIn()
+    list(_supervisor(agent).coordinate_many(["A", "B", "C", "D"], max_workers=5))
+    assert len(agent.calls) == 12
+    assert agent.peak == 5
+
+def test_reports_arrive_as_companies_finish():
+    agent = AgentStandIn(delays={"SLOW": 0.3})
+    companies = [report["company"] for report in _supervisor(agent).coordinate_many(["SLOW", "A", "B"])]
+    assert companies[-1] == "SLOW"
+
+def test_failing_agent_only_fills_its_own_key():
+    agent = AgentStandIn(failing={("market", "AAPL")})
+    reports = {report["company"]: report for report in _supervisor(agent).coordinate_many(["AAPL", "MSFT"])}
+    assert reports["AAPL"]["market_data"] == {"error": "market unavailable for AAPL"}
+    assert reports["AAPL"]["sec_analysis"] == {"kind": "sec", "company": "AAPL"}
+    assert reports["MSFT"]["market_data"] == {"kind": "market", "company": "MSFT"}
+
+def test_stopping_early_drops_queued_calls():
+    agent = AgentStandIn()
+    reports = _supervisor(agent).coordinate_many(["A", "B", "C", "D"], max_workers=1)
+    assert next(reports)["company"] == "A"
+    reports.close()
+    time.sleep(0.05)
+    # At most the call already running when iteration stopped went ahead
+    assert len(agent.calls) <= 4
+
+def test_no_companies_yields_nothing():
+    assert list(_supervisor(AgentStandIn()).coordinate_many([])) == []
@@ -0,0 +1,156 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from data.data_processor import DataProcessor
+from visualizations.downsampling import DEFAULT_DOWNSAMPLING, downsample_spec
+
+DEFAULT_DPI = 100
+SUPPORTED_FORMATS = ("png", "svg")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def build_chart_specs(api_results: Dict[str, Any], annual_statements: pd.DataFrame = None,
+                      downsampling: Dict[str, str] = None) -> List[Dict]:
+    """Describe every chart for api_results as plain, picklable data
+
+    A spec holds the arrays to plot and the labels, so it can be drawn on a
+    pyplot figure in-process or shipped to a worker process for rendering.
+    downsampling overrides DEFAULT_DOWNSAMPLING per chart kind ("price",
+    "volume", "revenue") with "lttb", "bucket" or None.
+    """
+    downsampling = {**DEFAULT_DOWNSAMPLING, **(downsampling or {})}
+    specs = []
+    for ticker, price_data in ((k.replace("_price_history", ""), v) for k, v in api_results.items() if "_price_history" in k):
+        if isinstance(price_data, pd.DataFrame) and 'Close' in price_data.columns:
+            dates = pd.DatetimeIndex(price_data.index).tz_localize(None).to_numpy()
+            specs.append({
+                "name": f"{ticker}_price_chart", "kind": "line", "figsize": (10, 6),
+                "x": dates, "y": price_data['Close'].to_numpy(dtype=np.float64),
+                "title": f"{ticker} Stock Price", "xlabel": "Date", "ylabel": "Price", "grid": True,
+                "downsample": downsampling["price"]
+            })
+            if 'Volume' in price_data.columns:
+                specs.append({
+                    "name": f"{ticker}_volume_chart", "kind": "bar", "figsize": (10, 4),
+                    "x": dates, "y": price_data['Volume'].to_numpy(dtype=np.float64),
+                    "title": f"{ticker} Trading Volume", "xlabel": "Date", "ylabel": "Volume",
+                    "downsample": downsampling["volume"]
+                })
+
+    if annual_statements is None:
+        fundamentals = {k.replace("_fundamentals", ""): v for k, v in api_results.items() if "_fundamentals" in k}
+        annual_statements = DataProcessor().normalize_fundamentals(fundamentals)
+
+    if "totalRevenue" in annual_statements.columns:
+        for ticker, statements in annual_statements.groupby(level="ticker", observed=True):
+            revenue = statements["totalRevenue"].droplevel("ticker").dropna()
+            if revenue.empty:
+                continue
+            specs.append({
+                "name": f"{ticker}_revenue_chart", "kind": "bar", "figsize": (10, 6),
+                "x": np.asarray(revenue.index.strftime("%Y-%m-%d")), "y": revenue.to_numpy(),
+                "title": f"{ticker} Annual Revenue", "xlabel": "Fiscal Year", "ylabel": "Revenue",
+                "rotate_xticks": 45, "downsample": downsampling["revenue"]
+            })
+    return specs
+
+def draw_chart(ax, spec: Dict):
+    """Draw a chart spec onto a matplotlib Axes"""
+    # Only draw as many points as the figure has pixels for
+    spec = downsample_spec(spec, ax.figure.get_figwidth(), ax.figure.dpi)
+    if spec["kind"] == "line":
+        ax.plot(spec["x"], spec["y"])
+    elif "bar_width" in spec:
+        ax.bar(spec["x"], spec["y"], width=spec["bar_width"], align="edge")
+    else:
+        ax.bar(spec["x"], spec["y"])
+    ax.set_title(spec["title"])
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel(spec["ylabel"])
+    if spec.get("grid"):
+        ax.grid(True)
+    if spec.get("rotate_xticks"):
+        ax.tick_params(axis="x", labelrotation=spec["rotate_xticks"])
+
+def render_chart(spec: Dict, fmt: str = "png", dpi: int = DEFAULT_DPI) -> bytes:
+    """Render a spec to PNG/SVG bytes with the Agg canvas, outside pyplot's global state"""
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    fig = Figure(figsize=spec["figsize"], dpi=dpi)
+    FigureCanvasAgg(fig)
+    try:
+        draw_chart(fig.add_subplot(), spec)
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+    finally:
+        # Figures never touch pyplot, so dropping references is enough to free them
+        fig.clear()
+
+def _render_task(spec: Dict, fmt: str, dpi: int, output_dir: str):
+    data = render_chart(spec, fmt, dpi)
+    if output_dir is None:
+        return data
+    path = os.path.join(output_dir, f"{spec['name']}.{fmt}")
+    with open(path, "wb") as output:
+        output.write(data)
+    return path
+
+def get_render_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    """Process pool shared by all render calls, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver/spawn children do not inherit the parent's threads and locks
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context)
+        return _pool
+
+def shutdown_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+def render_charts(specs: List[Dict], fmt: str = "png", dpi: int = DEFAULT_DPI, output_dir: str = None,
+                  max_workers: int = None, parallel: bool = True) -> Dict[str, Any]:
+    """Render many chart specs, in a process pool unless parallel is False
+
+    Returns {name: encoded bytes}, or {name: file path} when output_dir is given.
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    if not parallel or len(specs) <= 1:
+        return {spec["name"]: _render_task(spec, fmt, dpi, output_dir) for spec in specs}
+
+    pool = get_render_pool(max_workers)
+    futures = {spec["name"]: pool.submit(_render_task, spec, fmt, dpi, output_dir) for spec in specs}
+    return {name: future.result() for name, future in futures.items()}
+
+def iter_render_charts(specs: List[Dict], fmt: str = "png", dpi: int = DEFAULT_DPI, output_dir: str = None,
+                       max_workers: int = None, parallel: bool = True) -> Iterator[Tuple[str, Any]]:
+    """Like render_charts, but yield (name, chart) pairs in completion order"""
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    if not parallel or len(specs) <= 1:
+        for spec in specs:
+            yield spec["name"], _render_task(spec, fmt, dpi, output_dir)
+        return
+
+    pool = get_render_pool(max_workers)
+    futures = {pool.submit(_render_task, spec, fmt, dpi, output_dir): spec["name"] for spec in specs}
+    for future in as_completed(futures):
+        yield futures[future], future.result()
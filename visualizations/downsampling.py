@@ -0,0 +1,116 @@
+import numpy as np
+from typing import Dict, Tuple
+
+# Default downsampling per chart kind; None plots every point
+DEFAULT_DOWNSAMPLING = {
+    "price": "lttb",
+    "volume": "bucket",
+    "revenue": None
+}
+
+# Volume bars need a few pixels each to stay readable
+PIXELS_PER_BAR = 3
+
+def _as_numeric(x: np.ndarray) -> np.ndarray:
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+def target_points(width_inches: float, dpi: float, pixels_per_point: float = 1.0) -> int:
+    """Number of points worth drawing across a plot of the given size"""
+    return max(3, int(width_inches * dpi / pixels_per_point))
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling for line charts
+
+    Keeps the first and last points and, from each bucket in between, the point
+    that forms the largest triangle with the previously kept point and the
+    average of the next bucket, which preserves peaks and troughs.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    x_num = _as_numeric(x)
+    # Bucket boundaries for the n - 2 interior points
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        average_x = x_num[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x_num[previous] - average_x) * (y[start:end] - y[previous])
+            - (x_num[previous] - x_num[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    selected[-1] = n - 1
+    return x[selected], y[selected]
+
+def bucket_aggregate(x: np.ndarray, y: np.ndarray, n_buckets: int, how: str = "mean") -> Tuple[np.ndarray, np.ndarray, float]:
+    """Aggregate values into equal-width time buckets for bar charts
+
+    Returns the bucket start positions, the aggregated values and the bucket
+    width (in days for datetime x, otherwise in x units) for sizing bars.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    is_datetime = np.issubdtype(x.dtype, np.datetime64)
+    x_num = _as_numeric(x)
+    if len(y) <= n_buckets:
+        width = np.median(np.diff(x_num)) if len(x_num) > 1 else 1.0
+        return x, y, (width / 86400e9 if is_datetime else width) * 0.8
+
+    edges = np.linspace(x_num.min(), x_num.max(), n_buckets + 1)
+    index = np.clip(np.searchsorted(edges, x_num, side="right") - 1, 0, n_buckets - 1)
+    valid = ~np.isnan(y)
+
+    totals = np.bincount(index[valid], weights=y[valid], minlength=n_buckets)
+    if how == "sum":
+        values = totals
+    elif how == "max":
+        values = np.full(n_buckets, -np.inf)
+        np.maximum.at(values, index[valid], y[valid])
+    else:
+        counts = np.bincount(index[valid], minlength=n_buckets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = totals / counts
+
+    filled = np.bincount(index, minlength=n_buckets) > 0
+    starts = edges[:-1][filled]
+    if is_datetime:
+        starts = starts.astype(np.int64).astype("datetime64[ns]")
+    width = edges[1] - edges[0]
+    return starts, values[filled], (width / 86400e9 if is_datetime else width) * 0.9
+
+def downsample_spec(spec: Dict, width_inches: float, dpi: float) -> Dict:
+    """Return a copy of a chart spec reduced to what the output width can show"""
+    method = spec.get("downsample")
+    if method is None:
+        return spec
+
+    reduced = dict(spec)
+    if method == "lttb":
+        reduced["x"], reduced["y"] = lttb(spec["x"], spec["y"], target_points(width_inches, dpi))
+    elif method == "bucket":
+        n_buckets = target_points(width_inches, dpi, PIXELS_PER_BAR)
+        reduced["x"], reduced["y"], reduced["bar_width"] = bucket_aggregate(
+            spec["x"], spec["y"], n_buckets, spec.get("aggregate", "mean")
+        )
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return reduced
@@ -1,4 +1,9 @@
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+from visualizations.downsampling import lttb, target_points
 
 class ReportGenerator:
     def generate_report(self, company: str, sec_analysis: Dict, market_data: Dict, technical_analysis: Dict):
@@ -11,15 +16,22 @@ class ReportGenerator:
             """
         return report
 
-    def generate_visualization(self, data: pd.DataFrame):
+    def generate_visualization(self, data: pd.DataFrame, downsample: bool = True):
         plt.figure(figsize=(10, 6))
-        plt.plot(data['date'], data['value'], marker='o')
+        dates = pd.to_datetime(data['date']).to_numpy()
+        values = data['value'].to_numpy(dtype=np.float64)
+        if downsample:
+            # Keep the shape of long series with one point per horizontal pixel
+            dates, values = lttb(dates, values, target_points(10, plt.gcf().dpi))
+        # Markers only help while individual points are distinguishable
+        plt.plot(dates, values, marker='o' if len(values) <= 100 else None)
         plt.title("Stock Performance")
         plt.xlabel('Date')
         plt.ylabel('Value')
         plt.grid(True)
         plt.show()
 
-report_generator = ReportGenerator()
-data_to_visualize = pd.DataFrame({"date": ["2025-01-01", "2025-01-02"], "value": [100, 110]})
-report_generator.generate_visualization(data_to_visualize)
+if __name__ == "__main__":
+    report_generator = ReportGenerator()
+    data_to_visualize = pd.DataFrame({"date": ["2025-01-01", "2025-01-02"], "value": [100, 110]})
+    report_generator.generate_visualization(data_to_visualize)